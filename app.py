@@ -1,355 +1,28 @@
 import streamlit as st
-import google.generativeai as genai
-import json
 import re
-import io
-
-# --- LIBRARIES ---
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Flowable, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
-from pdfminer.high_level import extract_text
+import os
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+# --- PIPELINE MODULES ---
+from cache import ExtractionCache, RenderCache
+from chunked_extraction import PROMPT_FINGERPRINT, complete_extraction, extract_chunked
+from extraction import (MODEL_NAME, EXTRACTION_PROMPT, RESUME_KEYS, build_prompt,
+                        clean_json, finalize_extraction, validate_resume)
+from fast_parser import fast_path_fingerprint, hybrid_extract
+from json_stream import IncrementalJSONParser
+from metrics import METRICS, LogSink, start_metrics_server
+from llm_client import AsyncLLMClient, GeminiBackend, LLMError
+from normalize import normalize_text
+from pdf_sandbox import ExtractionSandbox, PDFRejected
+from resume_model import Resume
+from session_store import SessionStore
+from templates import template_names
 
 
 # ==========================================
-# 1. HELPER FUNCTIONS (No Change)
-# ==========================================
-
-def extract_text_from_pdf(uploaded_file):
-    return extract_text(uploaded_file)
-
-def manual_entity_extraction(text):
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    emails = re.findall(email_pattern, text)
-    phone_pattern = r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-    phones = re.findall(phone_pattern, text)
-    contact_string = " | ".join(emails[:1] + phones[:1])
-    return {"contact_string": contact_string}
-
-def clean_json(text):
-    try:
-        text = text.replace("```json", "").replace("```", "")
-        match = re.search(r'\{.*\}', text, re.DOTALL)
-        if match: text = match.group(0)
-        return json.loads(text)
-    except:
-        return {}
-
-def escape_xml(text):
-    """Escapes special characters that crash ReportLab."""
-    if not text: return ""
-    text = str(text)
-    text = text.replace('&', '&amp;')
-    text = text.replace('<', '&lt;')
-    text = text.replace('>', '&gt;')
-    return text
-
-def calculate_percentage(grade_str):
-    if not grade_str: return None
-    if "%" in str(grade_str): return None
-    match = re.search(r'(\d+(\.\d+)?)\s*/\s*(\d+(\.\d+)?)', str(grade_str))
-    if match:
-        try:
-            obtained = float(match.group(1))
-            total = float(match.group(3))
-            if total > 0: return f"{(obtained / total) * 100:.1f}%"
-        except: pass
-    return None
-
-# --- CUSTOM LINE DRAWING ---
-class MCLine(Flowable):
-    def __init__(self, width, height=0):
-        Flowable.__init__(self)
-        self.width = width
-        self.height = height
-    def draw(self):
-        self.canv.setLineWidth(1)
-        self.canv.setStrokeColor(colors.black)
-        self.canv.line(0, 0, self.width, 0)
-
-
-# ==========================================
-# 2. PDF GENERATION FUNCTION (No Change)
-# ==========================================
-
-def create_pdf(data, template_type):
-    buffer = io.BytesIO()
-    
-    
-    if template_type == "Classic Serif":
-        font_header = "Times-Bold"
-        font_body = "Times-Roman"
-        header_align = TA_CENTER
-        name_size = 24
-        section_header_case = "title" 
-        has_lines = True
-        separator = " | "
-        
-    elif template_type == "Modern Sans":
-        font_header = "Helvetica-Bold"
-        font_body = "Helvetica"
-        header_align = TA_LEFT
-        name_size = 26
-        section_header_case = "upper" 
-        has_lines = False 
-        separator = "  •  "
-        
-    elif template_type == "Minimalist":
-        font_header = "Helvetica-Bold"
-        font_body = "Helvetica"
-        header_align = TA_LEFT
-        name_size = 20
-        section_header_case = "upper"
-        has_lines = True
-        separator = " | "
-
-    elif template_type == "Ivy League": 
-        font_header = "Times-Bold"
-        font_body = "Times-Roman"
-        header_align = TA_CENTER
-        name_size = 26
-        section_header_case = "title" 
-        has_lines = True
-        separator = " • "
-        
-    elif template_type == "Executive": 
-        font_header = "Times-Bold"
-        font_body = "Times-Roman"
-        header_align = TA_LEFT
-        name_size = 28
-        section_header_case = "upper" 
-        has_lines = True
-        separator = " | "
-        
-    else: # Fallback
-        font_header = "Helvetica-Bold"
-        font_body = "Helvetica"
-        header_align = TA_LEFT
-        name_size = 22
-        section_header_case = "title"
-        has_lines = True
-        separator = " | "
-
-
-    doc = SimpleDocTemplate(buffer, pagesize=letter, 
-                             rightMargin=40, leftMargin=40, 
-                             topMargin=40, bottomMargin=40)
-    story = [] 
-    styles = getSampleStyleSheet()
-    full_width = 530 
-
-    # Define Dynamic Paragraph Styles
-    style_name = ParagraphStyle('Name', parent=styles['Normal'], 
-                                 fontSize=name_size, alignment=header_align, 
-                                 spaceAfter=6, fontName=font_header, leading=name_size+4)
-    
-    style_contact = ParagraphStyle('Contact', parent=styles['Normal'], 
-                                   fontSize=10, alignment=header_align, 
-                                   spaceAfter=10, fontName=font_body, leading=12)
-    
-    style_header = ParagraphStyle('Header', parent=styles['Normal'], 
-                                  fontSize=12, spaceBefore=12, spaceAfter=4, 
-                                  fontName=font_header, alignment=TA_LEFT)
-    
-    style_normal = ParagraphStyle('Normal_Body', parent=styles['Normal'], 
-                                  fontSize=10.5, leading=14, alignment=TA_LEFT, fontName=font_body)
-    
-    style_bullet = ParagraphStyle('Bullet_Body', parent=styles['Normal'], 
-                                  fontSize=10.5, leading=14, leftIndent=15, bulletIndent=0, fontName=font_body)
-    
-    # Styles specifically for the "Table" headers (Right aligned dates)
-    style_left_col = ParagraphStyle('LeftCol', parent=styles['Normal'], fontSize=10.5, leading=14, fontName=font_body)
-    style_right_col = ParagraphStyle('RightCol', parent=styles['Normal'], fontSize=10.5, leading=14, fontName=font_body, alignment=TA_RIGHT)
-
-    # --- HELPER FOR SECTIONS ---
-    def add_section_header(text):
-        if section_header_case == "upper":
-            text = text.upper()
-        story.append(Paragraph(text, style_header))
-        if has_lines:
-            story.append(MCLine(full_width))
-            story.append(Spacer(1, 8))
-
-    # --- HELPER FOR JOB HEADERS (TABLE BASED) ---
-    def add_job_header_table(left_text, right_text):
-        # Create a 2-column table: Left text (Company) | Right text (Date)
-        # This ensures the date is always perfectly right-aligned
-        data_row = [[Paragraph(left_text, style_left_col), Paragraph(right_text, style_right_col)]]
-        t = Table(data_row, colWidths=[full_width * 0.75, full_width * 0.25])
-        t.setStyle(TableStyle([
-            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-            ('ALIGN', (1,0), (1,0), 'RIGHT'),
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('LEFTPADDING', (0,0), (-1,-1), 0),
-            ('RIGHTPADDING', (0,0), (-1,-1), 0),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 0),
-            ('TOPPADDING', (0,0), (-1,-1), 0),
-        ]))
-        story.append(t)
-
-    # --- BUILD CONTENT ---
-    
-    # 1. Name & Contact
-    name = escape_xml(data.get('name', 'Name Not Provided'))
-    story.append(Paragraph(name, style_name))
-    
-    contact_parts = []
-    if data.get('address'): contact_parts.append(escape_xml(data.get('address')))
-    if data.get('contact'): contact_parts.append(escape_xml(data.get('contact')))
-    # This line uses the cleaned data from the Streamlit form
-    story.append(Paragraph(separator.join(contact_parts), style_contact))
-    
-    # 2. Objective
-    if data.get('objective'):
-        add_section_header("Professional Summary")
-        story.append(Paragraph(escape_xml(data.get('objective', '')), style_normal))
-
-    # 3. Experience
-    if data.get('experience'):
-        add_section_header("Work Experience")
-        for job in data.get('experience', []):
-            role = escape_xml(job.get('role', ''))
-            company = escape_xml(job.get('company', ''))
-            dates = escape_xml(job.get('dates', ''))
-            
-            # --- TEMPLATE SPECIFIC JOB FORMATTING (Rest of Logic is unchanged) ---
-            if template_type == "Ivy League":
-                add_job_header_table(f"<b>{company}</b>", dates)
-                story.append(Paragraph(f"<i>{role}</i>", style_normal))
-            elif template_type == "Executive":
-                add_job_header_table(f"<b>{company}</b>", f"<b>{dates}</b>")
-                story.append(Paragraph(role, style_normal))
-            elif template_type == "Classic Serif":
-                head = f"<b>{role}</b>, {company} -- <i>{dates}</i>"
-                story.append(Paragraph(head, style_normal))
-            else: # Modern/Minimalist
-                head = f"<b>{role}</b> | {company} <font color='grey' size=9>({dates})</font>"
-                story.append(Paragraph(head, style_normal))
-            
-            for b in job.get('bullets', []): 
-                story.append(Paragraph(f"• {escape_xml(b)}", style_bullet))
-            story.append(Spacer(1, 10))
-
-    # 4. Education
-    if data.get('education'):
-        add_section_header("Education")
-        for edu in data.get('education', []):
-            degree = escape_xml(edu.get('degree', ''))
-            uni = escape_xml(edu.get('university', ''))
-            year = escape_xml(edu.get('year', ''))
-            grade = escape_xml(edu.get('grade', ''))
-            
-            if template_type == "Ivy League" or template_type == "Executive":
-                add_job_header_table(f"<b>{uni}</b>", year)
-                story.append(Paragraph(degree, style_normal))
-            else:
-                line = f"<b>{degree}</b>, {uni}"
-                if year: line += f", {year}"
-                story.append(Paragraph(line, style_normal))
-
-            if grade:
-                pct = calculate_percentage(grade)
-                g_txt = f"Grade: {grade} ({pct})" if pct else f"Grade: {grade}"
-                story.append(Paragraph(g_txt, style_normal))
-            story.append(Spacer(1, 8))
-            
-    # 5. Projects
-    if data.get('projects'):
-        add_section_header("Projects")
-        for proj in data.get('projects', []):
-            p_name = escape_xml(proj.get('name', ''))
-            p_tech = escape_xml(proj.get('tech', ''))
-            p_role = escape_xml(proj.get('role', '')) # New field
-            
-            if template_type in ["Ivy League", "Executive", "Classic Serif"]:
-                head = f"<b>{p_name}</b> [{p_tech}]"
-            else:
-                head = f"<b>{p_name}</b> | {p_tech}"
-            
-            story.append(Paragraph(head, style_normal))
-            if p_role:
-                story.append(Paragraph(f"Role: {p_role}", style_normal))
-                
-            for b in proj.get('bullets', []): 
-                story.append(Paragraph(f"• {escape_xml(b)}", style_bullet))
-            story.append(Spacer(1, 8))
-            
-    # 6. Publications (New Section)
-    if data.get('publications'):
-        add_section_header("Publications")
-        for pub in data.get('publications', []):
-            p_title = escape_xml(pub.get('title', ''))
-            p_journal = escape_xml(pub.get('journal', ''))
-            p_year = escape_xml(pub.get('year', ''))
-            
-            if p_title:
-                head = f"<b>{p_title}</b>"
-                story.append(Paragraph(head, style_normal))
-            
-            detail_line = p_journal
-            if p_year: detail_line += f", {p_year}"
-            if detail_line:
-                story.append(Paragraph(detail_line, style_normal))
-            
-            story.append(Spacer(1, 6))
-
-    # 7. Skills (No Change)
-    if data.get('core_skills'):
-        add_section_header("Skills")
-        story.append(Paragraph(escape_xml(data.get('core_skills', '')), style_normal))
-        
-    # 8. Awards & Honors (New Section)
-    if data.get('awards'):
-        add_section_header("Awards & Honors")
-        for award in data.get('awards', []):
-            a_name = escape_xml(award.get('name', ''))
-            a_year = escape_xml(award.get('year', ''))
-            
-            if a_name and a_year:
-                add_job_header_table(f"<b>{a_name}</b>", a_year)
-            elif a_name:
-                 story.append(Paragraph(f"<b>{a_name}</b>", style_normal))
-            story.append(Spacer(1, 6))
-            
-    # 9. Scholarship/Fellowship (New Section)
-    if data.get('scholarship'):
-        add_section_header("Scholarship / Fellowship")
-        story.append(Paragraph(escape_xml(data.get('scholarship', '')), style_normal))
-        story.append(Spacer(1, 8))
-
-    # 10. Languages (New Section)
-    if data.get('languages'):
-        add_section_header("Languages")
-        story.append(Paragraph(escape_xml(data.get('languages', '')), style_normal))
-        story.append(Spacer(1, 8))
-        
-    # 11. References (New Section - Structured as a table)
-    if data.get('references'):
-        add_section_header("References")
-        
-        for ref in data.get('references', []):
-            r_name = escape_xml(ref.get('name', ''))
-            r_title = escape_xml(ref.get('title', ''))
-            r_contact = escape_xml(ref.get('contact', ''))
-            
-            if r_name:
-                 story.append(Paragraph(f"<b>{r_name}</b>", style_normal))
-            if r_title:
-                 story.append(Paragraph(r_title, style_normal))
-            if r_contact:
-                 story.append(Paragraph(r_contact, style_normal))
-            
-            story.append(Spacer(1, 8))
-
-
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
-
-# ==========================================
-# 3. STREAMLIT APP (UPDATED DATA PACKAGING)
+# STREAMLIT APP (UPDATED DATA PACKAGING)
 # ==========================================
 st.set_page_config(page_title="Professional Resume Generator", layout="wide")
 
@@ -416,15 +89,99 @@ except Exception as e:
     """)
     st.stop()
 
-# --- INITIALIZE SESSION STATE WITH NEW KEYS ---
-if 'resume_data' not in st.session_state: 
-    st.session_state.resume_data = {
-        "name": "", "address": "", "contact": "", "objective": "", "core_skills": "", 
-        "education": [], "experience": [], "projects": [],
-        "publications": [], "awards": [], "scholarship": "", 
-        "languages": "", "references": [], "MoU": "" # MoU is just text
-    }
-if 'pdf_bytes' not in st.session_state: st.session_state.pdf_bytes = None
+# --- PER-SESSION DATA (one SessionStore per server process, shared memory budget) ---
+# PDFs spill to disk past the budget and idle sessions expire, instead of living
+# in st.session_state until the browser disconnects
+@st.cache_resource
+def get_session_store():
+    return SessionStore(
+        memory_budget=int(float(os.environ.get("RESUME_SESSION_MEMORY_MB", 256)) * 2 ** 20),
+        disk_budget=int(float(os.environ.get("RESUME_SESSION_DISK_MB", 2048)) * 2 ** 20),
+        idle_ttl=float(os.environ.get("RESUME_SESSION_IDLE_MINUTES", 30)) * 60,
+        spill_dir=os.environ.get("RESUME_SESSION_DIR") or None)
+
+# Only the session id lives in st.session_state. The CV is a typed, immutable
+# Resume (resume_model.py); edits create a new one
+if 'session_id' not in st.session_state: st.session_state.session_id = uuid.uuid4().hex
+session = get_session_store().session(st.session_state.session_id)
+
+def select_template(t_name):
+    # Runs before the next rerun draws the sidebar, so the selectbox picks it up
+    st.session_state.template_option = t_name
+
+def store_renders(renders):
+    for t_name in session.get('render_templates') or []:
+        del session[f'pdf:{t_name}']
+        del session[f'preview:{t_name}']
+    session['render_templates'] = list(renders) if renders else None
+    for t_name, render in (renders or {}).items():
+        session[f'pdf:{t_name}'] = render['pdf']
+        session[f'preview:{t_name}'] = render['preview']
+
+# --- EXTRACTION LIMITS (long uploads are cut off instead of blocking the worker) ---
+MAX_PAGES = int(os.environ.get("RESUME_MAX_PAGES", 30))
+MAX_CHARS = int(os.environ.get("RESUME_MAX_CHARS", 120000))
+
+# --- EXTRACTION SANDBOX (pdfminer runs in killable worker processes, not in the server) ---
+@st.cache_resource
+def get_extraction_sandbox():
+    return ExtractionSandbox(
+        max_bytes=int(float(os.environ.get("RESUME_MAX_UPLOAD_MB", 10)) * 2 ** 20),
+        max_pages=int(os.environ.get("RESUME_MAX_PDF_PAGES", 100)),
+        timeout=float(os.environ.get("RESUME_EXTRACT_TIMEOUT", 30)),
+        max_rss_mb=int(os.environ.get("RESUME_EXTRACT_MAX_RSS_MB", 512)),
+        workers=int(os.environ.get("RESUME_EXTRACT_WORKERS", 2)))
+
+# --- SHARED EXTRACTION CACHE (one per server process, shared by all sessions) ---
+@st.cache_resource
+def get_extraction_cache():
+    # Set RESUME_CACHE_DIR to also keep results on disk across restarts
+    return ExtractionCache(disk_dir=os.environ.get("RESUME_CACHE_DIR") or None)
+
+# --- SHARED LLM CLIENT (rate limited, retries transient 429/503 errors) ---
+# Every call goes through client.run()/stream_sync(), i.e. the client's one event
+# loop, so max_concurrency caps Gemini calls across all sessions
+@st.cache_resource
+def get_llm_client():
+    return AsyncLLMClient(GeminiBackend(API_KEY), max_concurrency=4, timeout=60, deadline=120)
+
+# --- SHARED RENDER CACHE (PDFs by data hash + template, survives reruns) ---
+@st.cache_resource
+def get_render_cache():
+    return RenderCache(max_bytes=int(os.environ.get("RENDER_CACHE_BYTES", 64 * 1024 * 1024)))
+
+# --- SHARED RENDER POOL (renders every template side by side) ---
+@st.cache_resource
+def get_render_pool():
+    # spawn, not fork: the Streamlit server process is multi-threaded
+    return ProcessPoolExecutor(max_workers=min(len(template_names()), os.cpu_count() or 1),
+                               mp_context=multiprocessing.get_context("spawn"))
+
+# --- METRICS SINKS (RESUME_METRICS_LOG=1 for JSON logs, RESUME_METRICS_PORT for /metrics) ---
+@st.cache_resource
+def init_metrics():
+    if os.environ.get("RESUME_METRICS_LOG"):
+        METRICS.add_sink(LogSink())
+    port = os.environ.get("RESUME_METRICS_PORT")
+    return start_metrics_server(int(port)) if port else None
+
+init_metrics()
+
+# --- LIVE EXTRACTION PREVIEW (fields fill in while the model is still streaming) ---
+FIELD_LABELS = {
+    "name": "Full Name", "address": "Address", "contact": "Contact", "objective": "Professional Summary",
+    "core_skills": "Core Skills", "education": "Education", "experience": "Experience", "projects": "Projects",
+    "publications": "Publications", "awards": "Awards", "scholarship": "Scholarship / Fellowship",
+    "languages": "Languages", "references": "References", "MoU": "MoU / Affiliations"
+}
+
+def show_streamed_field(slot, key, value):
+    label = FIELD_LABELS.get(key, key)
+    if isinstance(value, list):
+        slot.markdown(f"✅ **{label}**: {len(value)} {'entry' if len(value) == 1 else 'entries'}")
+    else:
+        text = str(value or "—")
+        slot.markdown(f"✅ **{label}**: {text[:160]}{'…' if len(text) > 160 else ''}")
 
 # --- SIDEBAR: SETTINGS & TEMPLATES ---
 with st.sidebar:
@@ -432,91 +189,169 @@ with st.sidebar:
     
     template_option = st.selectbox(
         "Select ATS Style",
-        ("Ivy League", "Executive", "Classic Serif", "Modern Sans", "Minimalist"),
+        template_names(),
+        key="template_option",
         help="Ivy League: Centered Serif (Bloomberg). Executive: Bold Left Align (Resume Worded). Modern: Clean Sans."
     )
     
+    chunked_mode = st.checkbox("⚡ Section-parallel extraction", value=False,
+                               help="Sends each detected CV section as its own smaller prompt, concurrently. Faster on long CVs.")
+    
+    fast_path = st.checkbox("🚀 Local parse first", value=False,
+                            help="Parses clearly structured sections on this machine in milliseconds; only unclear sections are sent to the AI.")
+    
+    compare_all = st.checkbox("Render all templates side by side", value=False,
+                              help="Builds every template in one pass so you can switch and download without regenerating.")
+    
+    fit_pages = st.selectbox("📏 Fit to pages", (None, 1, 2, 3),
+                             format_func=lambda n: "Off" if n is None else f"{n} page{'s' if n > 1 else ''}",
+                             help="Scales fonts and spacing down (to 80% at most) until the CV fits on this many pages.")
+    
     st.divider()
     
     if st.button("🔄 Reset / New File"):
-        st.session_state.resume_data = {
-            "name": "", "address": "", "objective": "", "core_skills": "", 
-            "education": [], "experience": [], "projects": [],
-            "publications": [], "awards": [], "scholarship": "", 
-            "languages": "", "references": [], "MoU": ""
-        }
-        st.session_state.pdf_bytes = None
+        session.clear()
         st.rerun()
+    
+    cache_stats = get_extraction_cache().stats()
+    st.caption(f"Extraction cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+    
+    # --- OPERATOR TIMING PANEL ---
+    if st.checkbox("⏱️ Show timing panel", value=False):
+        st.dataframe(
+            [{"stage": s['name'], "ms": round(s['ms'], 1), "status": s.get('status', '')}
+             for s in reversed(METRICS.recent_spans)],
+            hide_index=True, use_container_width=True
+        )
+        st.caption(
+            f"LLM retries: {METRICS.counter_value('llm_retries_total', backend='gemini')} | "
+            f"JSON parse failures: {METRICS.counter_value('json_parse_failures_total')} | "
+            f"Sections parsed locally: {METRICS.counter_value('fast_path_sections_total', path='local')}"
+            f" / via AI: {METRICS.counter_value('fast_path_sections_total', path='llm')}"
+        )
+        store_stats = get_session_store().stats()
+        st.caption(
+            f"Sessions: {store_stats['sessions']} | "
+            f"in memory: {store_stats['memory_bytes'] / 2 ** 20:.1f} / {store_stats['memory_budget'] / 2 ** 20:.0f} MB | "
+            f"spilled: {store_stats['disk_bytes'] / 2 ** 20:.1f} MB | "
+            f"process RSS: {store_stats['rss_bytes'] / 2 ** 20:.0f} MB"
+        )
 
 # --- MAIN LOGIC (Extraction) ---
-if not st.session_state.resume_data.get('name'):
+if not (session.get('resume') or Resume()).name:
     st.info("Upload your existing PDF resume to extract data and reformat it.")
     f = st.file_uploader("Upload Resume", type="pdf")
     
     if f and st.button("🔍 Extract & Format"):
-        genai.configure(api_key=API_KEY)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
         with st.spinner("Processing..."):
             try:
-                raw = extract_text_from_pdf(f)
-                man = manual_entity_extraction(raw)
-                
-                # --- UPDATED PROMPT FOR ALL SECTIONS (Key change for 'contact' clarification)---
-                prompt = f"""
-                You are an expert Resume Parser. Extract the following details from the resume text into valid JSON format.
-                Ensure ALL keys are: "name", "address", "contact", "objective", "core_skills", "education", "experience", "projects", "publications", "awards", "scholarship", "languages", "references", "MoU".
-                
-                Format rules for keys:
-                - contact: A single, comma or pipe-separated string containing ONLY email(s) and phone number(s). DO NOT include structural characters like brackets, quotes, or keywords like 'email:' or 'phone:'.
-                - core_skills, scholarship, languages, MoU: Single strings.
-                - experience: Array of objects with "company", "role", "dates", "bullets" (list of strings).
-                - education: Array of objects with "university", "degree", "year", "grade".
-                - projects: Array of objects with "name", "tech", "role" (e.g., PI, Co-I), "bullets".
-                - publications: Array of objects with "title", "journal" (includes conference/SCI status), "year".
-                - awards: Array of objects with "name", "year".
-                - references: Array of objects with "name", "title" (including affiliation), "contact" (email/phone).
-                
-                Resume Text: {raw}
-                """
+                cache = get_extraction_cache()
+                # Spool to a temp file (hashed on the way) instead of copying the upload in memory
+                pdf_path, doc_hash = get_extraction_sandbox().spool(f)
+                if fast_path: prompt_id = fast_path_fingerprint()
+                else: prompt_id = PROMPT_FINGERPRINT if chunked_mode else EXTRACTION_PROMPT
+                cache_key = ExtractionCache.make_key(None, prompt_id, MODEL_NAME, doc_hash=doc_hash,
+                                                     max_pages=MAX_PAGES, max_chars=MAX_CHARS)
+                cached = cache.get(cache_key)
                 
-                res = model.generate_content(prompt)
-                data = clean_json(res.text)
+                if cached:
+                    os.unlink(pdf_path)
+                    raw = cached['raw']
+                    data = cached['data']
+                else:
+                    # Stream pages so progress shows while pdfminer works through long CVs
+                    progress = st.progress(0.0, text="Reading PDF...")
+                    pages = []
+                    total = [0]
+                    def set_total(n): total[0] = n
+                    try:
+                        with METRICS.span("pdf_extract"):
+                            for i, page_text in enumerate(get_extraction_sandbox().iter_pages(
+                                    pdf_path, max_pages=MAX_PAGES, max_chars=MAX_CHARS, on_total=set_total)):
+                                pages.append(page_text)
+                                # The worker reports the page count before the first page
+                                n = max(total[0], i + 1)
+                                progress.progress((i + 1) / n, text=f"Read page {i + 1} of {n}")
+                    finally:
+                        os.unlink(pdf_path)
+                        progress.empty()
+                    # Strip headers/footers, hyphenation and duplicates before they cost prompt tokens
+                    with METRICS.span("normalize"):
+                        raw, norm_report = normalize_text(pages)
+                    METRICS.inc("prompt_tokens_saved_total", norm_report['tokens_before'] - norm_report['tokens_after'])
+                    failed_sections = []
+                    if fast_path:
+                        with METRICS.span("llm_generate", mode="fast_path"):
+                            data, fast_report = get_llm_client().run(hybrid_extract(get_llm_client(), raw))
+                        failed_sections = fast_report['failed']
+                    elif chunked_mode:
+                        with METRICS.span("llm_generate", mode="chunked"):
+                            data, failed_sections = get_llm_client().run(extract_chunked(get_llm_client(), raw))
+                    else:
+                        prompt = build_prompt(raw)
+                        
+                        # Stream the response and show each field as soon as its JSON value is complete
+                        slots = {k: st.empty() for k in RESUME_KEYS}
+                        for k, slot in slots.items(): slot.markdown(f"⏳ {FIELD_LABELS[k]}")
+                        parser = IncrementalJSONParser()
+                        try:
+                            with METRICS.span("llm_generate", mode="stream"):
+                                for chunk in get_llm_client().stream_sync(prompt):
+                                    for key, value in parser.feed(chunk):
+                                        if key in slots: show_streamed_field(slots[key], key, value)
+                        except LLMError:
+                            # Keep the fields that already arrived; the rest are re-asked below
+                            if not parser.result: raise
+                        if parser.done and not parser.bad_keys:
+                            data = parser.result
+                        else:
+                            with METRICS.span("clean_json"):
+                                data = clean_json(parser.text) or parser.result
+                        for slot in slots.values(): slot.empty()
+                        
+                        # Salvage what validates; only missing/invalid sections cost another call
+                        data, problems = validate_resume(data)
+                        if problems:
+                            with METRICS.span("llm_reprompt"):
+                                data, failed_sections = get_llm_client().run(
+                                    complete_extraction(get_llm_client(), raw, data, problems))
+                    
+                    # Only cache successful parses so a bad response can be retried
+                    if data and not failed_sections: cache.put(cache_key, raw, data)
                 
-                # Fallback if manual extraction found contact info but AI didn't
-                if not data.get('contact'): 
-                    data['contact'] = man.get('contact_string', '')
+                data = finalize_extraction(data, raw)
                 
-                # Ensure contact field is cleaned again in case the LLM returned junk
-                if data.get('contact'):
-                    data['contact'] = re.sub(r'[\{\}\[\]"\']|email:|phone:', '', data['contact']).strip()
-                
-                if not data.get('name'): data['name'] = "Name Not Found"
-                
-                st.session_state.resume_data.update(data)
+                session['resume'], _ = Resume.from_dict(data)
+                session['failed_sections'] = [] if cached else failed_sections
                 
                 st.rerun()
+            except PDFRejected as e:
+                st.error(f"⚠️ This PDF can't be processed: {e}")
+            except LLMError as e:
+                st.error(f"The AI service did not respond in time, please try again. ({e})")
             except Exception as e:
                 st.error(f"Error during extraction: {e}")
 
 # --- MAIN LOGIC (Editing and Generation) ---
 else: 
     st.header("📝 Verify & Edit Data")
+    if session.get('failed_sections'):
+        st.warning(f"Could not parse: {', '.join(FIELD_LABELS.get(k, k) for k in session['failed_sections'])}. "
+                   "Please fill these in below.")
     
+    resume = session['resume']
     with st.form("edit_form"):
         # --- PERSONAL INFO ---
         st.subheader("Personal & Summary")
         c1, c2 = st.columns(2)
         with c1:
-            name = st.text_input("Full Name", st.session_state.resume_data.get('name', ''))
+            name = st.text_input("Full Name", resume.name)
             # --- CONTACT FIELD REMAINS THE FOCUS FOR CLEANING ---
-            contact = st.text_input("Contact (Email | Phone)", st.session_state.resume_data.get('contact', ''))
+            contact = st.text_input("Contact (Email | Phone)", resume.contact)
         with c2:
-            addr_val = st.session_state.resume_data.get('address', '')
-            if addr_val is None: addr_val = ""
-            address = st.text_input("Address", value=addr_val, placeholder="City, Country")
+            address = st.text_input("Address", value=resume.address, placeholder="City, Country")
 
-        obj = st.text_area("Professional Summary", st.session_state.resume_data.get('objective', ''), height=100)
+        obj = st.text_area("Professional Summary", resume.objective, height=100)
         
         st.divider()
         
@@ -525,16 +360,16 @@ else:
         c3, c4 = st.columns(2)
         with c3:
             st.markdown("**Experience JSON**")
-            exp_json = st.text_area("Experience Data", json.dumps(st.session_state.resume_data.get('experience', []), indent=2), height=300)
+            exp_json = st.text_area("Experience Data", resume.section_json('experience'), height=300)
             st.markdown("**Publications JSON**")
-            pub_json = st.text_area("Publications Data", json.dumps(st.session_state.resume_data.get('publications', []), indent=2), height=300)
+            pub_json = st.text_area("Publications Data", resume.section_json('publications'), height=300)
         with c4:
             st.markdown("**Education JSON**")
-            edu_json = st.text_area("Education Data", json.dumps(st.session_state.resume_data.get('education', []), indent=2), height=150)
+            edu_json = st.text_area("Education Data", resume.section_json('education'), height=150)
             st.markdown("**Projects JSON**")
-            proj_json = st.text_area("Projects Data", json.dumps(st.session_state.resume_data.get('projects', []), indent=2), height=150)
+            proj_json = st.text_area("Projects Data", resume.section_json('projects'), height=150)
             st.markdown("**References JSON**")
-            ref_json = st.text_area("References Data", json.dumps(st.session_state.resume_data.get('references', []), indent=2), height=150)
+            ref_json = st.text_area("References Data", resume.section_json('references'), height=150)
 
         st.divider()
         
@@ -542,48 +377,105 @@ else:
         st.subheader("Other Details")
         c5, c6 = st.columns(2)
         with c5:
-            skills = st.text_area("Core Skills (Comma Separated)", st.session_state.resume_data.get('core_skills', ''))
-            awards_json = st.text_area("Awards JSON", json.dumps(st.session_state.resume_data.get('awards', []), indent=2), height=100)
+            skills = st.text_area("Core Skills (Comma Separated)", resume.core_skills)
+            awards_json = st.text_area("Awards JSON", resume.section_json('awards'), height=100)
         with c6:
-            scholarship = st.text_area("Scholarship / Fellowship", st.session_state.resume_data.get('scholarship', ''))
-            languages = st.text_area("Languages (Comma Separated)", st.session_state.resume_data.get('languages', ''))
+            scholarship = st.text_area("Scholarship / Fellowship", resume.scholarship)
+            languages = st.text_area("Languages (Comma Separated)", resume.languages)
         
-        mo_u = st.text_area("MoU / Affiliations", st.session_state.resume_data.get('MoU', ''), height=50, help="This is currently treated as a single text block.")
+        mo_u = st.text_area("MoU / Affiliations", resume.MoU, height=50, help="This is currently treated as a single text block.")
 
         # GENERATE BUTTON
         if st.form_submit_button("✅ Generate PDF"):
             try:
-                # Re-package data from form
-                final_data = {
-                    "name": name,
+                # Re-package data from form (unchanged JSON sections are reused, not re-parsed)
+                final_data = resume.updated(
+                    name=name,
                     # --- CLEAN CONTACT DATA BEFORE PASSING TO PDF GENERATOR ---
-                    "contact": re.sub(r'[\{\}\[\]"\']|email:|phone:', '', contact).strip(),
-                    "address": address,
-                    "objective": obj,
-                    "core_skills": skills,
-                    "education": json.loads(edu_json),
-                    "experience": json.loads(exp_json),
-                    "projects": json.loads(proj_json),
-                    "publications": json.loads(pub_json),
-                    "awards": json.loads(awards_json),
-                    "scholarship": scholarship,
-                    "languages": languages,
-                    "references": json.loads(ref_json),
-                    "MoU": mo_u
-                }
+                    contact=re.sub(r'[\{\}\[\]"\']|email:|phone:', '', contact).strip(),
+                    address=address,
+                    objective=obj,
+                    core_skills=skills,
+                    education=edu_json,
+                    experience=exp_json,
+                    projects=proj_json,
+                    publications=pub_json,
+                    awards=awards_json,
+                    scholarship=scholarship,
+                    languages=languages,
+                    references=ref_json,
+                    MoU=mo_u
+                )
+                changed = final_data.diff(resume)
+                if changed: st.toast(f"Updated: {', '.join(changed)}")
+                session['resume'] = final_data
                 
-                # CALL CREATOR WITH SELECTED TEMPLATE
-                st.session_state.pdf_bytes = create_pdf(final_data, template_option)
+                # CALL CREATOR WITH SELECTED TEMPLATE (or all of them at once)
+                # ReportLab's platypus stack is imported on the first render, not on first page paint
+                from pdf_generator import create_pdf, render_all_templates
+                with METRICS.span("render", mode="all" if compare_all else "single"):
+                    if compare_all:
+                        renders = render_all_templates(final_data, executor=get_render_pool(),
+                                                       cache=get_render_cache(), fit_pages=fit_pages)
+                        store_renders(renders)
+                        session['pdf_bytes'] = None
+                        pdf_bytes = renders[template_option]['pdf']
+                    else:
+                        store_renders(None)
+                        pdf_bytes, _ = get_render_cache().get_or_render(
+                            final_data, template_option, lambda d, t: create_pdf(d, t, fit_pages),
+                            variant=f"fit{fit_pages}" if fit_pages else "")
+                        session['pdf_bytes'] = pdf_bytes
+                if fit_pages:
+                    from extraction import count_pdf_pages
+                    pages = count_pdf_pages(pdf_bytes)
+                    if pages > fit_pages:
+                        st.warning(f"Even at the smallest readable size this CV needs {pages} pages. "
+                                   f"Trim some content to fit {fit_pages}.")
                 
             except Exception as e:
                 st.error(f"Error generating PDF: {e}")
 
+    # Switching templates reuses the side-by-side renders, no rebuild needed. Only the
+    # selected template's PDF and preview are loaded: whatever reaches a widget is
+    # also held in Streamlit's own media store for this session
+    rendered = session.get('render_templates') or []
+    if template_option in rendered:
+        pdf_bytes = session.get(f'pdf:{template_option}')
+        preview = session.get(f'preview:{template_option}')
+    else:
+        pdf_bytes, preview = session.get('pdf_bytes'), None
+    
     # DOWNLOAD BUTTON
-    if st.session_state.pdf_bytes:
+    if pdf_bytes:
         st.success(f"Template Ready: {template_option}")
         st.download_button(
             label="📥 Download PDF", 
-            data=st.session_state.pdf_bytes, 
+            data=pdf_bytes, 
             file_name=f"Professional_Resume_{template_option.replace(' ', '_')}.pdf", 
             mime="application/pdf"
         )
+    
+    # SIDE-BY-SIDE TEMPLATES (one preview at a time; the others are a click away)
+    if rendered:
+        st.subheader("🖼️ All Templates")
+        cols = st.columns(len(rendered))
+        for col, t_name in zip(cols, rendered):
+            with col:
+                st.markdown(f"**{t_name}**")
+                if t_name == template_option:
+                    if preview: st.image(preview, use_container_width=True)
+                    st.caption("Selected: download above")
+                else:
+                    st.button("👁️ Preview", key=f"preview_{t_name}", on_click=select_template, args=(t_name,))
+
+    # ATS KEYWORD MATCH (numpy/scipy are only imported once a job description is pasted)
+    with st.expander("🎯 ATS keyword match"):
+        job_text = st.text_area("Paste a job description", key="job_description", height=150)
+        if job_text.strip():
+            from ats_score import score_matrix
+            report = score_matrix([session['resume']], [job_text]).report(0, 0)
+            wanted = len(report['matched']) + len(report['missing'])
+            st.metric("Keyword coverage", f"{len(report['matched'])} / {wanted}")
+            st.markdown("**Missing:** " + (", ".join(m['keyword'] for m in report['missing'][:20]) or "none"))
+            st.caption("Matched: " + ", ".join(m['keyword'] for m in report['matched'][:20]))
@@ -0,0 +1,247 @@
+"""ATS keyword matching of many resumes against many job descriptions.
+
+    result = score_matrix(resumes, job_texts)     # BM25; method="tfidf" for cosine similarity
+    result.scores                                 # (n_resumes, n_jobs) array
+    result.coverage                               # share of each job's keyword weight found in each resume
+    result.top(j, k=10)                           # best resume indices for job j
+    result.report(i, j)                           # matched / missing keywords for one pair
+
+Resumes contribute what an ATS reads as skills and evidence: core_skills,
+experience bullets and project tech. Job descriptions are plain text. Both
+are tokenized into one vocabulary (words plus two-word phrases) and held as
+sparse term-count matrices, so scoring every pair is a single sparse product.
+
+    python ats_score.py out/*.json --jobs jobs/ --top 5
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+from metrics import METRICS
+
+# Keeps c++, c#, node.js, .net-style tokens together
+TOKEN = re.compile(r"[a-z0-9+#][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*")
+# Phrases never span list separators or sentence ends
+SEGMENT = re.compile(r"[,;|•·\n()\[\]/]+|\.\s+|\.$")
+
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could do does
+during each etc for from had has have having he her his how i if in into is it its may more most must
+my no not of on or our out over per she should so some such than that the their them then there these
+they this those through to under up us use used using via was we well were what when where which while
+who will with within without would you your
+ability able candidate candidates degree etc excellent experience experienced good great ideal including
+job knowledge looking plus preferred required requirements responsibilities responsible role skills
+strong team work working years year
+""".split())
+
+K1 = 1.2
+B = 0.75
+
+
+# ==========================================
+# 1. TOKENIZING
+# ==========================================
+
+def tokenize(text, bigrams=True):
+    """Lowercased keywords of `text`, plus adjacent keyword pairs within a phrase."""
+    tokens = []
+    for segment in SEGMENT.split(text.lower()):
+        words = TOKEN.findall(segment)
+        keep = [not (w in STOPWORDS or w.isdigit()) for w in words]
+        tokens.extend(w for w, k in zip(words, keep) if k)
+        if bigrams:
+            tokens.extend(f"{a} {b}" for a, b, ka, kb in zip(words, words[1:], keep, keep[1:]) if ka and kb)
+    return tokens
+
+def resume_tokens(data, bigrams=True):
+    """Keywords from core_skills, experience bullets and project tech (dict or Resume)."""
+    if hasattr(data, "to_dict"): data = data.to_dict()
+    parts = [data.get("core_skills") or ""]
+    for job in data.get("experience") or []:
+        parts.extend(job.get("bullets") or [])
+    for project in data.get("projects") or []:
+        parts.append(project.get("tech") or "")
+    # One string, one regex pass: the newlines keep phrases from spanning fields
+    return tokenize("\n".join(str(p) for p in parts), bigrams)
+
+def _count_rows(token_lists, vocab):
+    """CSR (data, indices, indptr) of term counts; grows `vocab` with unseen tokens."""
+    data = []
+    indices = []
+    indptr = [0]
+    for tokens in token_lists:
+        counts = Counter(tokens)
+        for term in counts.keys() - vocab.keys():
+            vocab[term] = len(vocab)
+        indices.extend(map(vocab.__getitem__, counts))
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    return data, indices, indptr
+
+def _to_csr(rows, n_terms):
+    data, indices, indptr = rows
+    counts = sparse.csr_matrix((np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32),
+                                np.asarray(indptr, dtype=np.int64)), shape=(len(indptr) - 1, n_terms))
+    counts.sort_indices()
+    return counts
+
+
+# ==========================================
+# 2. SCORING
+# ==========================================
+
+def _bm25_weights(counts, k1=K1, b=B):
+    """Per-entry BM25 term weights of a document-term count matrix."""
+    doc_len = np.asarray(counts.sum(axis=1)).ravel()
+    norm = k1 * (1 - b + b * doc_len / (doc_len.mean() or 1.0))
+    rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+    weights = counts.copy()
+    weights.data = counts.data * (k1 + 1) / (counts.data + norm[rows])
+    return weights
+
+def _l2_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+def _binary(matrix, values=None):
+    out = matrix.copy()
+    out.data = np.ones_like(out.data) if values is None else values[out.indices]
+    return out
+
+
+class MatchResult:
+    """Scores and keyword coverage for every (resume, job) pair."""
+
+    def __init__(self, scores, coverage, resume_terms, job_terms, keyword_weights, vocabulary):
+        self.scores = scores
+        self.coverage = coverage
+        self.keyword_weights = keyword_weights   # per-term weight used for coverage (BM25 idf)
+        self.vocabulary = vocabulary              # term id -> keyword
+        self._resume_terms = resume_terms
+        self._job_terms = job_terms
+
+    def top(self, job, k=10):
+        """Indices of the k best-scoring resumes for `job`, best first."""
+        column = self.scores[:, job]
+        k = min(k, len(column))
+        best = np.argpartition(-column, k - 1)[:k] if k < len(column) else np.arange(len(column))
+        return best[np.argsort(-column[best], kind="stable")].tolist()
+
+    def report(self, resume, job, limit=None):
+        """Matched and missing job keywords for one pair, heaviest first."""
+        r = self._resume_terms
+        j = self._job_terms
+        have = dict(zip(r.indices[r.indptr[resume]:r.indptr[resume + 1]].tolist(),
+                        r.data[r.indptr[resume]:r.indptr[resume + 1]].tolist()))
+        wanted = j.indices[j.indptr[job]:j.indptr[job + 1]]
+        wanted = wanted[np.argsort(-self.keyword_weights[wanted], kind="stable")].tolist()
+        matched = [{"keyword": self.vocabulary[t], "weight": round(float(self.keyword_weights[t]), 3),
+                    "count": int(have[t])} for t in wanted if t in have]
+        missing = [{"keyword": self.vocabulary[t], "weight": round(float(self.keyword_weights[t]), 3)}
+                   for t in wanted if t not in have]
+        return {"score": float(self.scores[resume, job]), "coverage": float(self.coverage[resume, job]),
+                "matched": matched[:limit], "missing": missing[:limit]}
+
+
+def score_matrix(resumes, jobs, method="bm25", bigrams=True):
+    """Scores every resume against every job description.
+
+    `resumes` are resume_data dicts or Resume objects, `jobs` are strings.
+    BM25 treats resumes as the collection and each job as a query; "tfidf"
+    is cosine similarity of sublinear TF-IDF vectors. Coverage is method
+    independent: the idf-weighted share of a job's keywords the resume has.
+    """
+    if method not in ("bm25", "tfidf"): raise ValueError(f"unknown method {method!r}")
+    with METRICS.span("ats_score", method=method):
+        vocab = {}
+        resume_rows = _count_rows((resume_tokens(r, bigrams) for r in resumes), vocab)
+        job_rows = _count_rows((tokenize(t, bigrams) for t in jobs), vocab)
+        R = _to_csr(resume_rows, len(vocab))
+        J = _to_csr(job_rows, len(vocab))
+
+        n = max(R.shape[0], 1)
+        df = np.bincount(R.indices, minlength=len(vocab))
+        idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        query = _binary(J, idf)
+        if method == "bm25":
+            scores = (_bm25_weights(R) @ query.T).toarray()
+        else:
+            df_all = df + np.bincount(J.indices, minlength=len(vocab))
+            tfidf_idf = np.log((1 + n + J.shape[0]) / (1 + df_all)) + 1
+
+            def vectors(counts):
+                out = counts.copy()
+                out.data = (1 + np.log(out.data)) * tfidf_idf[out.indices]
+                return _l2_rows(out)
+            scores = (vectors(R) @ vectors(J).T).toarray()
+
+        job_weight = np.asarray(query.sum(axis=1)).ravel()
+        job_weight[job_weight == 0] = 1.0
+        coverage = (_binary(R) @ query.T).toarray() / job_weight
+
+    vocabulary = [None] * len(vocab)
+    for term, i in vocab.items():
+        vocabulary[i] = term
+    return MatchResult(scores, coverage, R, J, idf, vocabulary)
+
+
+# ==========================================
+# 3. CLI
+# ==========================================
+
+def _expand(paths, suffixes):
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(os.path.join(path, n) for n in sorted(os.listdir(path)) if n.lower().endswith(suffixes))
+        else:
+            found.append(path)
+    return found
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank resumes against job descriptions by ATS keyword match.")
+    parser.add_argument("resumes", nargs="+", help="resume_data JSON files or folders (e.g. batch.py output)")
+    parser.add_argument("--jobs", nargs="+", required=True, help="Job description .txt/.md files or folders")
+    parser.add_argument("--method", choices=("bm25", "tfidf"), default="bm25")
+    parser.add_argument("--top", type=int, default=5, help="Resumes to list per job")
+    parser.add_argument("--keywords", type=int, default=10, help="Matched/missing keywords to list per pair")
+    parser.add_argument("--out", help="Also write the full report for the listed pairs as JSON")
+    args = parser.parse_args(argv)
+
+    resume_paths = _expand(args.resumes, (".json",))
+    job_paths = _expand(args.jobs, (".txt", ".md"))
+    if not resume_paths or not job_paths:
+        print("Need at least one resume and one job description.", file=sys.stderr)
+        return 1
+    resumes = []
+    for path in resume_paths:
+        with open(path, encoding="utf-8") as fh: resumes.append(json.load(fh))
+    jobs = []
+    for path in job_paths:
+        with open(path, encoding="utf-8") as fh: jobs.append(fh.read())
+
+    result = score_matrix(resumes, jobs, args.method)
+    report = {}
+    for j, job_path in enumerate(job_paths):
+        print(f"\n{os.path.basename(job_path)}")
+        rows = report[job_path] = []
+        for i in result.top(j, args.top):
+            pair = result.report(i, j, args.keywords)
+            rows.append(dict(pair, resume=resume_paths[i]))
+            print(f"  {pair['score']:7.3f}  {pair['coverage']:5.0%}  {os.path.basename(resume_paths[i])}"
+                  f"  missing: {', '.join(m['keyword'] for m in pair['missing']) or '-'}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh: json.dump(report, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""Headless batch conversion of resume PDFs.
+
+Usage:
+    python batch.py resumes/ -o out/ -t "Ivy League" -t "Executive"
+    python batch.py manifest.txt -o out/ --workers 8 --llm-concurrency 4
+
+pdfminer extraction and ReportLab rendering run in a process pool, the
+Gemini calls go through the async LLM client (bounded concurrency, rate
+limit, retries). `--fake-llm` swaps in the offline backend for load tests.
+For every input `cv.pdf` the output directory gets `cv.json` plus one
+`cv__<Template>.pdf` per template.
+Finished documents are skipped on re-run, so an interrupted batch resumes
+where it stopped. With `--dedup`, a file whose extracted text nearly matches
+an earlier one in the batch (MinHash/LSH, see dedup.py) reuses that file's
+parse instead of paying for another LLM extraction.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from cache import ExtractionCache
+from chunked_extraction import PROMPT_FINGERPRINT, extract_chunked, extract_full
+from dedup import MinHashLSH, minhash
+from extraction import MODEL_NAME, EXTRACTION_PROMPT, iter_pdf_pages, finalize_extraction
+from fast_parser import fast_path_fingerprint, hybrid_extract
+from llm_client import AsyncLLMClient, BackgroundLoop, FakeBackend, GeminiBackend
+from normalize import normalize_text
+from pdf_generator import create_pdf
+from templates import template_names
+
+
+# ==========================================
+# 1. INPUT DISCOVERY & OUTPUT LAYOUT
+# ==========================================
+
+def discover_inputs(source):
+    """Returns PDF paths from a directory (recursive) or a manifest file (one path per line)."""
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            for fname in files:
+                if fname.lower().endswith(".pdf"):
+                    paths.append(os.path.join(root, fname))
+        return sorted(paths)
+
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line or line.startswith("#"): continue
+            paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return paths
+
+def assign_stems(paths):
+    """Maps each input to a unique output stem (duplicate file names get a numeric suffix)."""
+    seen = {}
+    stems = []
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        count = seen.get(stem, 0)
+        seen[stem] = count + 1
+        stems.append(stem if count == 0 else f"{stem}_{count + 1}")
+    return stems
+
+def template_filename(stem, template):
+    return f"{stem}__{template.replace(' ', '_')}.pdf"
+
+def write_atomic(path, payload):
+    tmp_path = f"{path}.tmp"
+    mode = "wb" if isinstance(payload, bytes) else "w"
+    with open(tmp_path, mode) as fh:
+        fh.write(payload)
+    os.replace(tmp_path, path)
+
+
+# ==========================================
+# 2. PIPELINE STAGES (top-level so they can be pickled)
+# ==========================================
+
+def _extract_stage(path, max_pages=None, signature=False):
+    text, _ = normalize_text(list(iter_pdf_pages(path, max_pages=max_pages)))
+    return text, (minhash(text) if signature else None)
+
+def _render_stage(data, template, out_path, fit_pages=None):
+    pdf_bytes = create_pdf(data, template, fit_pages)
+    write_atomic(out_path, pdf_bytes)
+    return len(pdf_bytes)
+
+async def _parse_stage(client, raw, chunked=False, fast_path=False):
+    """Returns (parsed, failed_keys, seconds)."""
+    t0 = time.perf_counter()
+    if fast_path:
+        parsed, report = await hybrid_extract(client, raw)
+        failed = report["failed"]
+    elif chunked:
+        parsed, failed = await extract_chunked(client, raw)
+    else:
+        parsed, failed = await extract_full(client, raw)
+    return parsed, failed, time.perf_counter() - t0
+
+
+# ==========================================
+# 3. BATCH RUNNER
+# ==========================================
+
+def run_batch(paths, out_dir, templates, client, workers=None, cache=None, max_pages=None,
+              chunked=False, fast_path=False, dedup_threshold=None, fit_pages=None, log=print):
+    """Runs the pipeline; `client` is an AsyncLLMClient (its semaphore bounds LLM concurrency).
+
+    With `dedup_threshold` (estimated Jaccard similarity of the extracted
+    text), near-duplicates of a document already parsed in this batch reuse
+    its structured result; ones found while it is still parsing wait for it.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    stats = {"documents": len(paths), "skipped": 0, "extracted": 0, "cache_hits": 0,
+             "near_duplicates": 0, "parsed": 0, "partial": 0, "rendered": 0, "failed": 0, "output_bytes": 0,
+             "extract_seconds": 0.0, "llm_seconds": 0.0}
+    lsh = MinHashLSH(dedup_threshold) if dedup_threshold else None
+    originals = {}   # LSH key -> job whose parse near-duplicates reuse
+    started = time.perf_counter()
+
+    jobs = []
+    for path, stem in zip(paths, assign_stems(paths)):
+        json_path = os.path.join(out_dir, f"{stem}.json")
+        pdf_paths = {t: os.path.join(out_dir, template_filename(stem, t)) for t in templates}
+        missing = [t for t, p in pdf_paths.items() if not os.path.exists(p)]
+        if os.path.exists(json_path) and not missing:
+            stats["skipped"] += 1
+            continue
+        jobs.append({"path": path, "stem": stem, "json_path": json_path,
+                     "pdf_paths": pdf_paths, "missing": missing})
+
+    if fast_path: prompt_id = fast_path_fingerprint()
+    else: prompt_id = PROMPT_FINGERPRINT if chunked else EXTRACTION_PROMPT
+    # Spawned, not forked: the LLM loop's thread (and any other) would leave forked children with held locks
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as procs:
+        llm_loop = BackgroundLoop()
+        # future -> (stage, job); every stage feeds the next as soon as it completes
+        pending = {}
+
+        def start_render(job, data):
+            for t in job["missing"]:
+                pending[procs.submit(_render_stage, data, t, job["pdf_paths"][t], fit_pages)] = ("render", job)
+
+        def save_and_render(job, data):
+            write_atomic(job["json_path"], json.dumps(data, indent=2))
+            start_render(job, data)
+
+        def start_parse(job):
+            pending[llm_loop.submit(_parse_stage(client, job["raw"], chunked, fast_path))] = ("llm", job)
+
+        def parse_failed(job):
+            # Waiting duplicates can't reuse a failed parse; they get their own LLM call
+            job["failed"] = True
+            for follower in job.pop("followers", []):
+                start_parse(follower)
+
+        for job in jobs:
+            # Resume: the JSON is already on disk, only the missing templates need rendering
+            if os.path.exists(job["json_path"]):
+                with open(job["json_path"], "r", encoding="utf-8") as fh:
+                    start_render(job, json.load(fh))
+                continue
+
+            with open(job["path"], "rb") as fh:
+                job["cache_key"] = ExtractionCache.make_key(fh.read(), prompt_id, MODEL_NAME, max_pages=max_pages)
+            cached = cache.get(job["cache_key"]) if cache else None
+            if cached:
+                stats["cache_hits"] += 1
+                save_and_render(job, finalize_extraction(cached["data"], cached["raw"]))
+                continue
+
+            job["t0"] = time.perf_counter()
+            pending[procs.submit(_extract_stage, job["path"], max_pages, lsh is not None)] = ("extract", job)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                stage, job = pending.pop(fut)
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    stats["failed"] += 1
+                    log(f"[{stage}] {job['path']}: {e}")
+                    if stage == "llm": parse_failed(job)
+                    continue
+
+                if stage == "extract":
+                    stats["extracted"] += 1
+                    stats["extract_seconds"] += time.perf_counter() - job["t0"]
+                    job["raw"], signature = result
+                    match = lsh.query(signature) if lsh is not None else None
+                    if match is None:
+                        if lsh is not None:
+                            lsh.insert(job["stem"], signature)
+                            originals[job["stem"]] = job
+                        start_parse(job)
+                        continue
+                    original = originals[match[0]]
+                    stats["near_duplicates"] += 1
+                    log(f"[dedup] {job['path']} ~ {original['path']} (similarity {match[1]:.2f}), reusing its parse")
+                    if "parsed" in original:
+                        save_and_render(job, finalize_extraction(original["parsed"], job["raw"]))
+                    elif original.get("failed"):
+                        start_parse(job)
+                    else:
+                        original.setdefault("followers", []).append(job)
+
+                elif stage == "llm":
+                    parsed, failed_keys, elapsed = result
+                    stats["llm_seconds"] += elapsed
+                    if not parsed:
+                        stats["failed"] += 1
+                        log(f"[llm] {job['path']}: model returned no usable JSON")
+                        parse_failed(job)
+                        continue
+                    stats["parsed"] += 1
+                    job["parsed"] = parsed
+                    # Like the app: only complete parses are cached, so a partial one is retried next run
+                    if failed_keys:
+                        stats["partial"] += 1
+                        log(f"[llm] {job['path']}: could not parse {', '.join(failed_keys)}")
+                    elif cache:
+                        cache.put(job["cache_key"], job["raw"], parsed)
+                    save_and_render(job, finalize_extraction(parsed, job["raw"]))
+                    for follower in job.pop("followers", []):
+                        save_and_render(follower, finalize_extraction(parsed, follower["raw"]))
+
+                else:
+                    stats["rendered"] += 1
+                    stats["output_bytes"] += result
+
+    llm_loop.close()
+    stats["llm_retries"] = client.retries
+    stats["wall_seconds"] = time.perf_counter() - started
+    processed = len(jobs)
+    stats["docs_per_second"] = processed / stats["wall_seconds"] if stats["wall_seconds"] else 0.0
+    return stats
+
+def format_stats(stats):
+    return (
+        f"{stats['documents']} documents ({stats['skipped']} already done, {stats['cache_hits']} cache hits, "
+        f"{stats['near_duplicates']} near-duplicates), "
+        f"{stats['parsed']} parsed ({stats['partial']} partly), {stats['rendered']} PDFs rendered, "
+        f"{stats['failed']} failures\n"
+        f"wall {stats['wall_seconds']:.1f}s | {stats['docs_per_second']:.2f} docs/s | "
+        f"extract {stats['extract_seconds']:.1f}s sum | llm {stats['llm_seconds']:.1f}s sum, {stats['llm_retries']} retries | "
+        f"{stats['output_bytes'] / 1024:.0f} KiB written"
+    )
+
+
+# ==========================================
+# 4. CLI
+# ==========================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a folder or manifest of resume PDFs to ATS templates.")
+    parser.add_argument("source", help="Directory of PDFs or a manifest file with one path per line")
+    parser.add_argument("-o", "--out", required=True, help="Output directory for JSON and PDFs")
+    parser.add_argument("-t", "--template", action="append", choices=template_names(),
+                        help="Template to render (repeatable, default: all)")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Max in-flight Gemini calls")
+    parser.add_argument("--llm-rate", type=float, default=None, help="Max Gemini requests per second")
+    parser.add_argument("--chunked", action="store_true", help="Section-parallel extraction prompts")
+    parser.add_argument("--fast-path", action="store_true",
+                        help="Parse locally first; only low-confidence sections go to the LLM")
+    parser.add_argument("--dedup", nargs="?", type=float, const=0.9, default=None, metavar="THRESHOLD",
+                        help="Reuse the parse of near-duplicate documents (text similarity, default 0.9)")
+    parser.add_argument("--fit-pages", type=int, default=None, metavar="N",
+                        help="Scale fonts and spacing down (to 80%% at most) so each CV fits on N pages")
+    parser.add_argument("--fake-llm", action="store_true", help="Use the deterministic offline backend")
+    parser.add_argument("--max-pages", type=int, default=None, help="Only extract the first N pages of each PDF")
+    parser.add_argument("--cache-dir", default=os.environ.get("RESUME_CACHE_DIR"),
+                        help="On-disk extraction cache shared with the app")
+    args = parser.parse_args(argv)
+
+    if args.fake_llm:
+        backend = FakeBackend()
+    else:
+        api_key = os.environ.get("GEMINI_API_KEY")
+        if not api_key:
+            print("GEMINI_API_KEY is not set.", file=sys.stderr)
+            return 2
+        backend = GeminiBackend(api_key)
+    client = AsyncLLMClient(backend, max_concurrency=args.llm_concurrency,
+                            rate_per_second=args.llm_rate)
+
+    paths = discover_inputs(args.source)
+    if not paths:
+        print(f"No PDFs found in {args.source}", file=sys.stderr)
+        return 1
+
+    cache = ExtractionCache(disk_dir=args.cache_dir) if args.cache_dir else None
+    stats = run_batch(paths, args.out, args.template or list(template_names()), client,
+                      workers=args.workers, cache=cache, max_pages=args.max_pages,
+                      chunked=args.chunked, fast_path=args.fast_path, dedup_threshold=args.dedup,
+                      fit_pages=args.fit_pages, log=lambda msg: print(msg, file=sys.stderr))
+    print(format_stats(stats))
+    return 0 if stats["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
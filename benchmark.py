@@ -0,0 +1,359 @@
+"""Benchmarks for every pipeline stage on a synthetic resume corpus.
+
+    python benchmark.py                          # print a summary table
+    python benchmark.py --out bench.json         # also write machine-readable results
+    python benchmark.py --compare old.json       # show ratios against an earlier run
+    python benchmark.py --startup                # also time cold start in fresh interpreters
+    python benchmark.py --ats 2000x20            # also time ATS scoring of 2000 resumes x 20 jobs
+    python benchmark.py --entities 5000          # also time the entity scan over a 5000-document batch
+
+The corpus is generated deterministically (--seed) at several sizes, from a
+1-page CV up to a 20-page academic CV with hundreds of publications. Source
+PDFs are produced with create_pdf, so no fixtures are needed. The LLM stage
+uses the offline FakeBackend, so results measure our own code, not Gemini.
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from dedup import minhash
+from entities import scan
+from extraction import build_prompt, clean_json, extract_text_from_pdf, iter_pdf_pages, manual_entity_extraction
+from fast_parser import DEFAULT_THRESHOLD, parse_resume
+from json_stream import IncrementalJSONParser
+from llm_client import AsyncLLMClient, FakeBackend
+from normalize import normalize_text
+from pdf_generator import calculate_percentage, create_pdf, fit_pdf
+from templates import template_names
+
+
+# ==========================================
+# 1. SYNTHETIC CORPUS
+# ==========================================
+
+# Section counts per corpus size
+SIZES = {
+    "1-page":           dict(jobs=2,  bullets=2, education=1, projects=0,  publications=0,   awards=0,  references=0),
+    "2-page":           dict(jobs=3,  bullets=3, education=2, projects=2,  publications=4,   awards=2,  references=2),
+    "5-page":           dict(jobs=7,  bullets=4, education=3, projects=6,  publications=35,  awards=6,  references=3),
+    "20-page-academic": dict(jobs=12, bullets=5, education=4, projects=15, publications=270, awards=20, references=5),
+}
+
+WORDS = ("data pipeline model analysis research design system cloud python team clinical trial "
+         "survey platform service latency throughput budget stakeholder grant laboratory protein "
+         "network optimization regression deployment review curriculum students reporting").split()
+COMPANIES = ("Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises")
+UNIVERSITIES = ("MIT", "University of Dhaka", "ETH Zurich", "Stanford University", "IIT Bombay")
+DEGREES = ("BSc in Computer Science", "MSc in Biochemistry", "PhD in Physics", "MBA")
+JOURNALS = ("Nature Communications (SCI)", "IEEE Access", "Proc. of NeurIPS", "PLOS ONE")
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+def make_resume(rng, size):
+    spec = SIZES[size]
+    return {
+        "name": f"{rng.choice(['Ayesha', 'John', 'Mei', 'Carlos'])} {rng.choice(['Rahman', 'Smith', 'Chen', 'Garcia'])}",
+        "address": "Dhaka, Bangladesh",
+        "contact": f"candidate{rng.randint(1, 9999)}@example.com | (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        "objective": _sentence(rng, 30),
+        "core_skills": ", ".join(rng.sample(WORDS, 12)),
+        "experience": [{
+            "company": rng.choice(COMPANIES), "role": rng.choice(["Engineer", "Researcher", "Lead", "Analyst"]),
+            "dates": f"{2000 + i} - {2001 + i}",
+            "bullets": [_sentence(rng, 18) for _ in range(spec["bullets"])],
+        } for i in range(spec["jobs"])],
+        "education": [{
+            "university": rng.choice(UNIVERSITIES), "degree": rng.choice(DEGREES),
+            "year": str(1995 + 4 * i), "grade": f"{rng.uniform(2.5, 4.0):.2f}/4.00",
+        } for i in range(spec["education"])],
+        "projects": [{
+            "name": f"Project {i}", "tech": ", ".join(rng.sample(WORDS, 3)), "role": rng.choice(["PI", "Co-I", ""]),
+            "bullets": [_sentence(rng, 14) for _ in range(2)],
+        } for i in range(spec["projects"])],
+        "publications": [{
+            "title": _sentence(rng, 12), "journal": rng.choice(JOURNALS), "year": str(rng.randint(2005, 2025)),
+        } for _ in range(spec["publications"])],
+        "awards": [{"name": _sentence(rng, 4), "year": str(rng.randint(2000, 2025))} for _ in range(spec["awards"])],
+        "scholarship": _sentence(rng, 10),
+        "languages": "English, Bengali",
+        "references": [{
+            "name": f"Dr. Reference {i}", "title": "Professor, " + rng.choice(UNIVERSITIES),
+            "contact": f"ref{i}@example.edu",
+        } for i in range(spec["references"])],
+        "MoU": "",
+    }
+
+def add_page_furniture(pages, data):
+    """Adds the running header/footer and repeated contact line many real CVs carry."""
+    total = len(pages)
+    return [f"{data['name']} - Curriculum Vitae\n{data['contact']}\n\n{text}\nPage {i + 1} of {total}\n"
+            for i, text in enumerate(pages)]
+
+def build_corpus(seed=0, sizes=None):
+    rng = random.Random(seed)
+    corpus = []
+    for size in sizes or SIZES:
+        data = make_resume(rng, size)
+        corpus.append({"size": size, "data": data, "pdf": create_pdf(data, "Classic Serif")})
+    return corpus
+
+
+# ==========================================
+# 2. MEASUREMENT
+# ==========================================
+
+def measure(fn, repeat=5):
+    """Median/min wall time over `repeat` runs, then one extra run for peak traced memory."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"median_ms": statistics.median(timings) * 1000, "min_ms": min(timings) * 1000,
+            "peak_kib": peak / 1024, "repeat": repeat}
+
+def stub_llm(data):
+    """Fake LLM that answers with the known resume JSON wrapped in a code fence."""
+    response = "```json\n" + json.dumps(data) + "\n```"
+    client = AsyncLLMClient(FakeBackend(latency=0, jitter=0, response_fn=lambda prompt: response))
+    return lambda raw: clean_json(client.generate_sync(build_prompt(raw)))
+
+def stream_parse(response, chunk_size=64):
+    """Feeds the response to the incremental parser the way a streamed reply arrives."""
+    parser = IncrementalJSONParser()
+    for i in range(0, len(response), chunk_size):
+        parser.feed(response[i:i + chunk_size])
+    return parser.result
+
+def bench_document(doc, templates, repeat):
+    """Runs every stage on one corpus document; yields result rows."""
+    data, pdf = doc["data"], doc["pdf"]
+    raw = extract_text_from_pdf(pdf)
+    llm_response = "```json\n" + json.dumps(data) + "\n```"
+    grades = [e["grade"] for e in data["education"]] * 50
+    parse = stub_llm(data)
+
+    stages = {
+        "extract_text_from_pdf": lambda: extract_text_from_pdf(pdf),
+        "manual_entity_extraction": lambda: manual_entity_extraction(raw),
+        "entities.scan": lambda: scan(raw),
+        "minhash_signature": lambda: minhash(raw),
+        "clean_json": lambda: clean_json(llm_response),
+        "clean_json[truncated_reply]": lambda: clean_json(llm_response[:len(llm_response) // 2]),
+        "json_stream_64b_chunks": lambda: stream_parse(llm_response),
+        "llm_stub_roundtrip": lambda: parse(raw),
+        "calculate_percentage_x50": lambda: [calculate_percentage(g) for g in grades],
+    }
+    base = {"size": doc["size"], "pdf_bytes": len(pdf), "raw_chars": len(raw)}
+    for stage, fn in stages.items():
+        yield dict(base, stage=stage, template=None, **measure(fn, repeat))
+
+    # Prompt-size savings from normalization, on the clean text and with page furniture added
+    pages = list(iter_pdf_pages(pdf))
+    for variant, variant_pages in (("clean", pages), ("headers_footers", add_page_furniture(pages, data))):
+        _, report = normalize_text(variant_pages)
+        yield dict(base, stage=f"normalize_text[{variant}]", template=None,
+                   **measure(lambda: normalize_text(variant_pages), repeat), **report)
+
+    # Rule-based parse: how many sections would skip the LLM entirely
+    text, _ = normalize_text(pages)
+    _, confidences, _ = parse_resume(text)
+    local = sum(1 for c in confidences.values() if c >= DEFAULT_THRESHOLD)
+    yield dict(base, stage="fast_parser.parse_resume", template=None, **measure(lambda: parse_resume(text), repeat),
+               sections_local=local, sections_total=len(confidences))
+    for template in templates:
+        yield dict(base, stage="create_pdf", template=template, **measure(lambda: create_pdf(data, template), repeat))
+    # Fit-to-one-page: layout passes to find the scale plus the one real build
+    _, fit = fit_pdf(data, templates[0], 1)
+    yield dict(base, stage="fit_pdf[1_page]", template=templates[0],
+               **measure(lambda: fit_pdf(data, templates[0], 1), repeat), **fit)
+
+
+def app_imports():
+    """This repo's modules that app.py imports at top level, i.e. before its first paint."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(root, "app.py"), encoding="utf-8") as fh:
+        tree = ast.parse(fh.read())
+    names = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import): names.update(a.name.split(".")[0] for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level: names.add(node.module.split(".")[0])
+    # Streamlit and other third-party imports are not ours to measure
+    return sorted(n for n in names if os.path.exists(os.path.join(root, n + ".py")))
+
+# What each app phase imports/does on top of the previous one. Measured in a
+# fresh interpreter, like the first request on a newly scaled-up container.
+STARTUP_PHASES = {
+    "first_paint": f"import {', '.join(app_imports())}; templates.template_names()",
+    "first_extract": "extraction.extract_text_from_pdf(PDF_PATH)",
+    "first_render": "import pdf_generator; pdf_generator.create_pdf(DATA, 'Classic Serif')",
+}
+
+_STARTUP_CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+PDF_PATH, DATA = {pdf_path!r}, json.loads({data!r})
+timings = {{}}
+for phase, code in {phases!r}:
+    t0 = time.perf_counter()
+    exec(code)
+    timings[phase] = (time.perf_counter() - t0) * 1000
+# A Streamlit rerun re-executes the script with every module already imported
+t0 = time.perf_counter()
+exec({phases!r}[0][1])
+timings["rerun"] = (time.perf_counter() - t0) * 1000
+print(json.dumps({{"ms": timings, "maxrss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+def bench_startup(doc, repeat):
+    """Cold-start cost per phase, median over `repeat` fresh interpreters."""
+    fd, pdf_path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(fd, "wb") as fh: fh.write(doc["pdf"])
+    try:
+        code = _STARTUP_CHILD.format(root=os.path.dirname(os.path.abspath(__file__)), pdf_path=pdf_path,
+                                     data=json.dumps(doc["data"]), phases=list(STARTUP_PHASES.items()))
+        runs = [json.loads(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                          check=True).stdout) for _ in range(repeat)]
+    finally:
+        os.unlink(pdf_path)
+    peak = statistics.median(r["maxrss_kib"] for r in runs)
+    for phase in list(STARTUP_PHASES) + ["rerun"]:
+        timings = [r["ms"][phase] for r in runs]
+        yield {"size": "cold-process", "stage": f"startup[{phase}]", "template": None,
+               "median_ms": statistics.median(timings), "min_ms": min(timings),
+               "peak_kib": peak, "repeat": repeat}
+
+def bench_ats(seed, shape, repeat):
+    """Scores a synthetic batch of resumes against job descriptions, both methods."""
+    from ats_score import score_matrix
+    n_resumes, n_jobs = (int(x) for x in shape.lower().split("x"))
+    rng = random.Random(seed)
+    resumes = [make_resume(rng, rng.choice(("1-page", "2-page", "5-page"))) for _ in range(n_resumes)]
+    jobs = [" ".join(rng.sample(WORDS, 20)) + ". " + _sentence(rng, 40) for _ in range(n_jobs)]
+    for method in ("bm25", "tfidf"):
+        result = score_matrix(resumes, jobs, method)
+        yield {"size": shape, "stage": f"ats_score[{method}]", "template": None,
+               **measure(lambda: score_matrix(resumes, jobs, method), repeat)}
+    yield {"size": shape, "stage": "ats_report[top10_per_job]", "template": None,
+           **measure(lambda: [result.report(i, j) for j in range(n_jobs) for i in result.top(j, 10)], repeat)}
+
+def resume_text(data):
+    """Plain text laid out like extracted CV text, without the cost of a PDF round trip."""
+    lines = [data["name"], f"{data['address']} | {data['contact']}", data["objective"], data["core_skills"]]
+    for job in data["experience"]:
+        lines.append(f"{job['role']}, {job['company']}  {job['dates']}")
+        lines.extend(f"• {b}" for b in job["bullets"])
+    for edu in data["education"]:
+        lines.append(f"{edu['degree']}, {edu['university']}, {edu['year']}  GPA: {edu['grade']}")
+    for pub in data["publications"]:
+        lines.append(f"{pub['title']} {pub['journal']}, {pub['year']}")
+    for ref in data["references"]:
+        lines.append(f"{ref['name']}, {ref['title']}, {ref['contact']}")
+    return "\n".join(lines)
+
+def bench_entities(seed, count, repeat):
+    """Entity scan over a synthetic batch, the way batch mode runs it on every document."""
+    rng = random.Random(seed)
+    texts = [resume_text(make_resume(rng, rng.choice(("1-page", "2-page", "5-page")))) for _ in range(count)]
+    chars = sum(map(len, texts))
+    row = measure(lambda: [scan(t) for t in texts], repeat)
+    yield {"size": f"{count}-docs", "stage": "entities.scan[batch]", "template": None, **row,
+           "docs_per_s": count / (row["median_ms"] / 1000), "mb_per_s": chars / 1e6 / (row["median_ms"] / 1000),
+           "entities": sum(len(scan(t)) for t in texts)}
+
+
+# ==========================================
+# 3. REPORTING
+# ==========================================
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def row_key(row):
+    return f"{row['stage']}|{row['size']}|{row['template'] or ''}"
+
+def format_table(rows, baseline=None):
+    old = {row_key(r): r for r in (baseline or {}).get("results", [])}
+    lines = [f"{'stage':<34} {'size':<18} {'template':<14} {'median ms':>10} {'peak KiB':>10}" +
+             (f" {'vs base':>8}" if baseline else "")]
+    for r in rows:
+        line = f"{r['stage']:<34} {r['size']:<18} {(r['template'] or '-'):<14} {r['median_ms']:>10.2f} {r['peak_kib']:>10.0f}"
+        if baseline:
+            prev = old.get(row_key(r))
+            line += f" {r['median_ms'] / prev['median_ms']:>7.2f}x" if prev and prev["median_ms"] else f" {'new':>8}"
+        if "token_savings_pct" in r:
+            line += f"  tokens {r['tokens_before']} -> {r['tokens_after']} (-{r['token_savings_pct']:.1f}%)"
+        if "sections_local" in r:
+            line += f"  {r['sections_local']}/{r['sections_total']} sections parsed locally"
+        if "docs_per_s" in r:
+            line += f"  {r['docs_per_s']:.0f} docs/s, {r['mb_per_s']:.1f} MB/s, {r['entities']} entities"
+        lines.append(line)
+    return "\n".join(lines)
+
+def run(seed=0, sizes=None, templates=None, repeat=5, startup=False, ats=None, entities=None):
+    corpus = build_corpus(seed, sizes)
+    rows = []
+    if startup:
+        rows.extend(bench_startup(corpus[0], repeat))
+    if ats:
+        rows.extend(bench_ats(seed, ats, repeat))
+    if entities:
+        rows.extend(bench_entities(seed, entities, repeat))
+    for doc in corpus:
+        rows.extend(bench_document(doc, templates or template_names(), repeat))
+    return {
+        "meta": {"revision": git_revision(), "python": platform.python_version(),
+                 "platform": platform.platform(), "seed": seed, "timestamp": time.time()},
+        "results": rows,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume pipeline stages.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--size", action="append", choices=list(SIZES), help="Corpus size (repeatable, default: all)")
+    parser.add_argument("--template", action="append", choices=template_names(), help="Template (repeatable, default: all)")
+    parser.add_argument("--out", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Earlier JSON results to compare against")
+    parser.add_argument("--startup", action="store_true",
+                        help="Also time cold start (first paint / extract / render) in fresh interpreters")
+    parser.add_argument("--ats", metavar="RESUMESxJOBS",
+                        help="Also time ATS keyword scoring of a synthetic batch, e.g. 2000x20")
+    parser.add_argument("--entities", type=int, metavar="DOCS",
+                        help="Also time the entity scan over a synthetic batch of DOCS documents")
+    args = parser.parse_args(argv)
+
+    results = run(args.seed, args.size, args.template, args.repeat, args.startup, args.ats, args.entities)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    print(format_table(results["results"], baseline))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
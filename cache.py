@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import METRICS
+
+
+# ==========================================
+# EXTRACTION CACHE (pdfminer text + parsed JSON)
+# ==========================================
+
+class ExtractionCache:
+    """Content-addressed cache for extraction results.
+
+    Entries are keyed by the SHA-256 of the uploaded PDF bytes plus the prompt,
+    model version and the page/character limits the text was read with, so a
+    change to any of them invalidates old results. Lookups
+    go to an in-memory LRU first and then to an optional on-disk tier.
+    """
+
+    def __init__(self, max_entries=256, disk_dir=None,
+                 disk_max_bytes=200 * 1024 * 1024, ttl_seconds=7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(file_bytes, prompt, model_name, doc_hash=None, max_pages=None, max_chars=None):
+        # doc_hash: SHA-256 hex digest already computed while spooling the upload
+        if doc_hash is None: doc_hash = hashlib.sha256(file_bytes).hexdigest()
+        version = f"{model_name}\x00{prompt}"
+        # A capped read has different raw text; unlimited reads keep their existing keys
+        if max_pages or max_chars: version += f"\x00{max_pages}\x00{max_chars}"
+        ver_hash = hashlib.sha256(version.encode("utf-8")).hexdigest()
+        return f"{doc_hash}-{ver_hash[:16]}"
+
+    # --- PUBLIC API ---
+    def get(self, key):
+        """Returns {"raw": str, "data": dict} or None."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry["stored_at"]):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                METRICS.inc("cache_hits_total", cache="extraction", tier="memory")
+                return {"raw": entry["raw"], "data": entry["data"]}
+            if entry is not None:
+                del self._memory[key]
+
+        entry = self._disk_get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                METRICS.inc("cache_misses_total", cache="extraction")
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._memory_put(key, entry)
+        METRICS.inc("cache_hits_total", cache="extraction", tier="disk")
+        return {"raw": entry["raw"], "data": entry["data"]}
+
+    def put(self, key, raw, data):
+        entry = {"raw": raw, "data": data, "stored_at": time.time()}
+        with self._lock:
+            self._memory_put(key, entry)
+        self._disk_put(key, entry)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.disk_dir:
+            for fname in os.listdir(self.disk_dir):
+                if fname.endswith(".json"):
+                    try: os.remove(os.path.join(self.disk_dir, fname))
+                    except OSError: pass
+
+    # --- INTERNALS ---
+    def _expired(self, stored_at):
+        return self.ttl_seconds is not None and (time.time() - stored_at) > self.ttl_seconds
+
+    def _memory_put(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _disk_get(self, key):
+        if not self.disk_dir: return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if self._expired(entry.get("stored_at", 0)):
+            try: os.remove(path)
+            except OSError: pass
+            return None
+        # Touch the file so disk eviction is least-recently-used
+        try: os.utime(path, None)
+        except OSError: pass
+        return entry
+
+    def _disk_put(self, key, entry):
+        if not self.disk_dir: return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(entry, fh)
+            os.replace(tmp_path, path)
+        except OSError:
+            try: os.remove(tmp_path)
+            except OSError: pass
+            return
+        self._disk_evict()
+
+    def _disk_evict(self):
+        files = []
+        total = 0
+        now = time.time()
+        for fname in os.listdir(self.disk_dir):
+            if not fname.endswith(".json"): continue
+            path = os.path.join(self.disk_dir, fname)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if self.ttl_seconds is not None and (now - st.st_mtime) > self.ttl_seconds:
+                try: os.remove(path)
+                except OSError: pass
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        # Oldest access first
+        files.sort()
+        for _, size, path in files:
+            if total <= self.disk_max_bytes: break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+# ==========================================
+# RENDER CACHE (finished PDFs by data hash + template)
+# ==========================================
+
+def canonical_hash(data):
+    """Stable SHA-256 of a JSON-compatible value (key order and whitespace don't matter)."""
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def make_etag(payload):
+    return '"' + hashlib.sha256(payload).hexdigest()[:32] + '"'
+
+class RenderCache:
+    """LRU cache of rendered PDFs bounded by total bytes, shared across sessions.
+
+    Relies on create_pdf being deterministic: identical data and template
+    always produce identical bytes, so a cached entry is interchangeable
+    with a fresh render and its ETag is stable.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(data, template, variant=""):
+        # A resume_model.Resume carries its own (cached) digest of the same payload
+        digest = data.canonical_hash() if hasattr(data, "canonical_hash") else canonical_hash(data)
+        return f"{digest}:{template}:{variant}"
+
+    def get(self, key):
+        """Returns (payload, etag) or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is None:
+            METRICS.inc("cache_misses_total", cache="render")
+        else:
+            METRICS.inc("cache_hits_total", cache="render", tier="memory")
+        return entry
+
+    def put(self, key, payload):
+        etag = make_etag(payload)
+        size = len(payload)
+        if size > self.max_bytes: return etag
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None: self.total_bytes -= len(old[0])
+            self._entries[key] = (payload, etag)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+                self.evictions += 1
+        return etag
+
+    def get_or_render(self, data, template, render_fn, variant=""):
+        """Returns (payload, etag), calling render_fn(data, template) only on a miss."""
+        key = self.make_key(data, template, variant)
+        cached = self.get(key)
+        if cached is not None: return cached
+        payload = render_fn(data, template)
+        return payload, self.put(key, payload)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "bytes": self.total_bytes}
@@ -0,0 +1,140 @@
+"""Section-chunked LLM extraction.
+
+Instead of one prompt carrying the whole CV and asking for all 14 keys, the
+text is split into detected sections (sections.split_sections) and each
+section gets a small, schema-specific prompt. The prompts run concurrently
+through the AsyncLLMClient and the results are merged into the usual
+resume_data shape, so latency is bounded by the slowest section and a
+section that fails is retried on its own.
+"""
+import asyncio
+import hashlib
+
+from extraction import EXTRACTION_PROMPT, build_prompt, clean_json, empty_resume, validate_resume
+from llm_client import LLMError
+from metrics import METRICS
+from sections import split_sections
+
+# Section -> (keys the prompt returns, format rules for those keys)
+SECTION_SCHEMAS = {
+    "header": (("name", "address", "contact"),
+               '- name: The candidate\'s full name.\n'
+               '- address: City/country or postal address as a single string.\n'
+               '- contact: A single, comma or pipe-separated string containing ONLY email(s) and phone number(s). '
+               'DO NOT include structural characters like brackets, quotes, or keywords like \'email:\' or \'phone:\'.'),
+    "objective": (("objective",), "- objective: The summary / objective paragraph as a single string."),
+    "experience": (("experience",), '- experience: Array of objects with "company", "role", "dates", "bullets" (list of strings).'),
+    "education": (("education",), '- education: Array of objects with "university", "degree", "year", "grade".'),
+    "projects": (("projects",), '- projects: Array of objects with "name", "tech", "role" (e.g., PI, Co-I), "bullets".'),
+    "publications": (("publications",), '- publications: Array of objects with "title", "journal" (includes conference/SCI status), "year".'),
+    "core_skills": (("core_skills",), "- core_skills: Single comma separated string."),
+    "awards": (("awards",), '- awards: Array of objects with "name", "year".'),
+    "scholarship": (("scholarship",), "- scholarship: Single string."),
+    "languages": (("languages",), "- languages: Single comma separated string."),
+    "references": (("references",), '- references: Array of objects with "name", "title" (including affiliation), "contact" (email/phone).'),
+    "MoU": (("MoU",), "- MoU: Single string."),
+}
+
+SECTION_PROMPT = """
+You are an expert Resume Parser. The text below is one section of a resume.
+Extract it into valid JSON with exactly these keys: {keys}.
+
+Format rules for keys:
+{rules}
+
+Section Text: {text}
+"""
+
+# Part of the extraction cache key, so chunked and single-prompt results never mix. Includes
+# EXTRACTION_PROMPT because extract_chunked falls back to it for CVs with few headings.
+PROMPT_FINGERPRINT = hashlib.sha256(
+    (SECTION_PROMPT + repr(sorted(SECTION_SCHEMAS.items())) + EXTRACTION_PROMPT).encode("utf-8")).hexdigest()
+
+def build_section_prompt(section, text):
+    keys, rules = SECTION_SCHEMAS[section]
+    return (SECTION_PROMPT.replace("{keys}", ", ".join(f'"{k}"' for k in keys))
+                          .replace("{rules}", rules)
+                          .replace("{text}", text))
+
+# Resume key -> the section prompt that produces it
+KEY_SECTIONS = {k: section for section, (keys, _) in SECTION_SCHEMAS.items() for k in keys}
+
+async def extract_section(client, section, text, attempts=2):
+    """Parses one section, re-prompting only this section while some of its keys are unusable.
+
+    Returns (data, problems): data holds only the keys that validated on some
+    attempt, problems the keys that never did.
+    """
+    keys, _ = SECTION_SCHEMAS[section]
+    prompt = build_section_prompt(section, text)
+    good = {}
+    for attempt in range(attempts):
+        if attempt: METRICS.inc("section_retries_total", section=section)
+        with METRICS.span("llm_section", section=section):
+            data, problems = validate_resume(clean_json(await client.generate(prompt)), keys)
+        # A retry only fills in keys; it never overwrites one that already validated
+        good.update((k, v) for k, v in data.items() if k not in problems and k not in good)
+        if len(good) == len(keys): break
+    return good, {k: problems[k] for k in keys if k not in good}
+
+def merge_section_results(data, names, results):
+    """Folds extract_section results into data; returns the keys that could not be parsed.
+
+    Keys that validated are kept even when others in the same section failed.
+    """
+    failed = []
+    for section, result in zip(names, results):
+        if isinstance(result, LLMError):
+            failed.extend(SECTION_SCHEMAS[section][0])
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            good, problems = result
+            data.update(good)
+            failed.extend(problems)
+    if failed:
+        METRICS.inc("section_failures_total", len(failed))
+    return failed
+
+async def complete_extraction(client, raw, data, problems):
+    """Re-prompts only the sections whose keys came back missing or invalid.
+
+    A missing key whose section has no heading in the CV is left empty
+    instead of being asked for again. Returns (data, failed_keys).
+    """
+    detected = {k: v for k, v in split_sections(raw).items() if v}
+    todo = {}
+    for key, problem in problems.items():
+        section = KEY_SECTIONS[key]
+        if problem == "missing" and section not in detected: continue
+        todo.setdefault(section, detected.get(section, raw))
+    if not todo: return data, []
+
+    METRICS.inc("section_reprompts_total", len(todo))
+    names = list(todo)
+    results = await asyncio.gather(*(extract_section(client, s, todo[s]) for s in names),
+                                   return_exceptions=True)
+    data = dict(data)
+    return data, merge_section_results(data, names, results)
+
+async def extract_full(client, raw):
+    """Single-prompt extraction; a partly broken reply only costs the broken sections."""
+    data, problems = validate_resume(clean_json(await client.generate(build_prompt(raw))))
+    return await complete_extraction(client, raw, data, problems)
+
+async def extract_chunked(client, raw, min_sections=2):
+    """Returns (data, failed_keys).
+
+    Falls back to the single full-text prompt when fewer than `min_sections`
+    headings are detected, since there is nothing to parallelise.
+    """
+    sections = {k: v for k, v in split_sections(raw).items() if v and k in SECTION_SCHEMAS}
+    if len(sections) < min_sections:
+        return await extract_full(client, raw)
+
+    names = list(sections)
+    results = await asyncio.gather(*(extract_section(client, s, sections[s]) for s in names),
+                                   return_exceptions=True)
+
+    data = empty_resume()
+    return data, merge_section_results(data, names, results)
@@ -0,0 +1,96 @@
+"""Near-duplicate detection for extracted resume text (MinHash + LSH).
+
+    index = MinHashLSH(threshold=0.9)
+    sig = minhash(text)
+    match = index.query(sig)          # (key, similarity) of the closest earlier document, or None
+    index.insert("cv_v2.pdf", sig)
+
+A signature is 128 minimums of universally hashed word 5-shingles; two
+signatures agree in about the Jaccard similarity of their shingle sets. The
+index splits signatures into bands and only compares documents that share a
+whole band, so a lookup touches a handful of candidates rather than the
+whole corpus.
+"""
+import re
+import zlib
+
+import numpy as np
+
+NUM_PERM = 128
+SHINGLE_WORDS = 5
+_BLOCK = 2048
+_PRIME = np.uint64((1 << 61) - 1)
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Fixed seed: signatures must be comparable across processes and runs
+_rng = np.random.default_rng(20240611)
+_A = _rng.integers(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text, k=SHINGLE_WORDS):
+    """CRC32 hashes of the distinct k-word windows of lowercased alphanumeric text."""
+    words = _WORD.findall(text.lower())
+    if len(words) < k: words = words + [""] * (k - len(words))
+    return {zlib.crc32(" ".join(words[i:i + k]).encode("utf-8")) for i in range(len(words) - k + 1)}
+
+def minhash(text, k=SHINGLE_WORDS):
+    """uint64 signature of NUM_PERM minimums; identical texts give identical signatures."""
+    hashes = np.fromiter(shingles(text, k), dtype=np.uint64)
+    sig = np.full(NUM_PERM, _PRIME, dtype=np.uint64)
+    # a * x + b stays below 2**64 because a, b and x are all 32-bit; blocks bound
+    # the (shingles x NUM_PERM) temporary for long academic CVs
+    for i in range(0, len(hashes), _BLOCK):
+        np.minimum(sig, ((hashes[i:i + _BLOCK, None] * _A + _B) % _PRIME).min(axis=0), out=sig)
+    return sig
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+class MinHashLSH:
+    """Banded LSH index over MinHash signatures.
+
+    With `bands` bands of NUM_PERM / bands rows, a pair with Jaccard s
+    becomes a candidate with probability 1 - (1 - s**rows)**bands; the
+    defaults (16 x 8) catch s >= 0.8 almost always and s <= 0.5 rarely.
+    Candidates are then checked against `threshold` on the full signature.
+    """
+
+    def __init__(self, threshold=0.9, bands=16):
+        if NUM_PERM % bands: raise ValueError(f"bands must divide {NUM_PERM}")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _band_keys(self, sig):
+        raw = sig.tobytes()
+        step = self.rows * sig.itemsize
+        return [raw[i * step:(i + 1) * step] for i in range(self.bands)]
+
+    def insert(self, key, sig):
+        self._signatures[key] = sig
+        for bucket, band in zip(self._buckets, self._band_keys(sig)):
+            bucket.setdefault(band, []).append(key)
+
+    def candidates(self, sig):
+        """Keys sharing at least one whole band with `sig`."""
+        found = {}
+        for bucket, band in zip(self._buckets, self._band_keys(sig)):
+            found.update(dict.fromkeys(bucket.get(band, ())))
+        return found
+
+    def query(self, sig):
+        """Returns (key, similarity) of the most similar indexed document at or above threshold."""
+        best = None
+        for key in self.candidates(sig):
+            score = similarity(sig, self._signatures[key])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
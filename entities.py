@@ -0,0 +1,90 @@
+"""Single-pass scanner for the contact and résumé entities a regex can find.
+
+    for e in scan(text):               # in text order, with character offsets
+        e.kind, e.value, e.start, e.end
+    found = scan_entities(text)        # {"email": [...], "phone": [...], ...}, first occurrences first
+
+Kinds: email, phone (international formats, 9-15 digits), linkedin, github,
+orcid (the bare iD), date_range and grade (GPA/CGPA/grade values and x.xx/4.0
+style scores). Every kind is one named group of a single compiled pattern, so
+a document is walked once instead of once per kind; candidates that only look
+like a phone number (ISBNs, labelled IDs, bare digit runs) are dropped after
+the match.
+"""
+import re
+from dataclasses import dataclass
+
+KINDS = ("email", "phone", "linkedin", "github", "orcid", "date_range", "grade")
+
+MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+DATE = rf"(?:{MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+
+_PROFILE = r"(?:https?://)?(?:[a-z]{2,3}\.)?%s/[\w\-./%%]*[\w/]"
+_PHONE_PART = r"(?:\(\d{1,4}\)|\d{1,4})"
+
+# Every kind starts at the beginning of a token, so the lookbehind rejects the
+# other positions with one check, and a one-character lookahead per kind lets
+# most tokens skip most kinds. Order matters where two kinds can start at the same
+# character: emails before profile URLs, ORCID iDs and date ranges before the
+# looser phone pattern.
+_SCANNER = re.compile(r"(?<![\w.%+\-@/])(?:" + "|".join([
+    r"(?P<email>[\w.%+-]+@[\w-]+(?:\.[\w-]+)*\.[a-z]{2,}\b)",
+    "(?=[hwl])(?P<linkedin>%s)" % (_PROFILE % r"linkedin\.com"),
+    "(?=[hwg])(?P<github>%s)" % (_PROFILE % r"github\.com"),
+    r"(?=[\dho])(?P<orcid>(?:(?:https?://)?orcid\.org/|orcid(?:\s*id)?\s*:?\s*)?"
+    r"\b(?P<orcid_id>\d{4}-\d{4}-\d{4}-\d{3}[\dx])\b)",
+    rf"(?=[\djfmasond])(?P<date_range>{DATE}\s*(?:-|–|—|to|until)\s*(?:{DATE}|present|current|now|ongoing)\b)",
+    r"(?=[\dcgr])(?P<grade>(?:c?gpa|grade|result)\s*[:\-]?\s*\d{1,2}(?:\.\d{1,2})?"
+    r"(?:\s*(?:/|out\s+of)\s*\d{1,3}(?:\.\d{1,2})?|\s*%)?|\d\.\d{1,2}\s*/\s*(?:4|5|10)(?:\.0{1,2})?\b)",
+    rf"(?=[\d+(])(?P<phone>\+?{_PHONE_PART}(?:[ .\-]?{_PHONE_PART}){{2,6}}(?!\w))",
+]) + ")", re.IGNORECASE)
+
+
+@dataclass(frozen=True, slots=True)
+class Entity:
+    kind: str
+    value: str
+    start: int
+    end: int
+
+
+# Labels read just before a candidate number
+_PHONE_LABEL = re.compile(r"\b(?:tel|telephone|phone|ph|mobile|mob|cell|whatsapp|contact)\.?"
+                          r"(?:\s*(?:no\.?|number|#))?\s*[:\-]?\s*$", re.IGNORECASE)
+_ID_LABEL = re.compile(r"(?:\b(?:isbn(?:-1[03])?|issn|id|no|number|roll|reg(?:istration)?|acct|account|"
+                       r"pmid|doi)\.?|#)\s*[:\-]?\s*$", re.IGNORECASE)
+
+def _is_phone(value, before):
+    digits = "".join(c for c in value if c.isdigit())
+    # Years, date ranges and version numbers have fewer digits than a real number
+    if not (8 if value.startswith("+") else 9) <= len(digits) <= 15: return False
+    if _PHONE_LABEL.search(before): return True
+    if _ID_LABEL.search(before): return False
+    if value.startswith("+") or "(" in value: return True
+    if any(c in " .-" for c in value):
+        return not (len(digits) == 13 and digits[:3] in ("978", "979"))   # ISBN-13
+    # A bare digit run is an ID unless it has a national number's length
+    return len(digits) in (10, 11)
+
+def scan(text):
+    """Every entity in `text`, in order of appearance."""
+    found = []
+    for match in _SCANNER.finditer(text):
+        kind = match.lastgroup
+        start, end = match.span()
+        if kind == "orcid": start, end = match.span("orcid_id")
+        value = text[start:end]
+        if kind == "phone" and not _is_phone(value, text[max(0, start - 24):start]): continue
+        found.append(Entity(kind, value.strip(), start, end))
+    return found
+
+def scan_entities(text):
+    """{kind: [distinct values in order of appearance]} for every kind in KINDS."""
+    out = {kind: [] for kind in KINDS}
+    seen = set()
+    for entity in scan(text):
+        key = (entity.kind, entity.value.lower())
+        if key in seen: continue
+        seen.add(key)
+        out[entity.kind].append(entity.value)
+    return out
@@ -0,0 +1,243 @@
+import io
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from entities import scan_entities
+from json_repair import repair_json
+from metrics import METRICS
+
+
+# ==========================================
+# 1. EXTRACTION HELPERS
+# ==========================================
+# pdfminer is imported inside the functions that read PDFs: it costs ~150ms of
+# cold start, and everything else in this module (schema, prompt, JSON
+# cleanup) is needed before the first upload.
+
+def _make_laparams(laparams):
+    from pdfminer.layout import LAParams
+    if laparams is None: return LAParams()
+    if isinstance(laparams, dict): return LAParams(**laparams)
+    return laparams
+
+def _read_pages(fp, page_numbers, laparams):
+    """Runs pdfminer page by page, yielding each page's text (ends with a form feed)."""
+    from pdfminer.converter import TextConverter
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    rsrcmgr = PDFResourceManager(caching=True)
+    output = io.StringIO()
+    device = TextConverter(rsrcmgr, output, codec='utf-8', laparams=_make_laparams(laparams))
+    interpreter = PDFPageInterpreter(rsrcmgr, device)
+    try:
+        for page in PDFPage.get_pages(fp, page_numbers, caching=True):
+            interpreter.process_page(page)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+    finally:
+        device.close()
+
+def _extract_page_chunk(pdf_bytes, page_numbers, laparams):
+    # Worker-process entry point: every worker parses its own copy of the document
+    return list(_read_pages(io.BytesIO(pdf_bytes), page_numbers, laparams))
+
+def _read_bytes(source):
+    if isinstance(source, (bytes, bytearray)): return bytes(source)
+    if isinstance(source, str):
+        with open(source, 'rb') as fh: return fh.read()
+    if hasattr(source, 'seek'): source.seek(0)
+    return source.read()
+
+def count_pdf_pages(source):
+    from pdfminer.pdfpage import PDFPage
+    return sum(1 for _ in PDFPage.get_pages(io.BytesIO(_read_bytes(source)), caching=False))
+
+def iter_pdf_pages(source, max_pages=None, max_chars=None, laparams=None, workers=1, pages_per_task=2):
+    """Yields the text of each page in order, stopping at max_pages / max_chars.
+
+    `source` is a path, bytes or a binary file object. `laparams` is an LAParams
+    or a dict of its keyword arguments. With workers > 1 pages are extracted in
+    a process pool, `pages_per_task` at a time, and still yielded in page order.
+    """
+    page_numbers = range(max_pages) if max_pages else None
+    if workers and workers > 1:
+        pdf_bytes = _read_bytes(source)
+        total = count_pdf_pages(pdf_bytes)
+        if max_pages: total = min(total, max_pages)
+        chunks = [list(range(i, min(i + pages_per_task, total))) for i in range(0, total, pages_per_task)]
+        if laparams is not None and not isinstance(laparams, dict): laparams = vars(laparams)
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            results = pool.map(_extract_page_chunk, [pdf_bytes] * len(chunks), chunks, [laparams] * len(chunks))
+            pages = (text for chunk in results for text in chunk)
+            yield from _limit_chars(pages, max_chars)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return
+
+    if isinstance(source, str):
+        with open(source, 'rb') as fp:
+            yield from _limit_chars(_read_pages(fp, page_numbers, laparams), max_chars)
+        return
+    if isinstance(source, (bytes, bytearray)): source = io.BytesIO(source)
+    yield from _limit_chars(_read_pages(source, page_numbers, laparams), max_chars)
+
+def _limit_chars(pages, max_chars):
+    used = 0
+    for text in pages:
+        if max_chars is not None and used + len(text) >= max_chars:
+            yield text[:max_chars - used]
+            return
+        used += len(text)
+        yield text
+
+def extract_text_from_pdf(uploaded_file, max_pages=None, max_chars=None, laparams=None, workers=1):
+    return "".join(iter_pdf_pages(uploaded_file, max_pages=max_pages, max_chars=max_chars,
+                                  laparams=laparams, workers=workers))
+
+def manual_entity_extraction(text):
+    """One entities.scan pass: contact_string (first email | first phone) plus every kind's values."""
+    found = scan_entities(text)
+    contact_string = " | ".join(found["email"][:1] + found["phone"][:1])
+    return {"contact_string": contact_string, **found}
+
+def clean_json(text):
+    """Parses the model's JSON object, repairing trailing commas, quotes and truncation.
+
+    When the reply was cut off inside a value, the last key is dropped: its
+    value is incomplete, and a missing key gets re-asked on its own. A reply
+    that only lacks its closing brackets keeps every key.
+    """
+    try:
+        data, status = repair_json(text.replace("```json", "").replace("```", ""))
+    except ValueError:
+        METRICS.inc("json_parse_failures_total")
+        return {}
+    if not isinstance(data, dict):
+        METRICS.inc("json_parse_failures_total")
+        return {}
+    if status != "ok": METRICS.inc("json_repairs_total", kind=status)
+    if status == "truncated" and data:
+        data.pop(next(reversed(data)))
+    return data
+
+# --- EXTRACTION PROMPT (Key change for 'contact' clarification) ---
+MODEL_NAME = 'gemini-2.5-flash'
+
+# The 14 keys of resume_data; list sections default to [], the rest to ""
+RESUME_KEYS = ("name", "address", "contact", "objective", "core_skills", "education", "experience",
+               "projects", "publications", "awards", "scholarship", "languages", "references", "MoU")
+LIST_KEYS = ("education", "experience", "projects", "publications", "awards", "references")
+
+# Fields of the objects inside each list section; "bullets" is a list of strings
+ENTRY_FIELDS = {
+    "education": ("university", "degree", "year", "grade"),
+    "experience": ("company", "role", "dates", "bullets"),
+    "projects": ("name", "tech", "role", "bullets"),
+    "publications": ("title", "journal", "year"),
+    "awards": ("name", "year"),
+    "references": ("name", "title", "contact"),
+}
+
+def empty_resume():
+    return {k: ([] if k in LIST_KEYS else "") for k in RESUME_KEYS}
+
+def _as_text(value):
+    """Scalar -> str, list of scalars -> comma separated str, anything else -> None."""
+    if value is None: return ""
+    if isinstance(value, str): return value.strip()
+    if isinstance(value, (int, float)) and not isinstance(value, bool): return str(value)
+    if isinstance(value, list) and all(isinstance(v, (str, int, float)) for v in value):
+        return ", ".join(str(v).strip() for v in value if str(v).strip())
+    return None
+
+def _as_entry(section, entry):
+    if not isinstance(entry, dict): return None
+    out = {}
+    for field in ENTRY_FIELDS[section]:
+        value = entry.get(field)
+        if field == "bullets":
+            if isinstance(value, str): value = [value]
+            if value is None: value = []
+            if not isinstance(value, list): return None
+            value = [b for b in (_as_text(v) for v in value) if b]
+        else:
+            value = _as_text(value)
+            if value is None: return None
+        out[field] = value
+    return out if any(out.values()) else None
+
+def validate_resume(parsed, keys=RESUME_KEYS):
+    """Checks a parsed reply against the resume schema, salvaging what it can.
+
+    Returns (data, problems). data holds every key in `keys`: numbers become
+    strings, a skills list becomes one string, a lone object becomes a
+    one-item list, and entries with unusable fields are dropped. problems
+    maps each key that was absent or unusable to "missing" or "invalid";
+    those keys hold their empty default.
+    """
+    data = {}
+    problems = {}
+    for key in keys:
+        default = [] if key in LIST_KEYS else ""
+        if key not in parsed:
+            data[key], problems[key] = default, "missing"
+            continue
+        value = parsed[key]
+        if key not in LIST_KEYS:
+            text = _as_text(value)
+            if text is None: problems[key] = "invalid"
+            data[key] = text or ""
+            continue
+        if value is None: value = []
+        if isinstance(value, dict): value = [value]
+        if not isinstance(value, list):
+            data[key], problems[key] = default, "invalid"
+            continue
+        entries = [e for e in (_as_entry(key, v) for v in value) if e]
+        if len(entries) < len(value):
+            METRICS.inc("schema_entries_dropped_total", len(value) - len(entries), section=key)
+            if not entries: problems[key] = "invalid"
+        data[key] = entries
+    return data, problems
+
+EXTRACTION_PROMPT = """
+You are an expert Resume Parser. Extract the following details from the resume text into valid JSON format.
+Ensure ALL keys are: "name", "address", "contact", "objective", "core_skills", "education", "experience", "projects", "publications", "awards", "scholarship", "languages", "references", "MoU".
+
+Format rules for keys:
+- contact: A single, comma or pipe-separated string containing ONLY email(s) and phone number(s). DO NOT include structural characters like brackets, quotes, or keywords like 'email:' or 'phone:'. The first email and phone number found in the text are: {contacts}
+- core_skills, scholarship, languages, MoU: Single strings.
+- experience: Array of objects with "company", "role", "dates", "bullets" (list of strings).
+- education: Array of objects with "university", "degree", "year", "grade".
+- projects: Array of objects with "name", "tech", "role" (e.g., PI, Co-I), "bullets".
+- publications: Array of objects with "title", "journal" (includes conference/SCI status), "year".
+- awards: Array of objects with "name", "year".
+- references: Array of objects with "name", "title" (including affiliation), "contact" (email/phone).
+
+Resume Text: {raw}
+"""
+
+def build_prompt(raw):
+    contacts = manual_entity_extraction(raw)["contact_string"] or "none"
+    return EXTRACTION_PROMPT.replace("{contacts}", contacts).replace("{raw}", raw)
+
+
+# --- POST-PROCESSING (shared by the app and batch mode) ---
+def finalize_extraction(data, raw):
+    """Applies the contact/name fallbacks to a parsed LLM result."""
+    data = dict(data)
+    man = manual_entity_extraction(raw)
+    
+    # Fallback if manual extraction found contact info but AI didn't
+    if not data.get('contact'): 
+        data['contact'] = man.get('contact_string', '')
+    
+    # Ensure contact field is cleaned again in case the LLM returned junk
+    if data.get('contact'):
+        data['contact'] = re.sub(r'[\{\}\[\]"\']|email:|phone:', '', data['contact']).strip()
+    
+    if not data.get('name'): data['name'] = "Name Not Found"
+    return data
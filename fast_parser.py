@@ -0,0 +1,308 @@
+"""Rule-based resume parser with per-section confidence scores.
+
+Builds on the regex approach of manual_entity_extraction: sections come
+from sections.split_sections, then each section is parsed with heuristics
+for date ranges, bullet glyphs and degree/university pairs. Every section
+gets a confidence in [0, 1]; hybrid_extract() keeps the confident sections
+and only sends the rest to the LLM, so a cleanly structured CV is parsed
+in milliseconds without any network call.
+"""
+import asyncio
+import hashlib
+import re
+
+from chunked_extraction import (PROMPT_FINGERPRINT, SECTION_SCHEMAS, extract_full, extract_section,
+                                merge_section_results)
+from entities import DATE
+from extraction import empty_resume, manual_entity_extraction
+from metrics import METRICS
+from sections import split_sections
+
+DATE_RANGE = re.compile(rf"({DATE})\s*(?:-|–|—|to|until)\s*({DATE}|present|current|now|ongoing)", re.IGNORECASE)
+YEAR = re.compile(r"\b(19|20)\d{2}\b")
+TRAILING_YEAR = re.compile(r"[,(]?\s*\b((?:19|20)\d{2})\b\)?\.?$")
+PERCENT_SUFFIX = re.compile(r"\s*\(\d+(?:\.\d+)?%\)$")
+BULLET = re.compile(r"^\s*(?:\(cid:\d+\)|[•●▪◦►‣∙·\-*–])\s*")
+DEGREE = re.compile(r"\b(?:B\.?\s?Sc|M\.?\s?Sc|B\.?\s?A|M\.?\s?A|B\.?\s?S|M\.?\s?S|B\.?\s?Tech|M\.?\s?Tech|B\.?\s?E|M\.?\s?E|"
+                    r"Ph\.?\s?D|MBA|BBA|MBBS|LLB|LLM|Bachelor|Master|Doctor(?:ate)?|Diploma|Associate|HSC|SSC|A-Levels?|O-Levels?)\b",
+                    re.IGNORECASE)
+INSTITUTION = re.compile(r"\b(?:University|Universit[äé]|Institute|College|School|Academy|Polytechnic|Faculty|IIT|MIT|ETH)\b",
+                         re.IGNORECASE)
+GRADE = re.compile(r"(?:grade|gpa|cgpa|result)\s*[:\-]?\s*(.+)$|\b(\d(?:\.\d+)?\s*/\s*\d(?:\.\d+)?)\b|\b(\d{2}(?:\.\d+)?\s*%)",
+                   re.IGNORECASE)
+CONTACT = re.compile(r"@|\+?\(?\d[\d\s().-]{8,}\d|linkedin|github", re.IGNORECASE)
+SPLIT_HEAD = re.compile(r"\s+(?:\||--|–|—|at|@)\s+|,\s+")
+
+DEFAULT_THRESHOLD = 0.7
+# Bump when the heuristics change so cached fast-path results are not reused
+PARSER_VERSION = 1
+
+def fast_path_fingerprint(threshold=DEFAULT_THRESHOLD):
+    """Extraction cache key component for hybrid_extract results."""
+    return hashlib.sha256(f"{PROMPT_FINGERPRINT}|fast-path:{PARSER_VERSION}:{threshold}".encode("utf-8")).hexdigest()
+
+
+# ==========================================
+# 1. SMALL HELPERS
+# ==========================================
+
+def _blocks(text):
+    """Splits on blank lines into lists of non-empty lines."""
+    blocks, current = [], []
+    for line in text.splitlines():
+        if line.strip():
+            current.append(line.strip())
+        elif current:
+            blocks.append(current)
+            current = []
+    if current: blocks.append(current)
+    return blocks
+
+def _strip_bullet(line):
+    return BULLET.sub("", line, count=1).strip()
+
+def _is_bullet(line):
+    return bool(BULLET.match(line)) and len(_strip_bullet(line)) > 0
+
+def _flatten(text):
+    return " ".join(l.strip() for l in text.splitlines() if l.strip())
+
+def _ratio(good, total):
+    return good / total if total else 0.0
+
+
+# ==========================================
+# 2. SECTION PARSERS (each returns (value, confidence))
+# ==========================================
+
+def parse_header(text):
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    name = ""
+    for line in lines[:3]:
+        if not CONTACT.search(line) and not any(c.isdigit() for c in line) and 1 <= len(line.split()) <= 5:
+            name = line
+            break
+    contact = manual_entity_extraction(text).get("contact_string", "")
+    address = ""
+    for line in lines:
+        if line == name: continue
+        # "City, Country | email | phone" lines: keep the part that isn't contact info
+        parts = [p.strip() for p in re.split(r"\s*(?:\||\(cid:\d+\)|•)\s*", line) if p.strip()]
+        rest = [p for p in parts if not CONTACT.search(p)]
+        if rest and len(rest) < len(parts) or (rest and "," in rest[0] and len(rest[0]) < 60):
+            address = rest[0]
+            break
+    confidence = 0.5 * bool(name) + 0.4 * bool(contact) + 0.1 * bool(address)
+    return {"name": name, "address": address, "contact": contact}, confidence
+
+def _split_role_company(head):
+    parts = [p.strip(" ,|-") for p in SPLIT_HEAD.split(head) if p.strip(" ,|-")]
+    if len(parts) >= 2: return parts[0], parts[1]
+    return (parts[0] if parts else ""), ""
+
+def parse_experience(text):
+    entries = []
+    current = None
+    stray = 0
+    for line in (l.strip() for l in text.splitlines()):
+        if not line: continue
+        if _is_bullet(line):
+            if current is None:
+                stray += 1
+                continue
+            current["bullets"].append(_strip_bullet(line))
+            continue
+        match = DATE_RANGE.search(line)
+        if match:
+            head = (line[:match.start()] + line[match.end():]).strip(" ,|-–—()")
+            role, company = _split_role_company(head)
+            current = {"company": company, "role": role, "dates": match.group(0), "bullets": []}
+            entries.append(current)
+        elif current is not None and current["bullets"]:
+            # Wrapped continuation of the previous bullet
+            current["bullets"][-1] += " " + line
+        else:
+            stray += 1
+    complete = sum(1 for e in entries if e["role"] and e["company"])
+    confidence = _ratio(complete, len(entries)) * _ratio(len(entries), len(entries) + stray)
+    return entries, confidence
+
+def parse_education(text):
+    entries = []
+    for block in _blocks(text):
+        joined = " | ".join(block)
+        if not DEGREE.search(joined) and not INSTITUTION.search(joined): continue
+        entry = {"university": "", "degree": "", "year": "", "grade": ""}
+        for line in block:
+            grade = GRADE.search(line)
+            if grade and not entry["grade"] and (line.lower().startswith(("grade", "gpa", "cgpa", "result")) or "/" in line):
+                # create_pdf appends "(85.5%)" to x/y grades; keep the grade as written
+                entry["grade"] = PERCENT_SUFFIX.sub("", next(g for g in grade.groups() if g).strip())
+                continue
+            for part in (p.strip() for p in re.split(r",\s+|\s+\|\s+", line)):
+                if not entry["degree"] and DEGREE.search(part): entry["degree"] = part
+                elif not entry["university"] and INSTITUTION.search(part): entry["university"] = part
+                elif not entry["year"] and YEAR.fullmatch(part.strip()): entry["year"] = part.strip()
+            if not entry["year"]:
+                year = DATE_RANGE.search(line) or YEAR.search(line)
+                if year and not DEGREE.search(line): entry["year"] = year.group(0)
+        entries.append(entry)
+    complete = sum(1 for e in entries if e["degree"] and e["university"])
+    return entries, _ratio(complete, len(entries))
+
+def parse_projects(text):
+    entries = []
+    current = None
+    for line in (l.strip() for l in text.splitlines()):
+        if not line: continue
+        if _is_bullet(line) and current is not None:
+            current["bullets"].append(_strip_bullet(line))
+        elif line.lower().startswith("role:") and current is not None:
+            current["role"] = line.split(":", 1)[1].strip()
+        elif current is not None and current["bullets"] and not _is_bullet(line) and line[:1].islower():
+            current["bullets"][-1] += " " + line
+        else:
+            tech = re.search(r"\[(.+?)\]\s*$|\s\|\s(.+)$", line)
+            name = line[:tech.start()].strip() if tech else line
+            current = {"name": name, "tech": (tech.group(1) or tech.group(2)).strip() if tech else "",
+                       "role": "", "bullets": []}
+            entries.append(current)
+    good = sum(1 for e in entries if e["name"] and (e["tech"] or e["bullets"]))
+    return entries, _ratio(good, len(entries))
+
+def parse_publications(text):
+    # "Title (may wrap)\nJournal, 2019": the journal/year line closes an entry
+    entries = []
+    pending = []
+    for line in (l.strip() for l in text.splitlines()):
+        if not line: continue
+        tail = TRAILING_YEAR.search(line)
+        if tail is None:
+            pending.append(line)
+            continue
+        head = line[:tail.start()].strip(" ,.(")
+        if pending:
+            entries.append({"title": " ".join(pending), "journal": head, "year": tail.group(1)})
+        else:
+            entries.append({"title": head, "journal": "", "year": tail.group(1)})
+        pending = []
+    if pending:
+        entries.append({"title": " ".join(pending), "journal": "", "year": ""})
+    good = sum(1 for e in entries if e["title"] and e["year"])
+    return entries, _ratio(good, len(entries))
+
+def parse_awards(text):
+    entries = []
+    loose_years = []
+    for block in _blocks(text):
+        line = " ".join(block)
+        if YEAR.fullmatch(line):
+            # Right-aligned year column that pdfminer emitted as its own run of lines
+            loose_years.append(line)
+            continue
+        year = YEAR.search(line)
+        name = (line[:year.start()] + line[year.end():]).strip(" ,-–()") if year else line
+        entries.append({"name": name, "year": year.group(0) if year else ""})
+    undated = [e for e in entries if not e["year"]]
+    if loose_years and len(loose_years) == len(undated):
+        for entry, year in zip(undated, loose_years):
+            entry["year"] = year
+    elif loose_years:
+        # Years we could not pair: the layout is ambiguous
+        return entries, 0.0
+    # Undated awards are common and the LLM cannot invent a year either
+    named = _ratio(sum(1 for e in entries if e["name"]), len(entries))
+    dated = _ratio(sum(1 for e in entries if e["year"]), len(entries))
+    return entries, named * (0.75 + 0.25 * dated)
+
+def parse_references(text):
+    entries = []
+    for block in _blocks(text):
+        contact = [l for l in block if CONTACT.search(l)]
+        other = [l for l in block if l not in contact]
+        entries.append({"name": other[0] if other else "", "title": ", ".join(other[1:]),
+                        "contact": " | ".join(contact)})
+    good = sum(1 for e in entries if e["name"] and e["contact"])
+    return entries, _ratio(good, len(entries))
+
+def parse_text(text):
+    value = _flatten(text)
+    if not value: return value, 0.0
+    # Bare years inside prose are usually another section's date column
+    stray_years = sum(1 for l in text.splitlines() if YEAR.fullmatch(l.strip()))
+    return value, (0.5 if stray_years else 0.95)
+
+SECTION_PARSERS = {
+    "header": parse_header,
+    "objective": parse_text,
+    "experience": parse_experience,
+    "education": parse_education,
+    "projects": parse_projects,
+    "publications": parse_publications,
+    "core_skills": parse_text,
+    "awards": parse_awards,
+    "scholarship": parse_text,
+    "languages": parse_text,
+    "references": parse_references,
+    "MoU": parse_text,
+}
+
+
+# ==========================================
+# 3. WHOLE-DOCUMENT PARSING
+# ==========================================
+
+def _reclaim_award_years(sections):
+    """Moves a right-aligned award year column back into "awards".
+
+    pdfminer emits a table's right column after its left column, so the
+    award years can land under the next heading instead.
+    """
+    names = list(sections)
+    if "awards" not in names or names[-1] == "awards": return
+    following = names[names.index("awards") + 1]
+    if SECTION_PARSERS[following] is not parse_text: return
+    lines = sections[following].splitlines()
+    years = [l for l in lines if YEAR.fullmatch(l.strip())]
+    if years:
+        sections["awards"] += "\n\n" + "\n\n".join(y.strip() for y in years)
+        sections[following] = "\n".join(l for l in lines if not YEAR.fullmatch(l.strip())).strip()
+
+def parse_resume(raw):
+    """Returns (data, confidences, section_texts) without any LLM call."""
+    data = empty_resume()
+    confidences = {}
+    sections = {k: v for k, v in split_sections(raw).items() if v}
+    _reclaim_award_years(sections)
+    for section, text in sections.items():
+        value, confidence = SECTION_PARSERS[section](text)
+        confidences[section] = round(confidence, 3)
+        if section == "header":
+            data.update(value)
+        else:
+            data[section] = value
+    return data, confidences, sections
+
+async def hybrid_extract(client, raw, threshold=DEFAULT_THRESHOLD):
+    """Local parse first; only sections below `threshold` go to the LLM.
+
+    Returns (data, report) where report lists which sections were parsed
+    locally or sent to the LLM, and which keys failed. With fewer than two
+    detected sections besides the header, the whole CV goes through the
+    single full-text prompt (extract_full).
+    """
+    with METRICS.span("fast_parse"):
+        data, confidences, sections = parse_resume(raw)
+    if len([s for s in sections if s != "header"]) < 2:
+        result, failed = await extract_full(client, raw)
+        return result, {"local": [], "llm": ["all"], "failed": failed, "confidences": confidences}
+
+    low = [s for s, c in confidences.items() if c < threshold and s in SECTION_SCHEMAS]
+    local = [s for s in confidences if s not in low]
+    METRICS.inc("fast_path_sections_total", len(local), path="local")
+    METRICS.inc("fast_path_sections_total", len(low), path="llm")
+
+    results = await asyncio.gather(*(extract_section(client, s, sections[s]) for s in low),
+                                   return_exceptions=True)
+    failed = merge_section_results(data, low, results)
+    return data, {"local": local, "llm": low, "failed": failed, "confidences": confidences}
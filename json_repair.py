@@ -0,0 +1,150 @@
+"""Tolerant parsing of almost-JSON model output.
+
+repair_json() fixes the mistakes LLMs actually make in long structured
+replies: code fences and chatter around the object, trailing commas,
+single-quoted strings, Python literals (True/None), raw newlines inside
+strings, mismatched brackets and output truncated mid-way. A truncated
+reply keeps every complete key; a key whose value never started is dropped.
+"""
+import json
+import re
+
+_BAREWORD = re.compile(r"[^\W\d]\w*")
+# Looser than JSON's grammar (leading +, "5." or ".5"); _json_number() fixes those up
+_NUMBER = re.compile(r"[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?")
+_JSON_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?")
+_LITERALS = {"True": "true", "False": "false", "None": "null", "true": "true", "false": "false", "null": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+_DECODER = json.JSONDecoder()
+
+
+def _json_number(token):
+    if _JSON_NUMBER.fullmatch(token): return token
+    value = float(token)
+    return str(int(value)) if value.is_integer() and not any(c in token for c in ".eE") else repr(value)
+
+def _strip_trailing_comma(out):
+    while out and out[-1].isspace(): out.pop()
+    if out and out[-1] == ",": out.pop()
+
+def repair_json(text):
+    """Returns (value, status) for the first JSON object in `text`.
+
+    status is "ok" when the object parsed as-is, "repaired" after syntax
+    fixes (or a reply that only lacks its closing brackets) and "truncated"
+    when the reply stopped in the middle of a value, so the last key is
+    incomplete.
+    Raises ValueError when there is no object to salvage.
+    """
+    start = text.find("{")
+    if start < 0: raise ValueError("no JSON object in response")
+    end = text.rfind("}")
+    if end > start:
+        try:
+            return json.loads(text[start:end + 1]), "ok"
+        except ValueError:
+            pass
+
+    out = []                  # output characters
+    stack = []                # open brackets: [char, output index of the pending key or None]
+    quote = None              # quote char of the string being copied
+    expect_key = False        # next string in the innermost object is a key
+    cut_token = False         # a number or bare word ran to the end of the text
+    i, n = start, len(text)
+    while i < n:
+        c = text[i]
+        if quote:
+            if c == "\\":
+                if i + 1 < n:
+                    # \' is only valid inside single-quoted strings
+                    out.append("'" if text[i + 1] == "'" else c + text[i + 1])
+                i += 2
+                continue
+            if c == quote:
+                out.append('"')
+                quote = None
+            elif c == '"':
+                out.append('\\"')
+            elif c == "\n":
+                out.append("\\n")
+            elif c == "\t":
+                out.append("\\t")
+            else:
+                out.append(c)
+            i += 1
+            continue
+
+        if c in "\"'":
+            if stack and stack[-1][0] == "{" and expect_key:
+                stack[-1][1] = len(out)
+                expect_key = False
+            quote = c
+            out.append('"')
+        elif c in "{[":
+            stack.append([c, None])
+            expect_key = c == "{"
+            out.append(c)
+        elif c in "}]":
+            # Close whatever is open up to the matching bracket
+            _strip_trailing_comma(out)
+            while stack:
+                opener, _ = stack.pop()
+                out.append(_CLOSERS[opener])
+                if _CLOSERS[opener] == c: break
+            if not stack: break
+            expect_key = False
+        elif c == ",":
+            _strip_trailing_comma(out)
+            out.append(c)
+            if stack and stack[-1][0] == "{":
+                stack[-1][1] = None
+                expect_key = True
+        elif c == ":":
+            out.append(c)
+        elif c in "0123456789+-." and (number := _NUMBER.match(text, i)):
+            out.append(_json_number(number.group(0)))
+            i = number.end()
+            cut_token = i == n
+            continue
+        elif c.isalpha() or c == "_":
+            word = _BAREWORD.match(text, i).group(0)
+            cut_token = i + len(word) == n and word not in _LITERALS
+            if word in _LITERALS:
+                out.append(_LITERALS[word])
+            else:
+                # Unquoted text (e.g. a bare key) becomes a string
+                if stack and stack[-1][0] == "{" and expect_key:
+                    stack[-1][1] = len(out)
+                    expect_key = False
+                out.append(json.dumps(word))
+            i += len(word)
+            continue
+        else:
+            out.append(c)
+        i += 1
+
+    if stack:
+        # Truncated: close an open string, drop a key whose value never started, close brackets
+        cut_string = quote is not None
+        if quote: out.append('"')
+        opener, key_at = stack[-1]
+        if opener == "{" and key_at is not None and not _has_value("".join(out[key_at:])):
+            del out[key_at:]
+            key_at = None
+        # Cut inside a nested value, or inside a top-level string, number or word: the last
+        # key is incomplete. A finished last value only lacks the closing brace.
+        cut_value = len(stack) > 1 or (key_at is not None and (cut_string or cut_token))
+        for opener, _ in reversed(stack):
+            _strip_trailing_comma(out)
+            out.append(_CLOSERS[opener])
+        return json.loads("".join(out)), ("truncated" if cut_value else "repaired")
+    return json.loads("".join(out)), "repaired"
+
+def _has_value(pair):
+    """True when a '"key": value' fragment got as far as its value."""
+    try:
+        _, end = _DECODER.raw_decode(pair)
+    except ValueError:
+        return False
+    rest = pair[end:].lstrip()
+    return rest.startswith(":") and bool(rest[1:].strip())
@@ -0,0 +1,130 @@
+"""Incremental JSON object parser for streamed LLM responses.
+
+    parser = IncrementalJSONParser()
+    for chunk in client.stream_sync(prompt):
+        for key, value in parser.feed(chunk):
+            ...   # "name" arrives long before "publications" has finished
+
+The response is scanned once, jumping between structural characters, and
+chunks are never concatenated as they arrive, so feeding n chunks costs
+O(total length) rather than re-parsing the whole text per chunk. Each
+top-level key of the first JSON object is emitted as soon as its value is
+complete; code fences and any chatter around the object are ignored.
+"""
+import bisect
+import json
+import re
+
+from metrics import METRICS
+
+_STRUCTURAL = re.compile(r'["{}\[\],:]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self.result = {}
+        self.done = False
+        self.bad_keys = []
+        # Chunks are kept as received and only joined per value, so nothing is
+        # re-copied as the response grows
+        self._chunks = []
+        self._starts = []
+        self._length = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._state = "start"   # start -> key -> colon -> value -> comma -> key ...
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+
+    @property
+    def text(self):
+        """Everything received so far (for a whole-response fallback parse)."""
+        return "".join(self._chunks)
+
+    def feed(self, chunk):
+        """Adds response text; returns the (key, value) pairs completed by it."""
+        emitted = []
+        if not chunk or self.done: return emitted
+        base = self._length
+        self._chunks.append(chunk)
+        self._starts.append(base)
+        self._length += len(chunk)
+
+        n = len(chunk)
+        i = 0
+        if self._escape:
+            # Backslash was the last character of the previous chunk
+            self._escape = False
+            i = 1
+        while i < n and not self.done:
+            # Jump straight to the next character that can change the parser state
+            match = (_STRING_SPECIAL if self._in_string else _STRUCTURAL).search(chunk, i)
+            if match is None: break
+            i = match.start()
+            c = chunk[i]
+            pos = base + i
+            if self._in_string:
+                if c == "\\":
+                    if i + 1 >= n: self._escape = True
+                    i += 2
+                    continue
+                self._in_string = False
+                if self._depth == 1:
+                    self._string_closed(pos, emitted)
+            elif self._state == "start":
+                if c == "{":
+                    self._depth = 1
+                    self._state = "key"
+            elif c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._state == "key":
+                    self._key_start = pos
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._state == "value":
+                    self._emit(pos + 1, emitted)
+                elif self._depth == 0:
+                    # A scalar last value (number, true/false/null) ends at the closing brace
+                    if self._state == "value": self._emit(pos, emitted)
+                    self.done = True
+            elif self._depth == 1:
+                if c == ":" and self._state == "colon":
+                    self._state = "value"
+                    self._value_start = pos + 1
+                elif c == ",":
+                    if self._state == "value": self._emit(pos, emitted)
+                    self._state = "key"
+            i += 1
+        return emitted
+
+    def _slice(self, start, end):
+        first = bisect.bisect_right(self._starts, start) - 1
+        last = bisect.bisect_right(self._starts, end - 1) - 1
+        joined = "".join(self._chunks[first:last + 1])
+        offset = self._starts[first]
+        return joined[start - offset:end - offset]
+
+    def _string_closed(self, pos, emitted):
+        if self._state == "key":
+            self._key = json.loads(self._slice(self._key_start, pos + 1))
+            self._state = "colon"
+        elif self._state == "value":
+            self._emit(pos + 1, emitted)
+
+    def _emit(self, end, emitted):
+        raw = self._slice(self._value_start, end).strip() if end > self._value_start else ""
+        self._state = "comma"
+        if not raw: return
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            self.bad_keys.append(self._key)
+            METRICS.inc("json_stream_bad_values_total")
+            return
+        self.result[self._key] = value
+        emitted.append((self._key, value))
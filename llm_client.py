@@ -0,0 +1,428 @@
+"""Async LLM client with rate limiting, bounded concurrency, retries and deadlines.
+
+    client = AsyncLLMClient(GeminiBackend(api_key), max_concurrency=4, rate_per_second=2)
+    text = await client.generate(prompt)      # or client.generate_sync(prompt)
+
+    async for chunk in client.stream(prompt): ...   # or client.stream_sync(prompt)
+    data = client.run(extract_chunked(client, raw))  # any coroutine, from synchronous code
+
+max_concurrency is enforced per event loop. The *_sync helpers and run() all
+use one long-lived loop owned by the client, so a client shared by many
+threads (Streamlit sessions) caps its concurrent calls as a whole, and the
+backend's async connections stay on the loop they were created on.
+
+Backends implement `async generate(prompt, timeout)` and optionally
+`stream(prompt, timeout)`, an async iterator of text chunks; `FakeBackend` is a
+deterministic local stand-in so throughput and tail latency can be measured
+offline (`python llm_client.py --requests 500 --concurrency 16`).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+import weakref
+from collections import deque
+
+from extraction import MODEL_NAME
+from metrics import METRICS
+
+
+# ==========================================
+# 1. ERRORS
+# ==========================================
+
+class LLMError(Exception):
+    """The model call failed and should be shown to the user."""
+
+class TransientLLMError(LLMError):
+    """A failure worth retrying (rate limit, overload, timeout)."""
+
+class LLMDeadlineExceeded(LLMError):
+    """The call (including retries) ran past its deadline."""
+
+# google.api_core exception names and HTTP codes that are safe to retry
+RETRYABLE_NAMES = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable",
+                   "DeadlineExceeded", "InternalServerError", "GatewayTimeout", "Aborted"}
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+
+def is_retryable(exc):
+    if isinstance(exc, (TransientLLMError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    if type(exc).__name__ in RETRYABLE_NAMES:
+        return True
+    code = getattr(exc, "code", None)
+    code = getattr(code, "value", code)
+    return isinstance(code, int) and code in RETRYABLE_CODES
+
+
+# ==========================================
+# 2. BACKENDS
+# ==========================================
+
+class LLMBackend:
+    """Interface: turn a prompt into response text."""
+    name = "base"
+
+    async def generate(self, prompt, timeout=None):
+        raise NotImplementedError
+
+    async def stream(self, prompt, timeout=None):
+        """Yields response text in chunks; backends without streaming yield it whole."""
+        yield await self.generate(prompt, timeout=timeout)
+
+class GeminiBackend(LLMBackend):
+    name = "gemini"
+
+    def __init__(self, api_key, model_name=MODEL_NAME):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+
+    async def generate(self, prompt, timeout=None):
+        request_options = {"timeout": timeout} if timeout else None
+        res = await self.model.generate_content_async(prompt, request_options=request_options)
+        return res.text
+
+    async def stream(self, prompt, timeout=None):
+        request_options = {"timeout": timeout} if timeout else None
+        res = await self.model.generate_content_async(prompt, stream=True, request_options=request_options)
+        async for chunk in res:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. only a finish reason)
+                continue
+            if text: yield text
+
+class FakeBackend(LLMBackend):
+    """Deterministic offline backend.
+
+    Latency and failures are derived from a hash of (seed, prompt, attempt), so
+    the same run always produces the same timings and the same retry pattern.
+    """
+    name = "fake"
+
+    def __init__(self, latency=0.05, jitter=0.05, failure_rate=0.0, seed=0, response_fn=None,
+                 chunk_size=64, chunk_delay=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.response_fn = response_fn or self.default_response
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self._attempts = {}
+        self._lock = threading.Lock()
+
+    def _draw(self, prompt, attempt, salt):
+        digest = hashlib.sha256(f"{self.seed}:{salt}:{attempt}:{prompt}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") / 2**64
+
+    @staticmethod
+    def default_response(prompt):
+        tag = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        return json.dumps({
+            "name": f"Candidate {tag}", "contact": f"{tag}@example.com", "address": "",
+            "objective": "", "core_skills": "", "education": [], "experience": [],
+            "projects": [], "publications": [], "awards": [], "scholarship": "",
+            "languages": "", "references": [], "MoU": "",
+        })
+
+    async def _wait_and_maybe_fail(self, prompt, timeout):
+        with self._lock:
+            attempt = self._attempts.get(prompt, 0)
+            self._attempts[prompt] = attempt + 1
+        delay = self.latency + self.jitter * self._draw(prompt, attempt, "latency")
+        if timeout is not None and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError()
+        await asyncio.sleep(delay)
+        if self._draw(prompt, attempt, "fail") < self.failure_rate:
+            raise TransientLLMError("fake backend: 429 Resource exhausted")
+
+    async def generate(self, prompt, timeout=None):
+        await self._wait_and_maybe_fail(prompt, timeout)
+        return self.response_fn(prompt)
+
+    async def stream(self, prompt, timeout=None):
+        await self._wait_and_maybe_fail(prompt, timeout)
+        text = self.response_fn(prompt)
+        for i in range(0, len(text), self.chunk_size):
+            if i and self.chunk_delay: await asyncio.sleep(self.chunk_delay)
+            yield text[i:i + self.chunk_size]
+
+
+# ==========================================
+# 3. RATE LIMITER
+# ==========================================
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        """Takes a token if available, otherwise returns the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            wait_for = self._take()
+            if wait_for <= 0: return
+            await asyncio.sleep(wait_for)
+
+
+# ==========================================
+# 4. CLIENT
+# ==========================================
+
+class AsyncLLMClient:
+    def __init__(self, backend, max_concurrency=4, rate_per_second=None, burst=None,
+                 max_retries=4, base_delay=0.5, max_delay=8.0, timeout=60.0, deadline=180.0,
+                 seed=None, latency_window=1000):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(rate_per_second, burst) if rate_per_second else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.deadline = deadline
+        self._random = random.Random(seed)
+        # asyncio primitives are bound to the loop they are first used on
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._stats_lock = threading.Lock()
+        self._loop = None
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        # Most recent call latencies only: the client lives as long as the process
+        self.latencies = deque(maxlen=latency_window)
+
+    def _get_semaphore(self):
+        loop = asyncio.get_running_loop()
+        with self._stats_lock:
+            sem = self._semaphores.get(loop)
+            if sem is None:
+                sem = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return sem
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff."""
+        return self._random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def generate(self, prompt, deadline=None):
+        """Returns response text; raises LLMError once retries or the deadline run out."""
+        deadline = self.deadline if deadline is None else deadline
+        give_up_at = time.monotonic() + deadline if deadline else None
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            remaining = give_up_at - time.monotonic() if give_up_at else None
+            if remaining is not None and remaining <= 0:
+                self._record(False, started)
+                raise LLMDeadlineExceeded(f"LLM call exceeded its {deadline:.0f}s deadline")
+
+            per_call = self.timeout
+            if remaining is not None:
+                per_call = remaining if per_call is None else min(per_call, remaining)
+            try:
+                if self.bucket: await self.bucket.acquire()
+                async with self._get_semaphore():
+                    text = await asyncio.wait_for(self.backend.generate(prompt, timeout=per_call),
+                                                  timeout=per_call)
+                self._record(True, started)
+                return text
+            except Exception as e:
+                if not is_retryable(e):
+                    self._record(False, started)
+                    raise LLMError(str(e)) from e
+                if attempt >= self.max_retries:
+                    self._record(False, started)
+                    raise LLMError(f"LLM unavailable after {attempt + 1} attempts: {str(e) or type(e).__name__}") from e
+
+            delay = self.backoff(attempt)
+            if give_up_at is not None:
+                delay = min(delay, max(0.0, give_up_at - time.monotonic()))
+            with self._stats_lock:
+                self.retries += 1
+            METRICS.inc("llm_retries_total", backend=self.backend.name)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _background_loop(self):
+        with self._stats_lock:
+            if self._loop is None: self._loop = BackgroundLoop()
+            return self._loop
+
+    def run(self, coro):
+        """Runs a coroutine that uses this client on the client's own loop; blocks for the result."""
+        return self._background_loop().submit(coro).result()
+
+    def generate_sync(self, prompt, deadline=None):
+        """Blocking wrapper for callers without an event loop (e.g. Streamlit handlers)."""
+        return self.run(self.generate(prompt, deadline=deadline))
+
+    async def stream(self, prompt, deadline=None):
+        """Yields response text chunks as they arrive.
+
+        Retries only happen before the first chunk: once text has been handed
+        to the caller a failure is raised as LLMError, and the caller keeps
+        whatever it already received. `timeout` bounds the wait for each chunk.
+        """
+        deadline = self.deadline if deadline is None else deadline
+        give_up_at = time.monotonic() + deadline if deadline else None
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            yielded = False
+            try:
+                if self.bucket: await self.bucket.acquire()
+                async with self._get_semaphore():
+                    chunks = self.backend.stream(prompt, timeout=self.timeout)
+                    try:
+                        while True:
+                            wait_for = self.timeout
+                            if give_up_at is not None:
+                                remaining = give_up_at - time.monotonic()
+                                if remaining <= 0:
+                                    raise LLMDeadlineExceeded(f"LLM call exceeded its {deadline:.0f}s deadline")
+                                wait_for = remaining if wait_for is None else min(wait_for, remaining)
+                            try:
+                                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=wait_for)
+                            except StopAsyncIteration:
+                                break
+                            if not yielded:
+                                METRICS.observe("llm_first_chunk", time.perf_counter() - started,
+                                                backend=self.backend.name)
+                            yielded = True
+                            yield chunk
+                    finally:
+                        await chunks.aclose()
+                self._record(True, started)
+                return
+            except LLMDeadlineExceeded:
+                self._record(False, started)
+                raise
+            except Exception as e:
+                if give_up_at is not None and time.monotonic() >= give_up_at:
+                    self._record(False, started)
+                    raise LLMDeadlineExceeded(f"LLM call exceeded its {deadline:.0f}s deadline") from e
+                if yielded or not is_retryable(e):
+                    self._record(False, started)
+                    raise LLMError(str(e) or type(e).__name__) from e
+                if attempt >= self.max_retries:
+                    self._record(False, started)
+                    raise LLMError(f"LLM unavailable after {attempt + 1} attempts: {str(e) or type(e).__name__}") from e
+
+            delay = self.backoff(attempt)
+            if give_up_at is not None:
+                delay = min(delay, max(0.0, give_up_at - time.monotonic()))
+            with self._stats_lock:
+                self.retries += 1
+            METRICS.inc("llm_retries_total", backend=self.backend.name)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def stream_sync(self, prompt, deadline=None):
+        """Blocking generator over stream(), driven by the client's own loop."""
+        loop = self._background_loop()
+        chunks = self.stream(prompt, deadline=deadline)
+        try:
+            while True:
+                try:
+                    yield loop.submit(chunks.__anext__()).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            loop.submit(chunks.aclose()).result()
+
+    def _record(self, ok, started):
+        with self._stats_lock:
+            self.calls += 1
+            if not ok: self.failures += 1
+            self.latencies.append(time.perf_counter() - started)
+        if not ok: METRICS.inc("llm_failures_total", backend=self.backend.name)
+
+    def stats(self):
+        with self._stats_lock:
+            lat = sorted(self.latencies)
+        def pct(p):
+            return lat[min(len(lat) - 1, int(p * len(lat)))] if lat else 0.0
+        return {"calls": self.calls, "retries": self.retries, "failures": self.failures,
+                "p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99),
+                "max": lat[-1] if lat else 0.0}
+
+
+# ==========================================
+# 5. BACKGROUND EVENT LOOP (for thread/process-pool callers)
+# ==========================================
+
+class BackgroundLoop:
+    """Runs an event loop in a daemon thread; `submit` returns a concurrent.futures.Future."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+# ==========================================
+# 6. OFFLINE LOAD TEST
+# ==========================================
+
+async def load_test(client, prompts):
+    started = time.perf_counter()
+    results = await asyncio.gather(*(client.generate(p) for p in prompts), return_exceptions=True)
+    wall = time.perf_counter() - started
+    stats = client.stats()
+    stats["requests"] = len(prompts)
+    stats["errors"] = sum(1 for r in results if isinstance(r, Exception))
+    stats["wall_seconds"] = wall
+    stats["throughput_rps"] = len(prompts) / wall if wall else 0.0
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the LLM client against the fake backend.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=None, help="Token-bucket rate (requests/s)")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    backend = FakeBackend(latency=args.latency, jitter=args.jitter,
+                          failure_rate=args.failure_rate, seed=args.seed)
+    client = AsyncLLMClient(backend, max_concurrency=args.concurrency, rate_per_second=args.rate,
+                            base_delay=0.05, max_delay=1.0, seed=args.seed)
+    prompts = [f"resume #{i}" for i in range(args.requests)]
+    print(json.dumps(asyncio.run(load_test(client, prompts)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
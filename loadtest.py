@@ -0,0 +1,133 @@
+"""Load test for render_service.py.
+
+    python render_service.py --workers 4 &
+    python loadtest.py --concurrency 16 --requests 400              # closed loop: as fast as it answers
+    python loadtest.py --rate 20 --duration 30 --unique 200          # open loop: 20 req/s arrivals
+
+Closed loop finds the saturation throughput. Open loop models real traffic:
+requests are sent on a fixed schedule and latency is counted from the
+scheduled time, so queueing delay is not hidden when the service falls
+behind. Raise --rate until p99 or the 429 share is no longer acceptable;
+that rate is what one instance can take at peak.
+"""
+import argparse
+import http.client
+import json
+import queue
+import random
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmark import SIZES, make_resume
+
+
+def _percentile(values, q):
+    if not values: return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def build_payloads(templates, size, unique, seed=0):
+    rng = random.Random(seed)
+    docs = [make_resume(rng, size) for _ in range(unique or 1)]
+    return [json.dumps({"template": templates[i % len(templates)], "data": docs[i % len(docs)]}).encode("utf-8")
+            for i in range(max(len(docs), len(templates)))]
+
+def run(url, payloads, concurrency=8, requests=None, rate=None, duration=None):
+    """Returns {"codes": {code: n}, "latencies": [s, ...] of 200s, "wall": s}."""
+    parts = urlsplit(url)
+    schedule = queue.Queue()
+    codes = {}
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=120)
+        while True:
+            item = schedule.get()
+            if item is None: return
+            i, due = item
+            if due is None:
+                due = time.perf_counter()
+            elif due > time.perf_counter():
+                time.sleep(due - time.perf_counter())
+            body = payloads[i % len(payloads)]
+            try:
+                conn.request("POST", "/render", body, {"Content-Type": "application/json"})
+                response = conn.getresponse()
+                response.read()
+                code = response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=120)
+                code = "error"
+            elapsed = time.perf_counter() - due
+            with lock:
+                codes[code] = codes.get(code, 0) + 1
+                if code == 200: latencies.append(elapsed)
+
+    if rate:
+        count = int(rate * (duration or 10))
+    else:
+        count = requests or 100
+    started = time.perf_counter()
+    for i in range(count):
+        # Open loop: fixed arrival times. Closed loop: timed from when the request is sent
+        schedule.put((i, started + i / rate if rate else None))
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        schedule.put(None)
+        t.start()
+    for t in threads:
+        t.join()
+    return {"codes": codes, "latencies": latencies, "wall": time.perf_counter() - started}
+
+def format_report(result):
+    lat = [s * 1000 for s in result["latencies"]]
+    total = sum(result["codes"].values())
+    ok = result["codes"].get(200, 0)
+    lines = [f"{total} requests in {result['wall']:.1f}s | {ok / result['wall']:.1f} PDFs/s | "
+             + ", ".join(f"{code}: {n}" for code, n in sorted(result["codes"].items(), key=str))]
+    if lat:
+        lines.append(f"latency ms  p50 {_percentile(lat, 0.5):.0f}  p90 {_percentile(lat, 0.9):.0f}  "
+                     f"p99 {_percentile(lat, 0.99):.0f}  max {max(lat):.0f}  mean {statistics.mean(lat):.0f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the render service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--concurrency", type=int, default=8, help="Client connections")
+    parser.add_argument("--requests", type=int, default=200, help="Closed loop: total requests")
+    parser.add_argument("--rate", type=float, default=None, help="Open loop: arrivals per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Open loop: seconds to run")
+    parser.add_argument("--size", choices=list(SIZES), default="2-page", help="Synthetic resume size")
+    parser.add_argument("--template", action="append", help="Template(s) to cycle through (default: all)")
+    parser.add_argument("--unique", type=int, default=50,
+                        help="Distinct resumes to cycle through; 1 measures the render cache")
+    parser.add_argument("--json", action="store_true", help="Print the raw result as JSON")
+    args = parser.parse_args(argv)
+
+    parts = urlsplit(args.url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+    try:
+        conn.request("GET", "/templates")
+        templates = args.template or json.loads(conn.getresponse().read())
+    except OSError as e:
+        print(f"Cannot reach {args.url}: {e}", file=sys.stderr)
+        return 2
+
+    payloads = build_payloads(templates, args.size, args.unique)
+    result = run(args.url, payloads, args.concurrency, args.requests, args.rate, args.duration)
+    if args.json:
+        print(json.dumps({"codes": {str(k): v for k, v in result["codes"].items()}, "wall": result["wall"],
+                          "latencies_ms": [round(s * 1000, 2) for s in result["latencies"]]}))
+    else:
+        print(format_report(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
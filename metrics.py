@@ -0,0 +1,186 @@
+"""Per-stage timing spans, counters and gauges for the extract-and-render pipeline.
+
+    with METRICS.span("llm_generate"):
+        ...
+    METRICS.inc("json_parse_failures_total")
+    METRICS.set_gauge("session_store_bytes", 12345, tier="memory")
+
+Everything is recorded in the process-wide METRICS registry and forwarded to
+pluggable sinks: LogSink writes one structured JSON log line per event, and
+start_metrics_server() exposes the registry as Prometheus text on /metrics.
+"""
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the span duration histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+# ==========================================
+# 1. SINKS
+# ==========================================
+
+class Sink:
+    """Receives every span and counter event."""
+
+    def on_span(self, name, seconds, labels): pass
+    def on_counter(self, name, value, labels): pass
+
+class LogSink(Sink):
+    def __init__(self, logger_name="resume.metrics", level=logging.INFO):
+        self.logger = logging.getLogger(logger_name)
+        self.level = level
+
+    def on_span(self, name, seconds, labels):
+        self.logger.log(self.level, json.dumps({"event": "span", "name": name,
+                                                "ms": round(seconds * 1000, 3), **labels}))
+
+    def on_counter(self, name, value, labels):
+        self.logger.log(self.level, json.dumps({"event": "counter", "name": name, "inc": value, **labels}))
+
+
+# ==========================================
+# 2. REGISTRY
+# ==========================================
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+class Metrics:
+    def __init__(self, recent=50):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self.recent_spans = deque(maxlen=recent)
+        self.sinks = []
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        return sink
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        for sink in self.sinks:
+            sink.on_counter(name, value, labels)
+
+    def set_gauge(self, name, value, **labels):
+        """Records the current value of a level (bytes in use, live sessions); not sent to sinks."""
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {"buckets": [0] * len(BUCKETS), "count": 0, "sum": 0.0}
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound: hist["buckets"][i] += 1
+            hist["count"] += 1
+            hist["sum"] += seconds
+            self.recent_spans.append({"name": name, "ms": seconds * 1000, "at": time.time(), **labels})
+        for sink in self.sinks:
+            sink.on_span(name, seconds, labels)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Times the block; failed blocks are recorded with status="error"."""
+        t0 = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - t0, status=status, **labels)
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def gauge_value(self, name, **labels):
+        with self._lock:
+            return self._gauges.get((name, _label_key(labels)), 0)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in self._counters.items()],
+                "gauges": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in self._gauges.items()],
+                "spans": [{"name": n, "labels": dict(l), "count": h["count"], "sum": h["sum"]}
+                          for (n, l), h in self._histograms.items()],
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self.recent_spans.clear()
+
+    def render_prometheus(self, prefix="resume_"):
+        def fmt(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items: return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+        lines = []
+        with self._lock:
+            for name in sorted({n for n, _ in self._counters}):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                for (n, labels), value in sorted(self._counters.items()):
+                    if n == name: lines.append(f"{prefix}{name}{fmt(labels)} {value}")
+            for name in sorted({n for n, _ in self._gauges}):
+                lines.append(f"# TYPE {prefix}{name} gauge")
+                for (n, labels), value in sorted(self._gauges.items()):
+                    if n == name: lines.append(f"{prefix}{name}{fmt(labels)} {value}")
+            for name in sorted({n for n, _ in self._histograms}):
+                metric = f"{prefix}{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                for (n, labels), hist in sorted(self._histograms.items()):
+                    if n != name: continue
+                    for bound, count in zip(BUCKETS, hist["buckets"]):
+                        lines.append(f"{metric}_bucket{fmt(labels, [('le', bound)])} {count}")
+                    lines.append(f"{metric}_bucket{fmt(labels, [('le', '+Inf')])} {hist['count']}")
+                    lines.append(f"{metric}_sum{fmt(labels)} {hist['sum']:.6f}")
+                    lines.append(f"{metric}_count{fmt(labels)} {hist['count']}")
+        return "\n".join(lines) + "\n"
+
+METRICS = Metrics()
+
+
+# ==========================================
+# 3. PROMETHEUS TEXT ENDPOINT
+# ==========================================
+
+def start_metrics_server(port, host="127.0.0.1", metrics=METRICS):
+    """Serves GET /metrics from a daemon thread; returns the server."""
+    # Only processes that expose metrics pay for importing http.server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
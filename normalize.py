@@ -0,0 +1,126 @@
+"""Deterministic clean-up of pdfminer output before it goes into a prompt.
+
+normalize_text() removes repeated page headers/footers and page numbers,
+joins words hyphenated across line breaks, collapses whitespace and drops
+duplicated lines (e.g. the contact block repeated on every page). It
+returns the cleaned text plus a report of how many characters and
+(estimated) prompt tokens were saved.
+"""
+import re
+from collections import Counter
+
+# How many lines at the top/bottom of each page are header/footer candidates
+EDGE_LINES = 3
+
+_DIGITS = re.compile(r"\d+")
+_PAGE_NUMBER = re.compile(r"^\s*(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?\s*$", re.IGNORECASE)
+_HYPHEN_BREAK = re.compile(r"(\w)-\n[ \t]*([a-z])")
+_INLINE_SPACE = re.compile(r"[ \t ]+")
+_BLANK_RUNS = re.compile(r"\n{3,}")
+_URLISH = re.compile(r"@|https?://|www\.|linkedin", re.IGNORECASE)
+_PHONEISH = re.compile(r"\+?\(?\d[\d\s().-]{8,}\d")
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text):
+    """Rough LLM token count: word pieces plus punctuation, ~1.3 tokens per word."""
+    words = 0
+    punct = 0
+    for tok in _TOKEN.findall(text):
+        if tok[0].isalnum() or tok[0] == "_": words += 1
+        else: punct += 1
+    return int(words * 1.3 + punct)
+
+def _edge_key(line):
+    # Page numbers change from page to page; compare headers/footers with digits masked
+    return _DIGITS.sub("#", line.strip().lower())
+
+def _split_pages(pages):
+    if isinstance(pages, str): pages = pages.split("\x0c")
+    return [p.splitlines() for p in pages if p.strip()]
+
+def _strip_page_furniture(pages):
+    """Drops lines that recur at the top/bottom of most pages, plus bare page numbers.
+
+    The first occurrence of a recurring header is kept: on CVs it is usually
+    the name/contact line, which the parser still needs once.
+    """
+    removed = 0
+    if len(pages) >= 2:
+        top, bottom = Counter(), Counter()
+        for lines in pages:
+            content = [l for l in lines if l.strip()]
+            top.update({_edge_key(l) for l in content[:EDGE_LINES]})
+            bottom.update({_edge_key(l) for l in content[-EDGE_LINES:]})
+        # Real headers/footers sit in the same place on (nearly) every page
+        threshold = max(2, -(-len(pages) * 6 // 10))
+        furniture = {k for c in (top, bottom) for k, n in c.items() if n >= threshold and k}
+    else:
+        furniture = set()
+
+    cleaned = []
+    kept_once = set()
+    for lines in pages:
+        content_idx = [i for i, l in enumerate(lines) if l.strip()]
+        edge_idx = set(content_idx[:EDGE_LINES] + content_idx[-EDGE_LINES:])
+        kept = []
+        for i, line in enumerate(lines):
+            if i in edge_idx:
+                key = _edge_key(line)
+                if _PAGE_NUMBER.match(line) or (key in furniture and key in kept_once):
+                    removed += 1
+                    continue
+                if key in furniture: kept_once.add(key)
+            kept.append(line)
+        cleaned.append(kept)
+    return cleaned, removed
+
+def _contactish(line):
+    if _URLISH.search(line): return True
+    match = _PHONEISH.search(line)
+    # Date ranges like "2000 - 2001" look phone-like; real numbers have 9+ digits
+    return bool(match) and sum(c.isdigit() for c in match.group(0)) >= 9
+
+def _drop_duplicate_lines(lines, min_length=60):
+    """Removes repeats of long or contact-like lines, keeping the first occurrence.
+
+    Short lines are never dropped: "IEEE Access, 2019" or "Python" can
+    legitimately repeat across publications and projects.
+    """
+    seen = set()
+    kept = []
+    removed = 0
+    for line in lines:
+        key = line.strip().lower()
+        if key and (len(key) >= min_length or _contactish(key)):
+            if key in seen:
+                removed += 1
+                continue
+            seen.add(key)
+        kept.append(line)
+    return kept, removed
+
+def normalize_text(pages):
+    """Returns (text, report) for a list of page texts or a form-feed separated string."""
+    original = pages if isinstance(pages, str) else "".join(pages)
+    page_lines, furniture_removed = _strip_page_furniture(_split_pages(pages))
+
+    text = "\n".join("\n".join(lines) for lines in page_lines)
+    text, hyphen_joins = _HYPHEN_BREAK.subn(r"\1\2", text)
+    lines = [_INLINE_SPACE.sub(" ", l).strip() for l in text.split("\n")]
+    lines, duplicates_removed = _drop_duplicate_lines(lines)
+    text = _BLANK_RUNS.sub("\n\n", "\n".join(lines)).strip()
+
+    tokens_before = estimate_tokens(original)
+    tokens_after = estimate_tokens(text)
+    report = {
+        "chars_before": len(original),
+        "chars_after": len(text),
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "token_savings_pct": (100.0 * (tokens_before - tokens_after) / tokens_before) if tokens_before else 0.0,
+        "char_savings_pct": (100.0 * (len(original) - len(text)) / len(original)) if original else 0.0,
+        "header_footer_lines": furniture_removed,
+        "hyphenations_joined": hyphen_joins,
+        "duplicate_lines": duplicates_removed,
+    }
+    return text, report
@@ -0,0 +1,391 @@
+import io
+import re
+from collections import deque
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Flowable
+
+from metrics import METRICS
+from templates import FULL_WIDTH, get_template, job_header_table, template_names
+
+
+# ==========================================
+# 1. RENDERING HELPERS
+# ==========================================
+
+def escape_xml(text):
+    """Escapes special characters that crash ReportLab."""
+    if not text: return ""
+    text = str(text)
+    text = text.replace('&', '&amp;')
+    text = text.replace('<', '&lt;')
+    text = text.replace('>', '&gt;')
+    return text
+
+def calculate_percentage(grade_str):
+    if not grade_str: return None
+    if "%" in str(grade_str): return None
+    match = re.search(r'(\d+(\.\d+)?)\s*/\s*(\d+(\.\d+)?)', str(grade_str))
+    if match:
+        try:
+            obtained = float(match.group(1))
+            total = float(match.group(3))
+            if total > 0: return f"{(obtained / total) * 100:.1f}%"
+        except: pass
+    return None
+
+# --- CUSTOM LINE DRAWING ---
+class MCLine(Flowable):
+    def __init__(self, width, height=0):
+        Flowable.__init__(self)
+        self.width = width
+        self.height = height
+    def draw(self):
+        self.canv.setLineWidth(1)
+        self.canv.setStrokeColor(colors.black)
+        self.canv.line(0, 0, self.width, 0)
+
+
+# ==========================================
+# 2. PDF GENERATION FUNCTION
+# ==========================================
+
+def _make_doc(buffer):
+    # invariant=1 drops the creation timestamp and random document ID, so the
+    # same data and template always give byte-identical output (cacheable, ETag-able)
+    return SimpleDocTemplate(buffer, pagesize=letter, 
+                             rightMargin=40, leftMargin=40, 
+                             topMargin=40, bottomMargin=40, invariant=1)
+
+def _build_story(data, spec, scale=1.0):
+    """The flowables for one CV; spacers scale with the template's styles."""
+    style_name = spec.styles['name']
+    style_contact = spec.styles['contact']
+    style_header = spec.styles['header']
+    style_normal = spec.styles['normal']
+    style_bullet = spec.styles['bullet']
+    separator = spec.separator
+
+    story = [] 
+    full_width = FULL_WIDTH
+
+    # --- HELPER FOR SECTIONS ---
+    def add_section_header(text):
+        if spec.section_header_case == "upper":
+            text = text.upper()
+        story.append(Paragraph(text, style_header))
+        if spec.has_lines:
+            story.append(MCLine(full_width))
+            story.append(Spacer(1, 8 * scale))
+
+    # --- BUILD CONTENT ---
+    
+    # 1. Name & Contact
+    name = escape_xml(data.get('name', 'Name Not Provided'))
+    story.append(Paragraph(name, style_name))
+    
+    contact_parts = []
+    if data.get('address'): contact_parts.append(escape_xml(data.get('address')))
+    if data.get('contact'): contact_parts.append(escape_xml(data.get('contact')))
+    # This line uses the cleaned data from the Streamlit form
+    story.append(Paragraph(separator.join(contact_parts), style_contact))
+    
+    # 2. Objective
+    if data.get('objective'):
+        add_section_header("Professional Summary")
+        story.append(Paragraph(escape_xml(data.get('objective', '')), style_normal))
+
+    # 3. Experience
+    if data.get('experience'):
+        add_section_header("Work Experience")
+        for job in data.get('experience', []):
+            role = escape_xml(job.get('role', ''))
+            company = escape_xml(job.get('company', ''))
+            dates = escape_xml(job.get('dates', ''))
+            
+            story.extend(spec.format_job(spec, role, company, dates))
+            
+            for b in job.get('bullets', []): 
+                story.append(Paragraph(f"• {escape_xml(b)}", style_bullet))
+            story.append(Spacer(1, 10 * scale))
+
+    # 4. Education
+    if data.get('education'):
+        add_section_header("Education")
+        for edu in data.get('education', []):
+            degree = escape_xml(edu.get('degree', ''))
+            uni = escape_xml(edu.get('university', ''))
+            year = escape_xml(edu.get('year', ''))
+            grade = escape_xml(edu.get('grade', ''))
+            
+            story.extend(spec.format_education(spec, degree, uni, year))
+
+            if grade:
+                pct = calculate_percentage(grade)
+                g_txt = f"Grade: {grade} ({pct})" if pct else f"Grade: {grade}"
+                story.append(Paragraph(g_txt, style_normal))
+            story.append(Spacer(1, 8 * scale))
+            
+    # 5. Projects
+    if data.get('projects'):
+        add_section_header("Projects")
+        for proj in data.get('projects', []):
+            p_name = escape_xml(proj.get('name', ''))
+            p_tech = escape_xml(proj.get('tech', ''))
+            p_role = escape_xml(proj.get('role', '')) # New field
+            
+            head = spec.format_project_head(p_name, p_tech)
+            
+            story.append(Paragraph(head, style_normal))
+            if p_role:
+                story.append(Paragraph(f"Role: {p_role}", style_normal))
+                
+            for b in proj.get('bullets', []): 
+                story.append(Paragraph(f"• {escape_xml(b)}", style_bullet))
+            story.append(Spacer(1, 8 * scale))
+            
+    # 6. Publications (New Section)
+    if data.get('publications'):
+        add_section_header("Publications")
+        for pub in data.get('publications', []):
+            p_title = escape_xml(pub.get('title', ''))
+            p_journal = escape_xml(pub.get('journal', ''))
+            p_year = escape_xml(pub.get('year', ''))
+            
+            if p_title:
+                head = f"<b>{p_title}</b>"
+                story.append(Paragraph(head, style_normal))
+            
+            detail_line = p_journal
+            if p_year: detail_line += f", {p_year}"
+            if detail_line:
+                story.append(Paragraph(detail_line, style_normal))
+            
+            story.append(Spacer(1, 6 * scale))
+
+    # 7. Skills (No Change)
+    if data.get('core_skills'):
+        add_section_header("Skills")
+        story.append(Paragraph(escape_xml(data.get('core_skills', '')), style_normal))
+        
+    # 8. Awards & Honors (New Section)
+    if data.get('awards'):
+        add_section_header("Awards & Honors")
+        for award in data.get('awards', []):
+            a_name = escape_xml(award.get('name', ''))
+            a_year = escape_xml(award.get('year', ''))
+            
+            if a_name and a_year:
+                story.append(job_header_table(spec, f"<b>{a_name}</b>", a_year))
+            elif a_name:
+                 story.append(Paragraph(f"<b>{a_name}</b>", style_normal))
+            story.append(Spacer(1, 6 * scale))
+            
+    # 9. Scholarship/Fellowship (New Section)
+    if data.get('scholarship'):
+        add_section_header("Scholarship / Fellowship")
+        story.append(Paragraph(escape_xml(data.get('scholarship', '')), style_normal))
+        story.append(Spacer(1, 8 * scale))
+
+    # 10. Languages (New Section)
+    if data.get('languages'):
+        add_section_header("Languages")
+        story.append(Paragraph(escape_xml(data.get('languages', '')), style_normal))
+        story.append(Spacer(1, 8 * scale))
+        
+    # 11. References (New Section - Structured as a table)
+    if data.get('references'):
+        add_section_header("References")
+        
+        for ref in data.get('references', []):
+            r_name = escape_xml(ref.get('name', ''))
+            r_title = escape_xml(ref.get('title', ''))
+            r_contact = escape_xml(ref.get('contact', ''))
+            
+            if r_name:
+                 story.append(Paragraph(f"<b>{r_name}</b>", style_normal))
+            if r_title:
+                 story.append(Paragraph(r_title, style_normal))
+            if r_contact:
+                 story.append(Paragraph(r_contact, style_normal))
+            
+            story.append(Spacer(1, 8 * scale))
+
+    return story
+
+def _render(story, spec):
+    buffer = io.BytesIO()
+    doc = _make_doc(buffer)
+    with METRICS.span("reportlab_build", template=spec.name):
+        doc.build(story)
+    pdf_bytes = buffer.getvalue()
+    METRICS.inc("output_bytes_total", len(pdf_bytes), template=spec.name)
+    return pdf_bytes
+
+def create_pdf(data, template_type, fit_pages=None):
+    """Renders resume_data (dict or resume_model.Resume) with a template.
+
+    With fit_pages=N the layout is scaled down, within readable bounds, until
+    it fits on N pages; see fit_pdf.
+    """
+    if fit_pages: return fit_pdf(data, template_type, fit_pages)[0]
+    if hasattr(data, 'to_dict'): data = data.to_dict()
+    # Template specs (fonts, precompiled styles, section formatters) come from the registry
+    spec = get_template(template_type)
+    return _render(_build_story(data, spec), spec)
+
+
+# --- FIT TO N PAGES ---
+# Readable bounds for the scale factor: 0.8 keeps body text at 8.4pt
+FIT_MIN_SCALE = 0.80
+FIT_MAX_SCALE = 1.00
+FIT_MAX_PASSES = 7
+_FRAME_PADDING = 6   # SimpleDocTemplate's frame pads each side by 6pt
+_FUZZ = 1e-6
+
+def count_pages(story, limit=None):
+    """Pages `story` takes in the CV page frame, from wrapped heights only.
+
+    Mirrors platypus' Frame placement (space before/after overlap, splitting
+    paragraphs across pages) without drawing anything. Stops counting once
+    `limit` is exceeded.
+    """
+    doc = _make_doc(io.BytesIO())
+    width = doc.width - 2 * _FRAME_PADDING
+    height = doc.height - 2 * _FRAME_PADDING
+    pages, y, at_top, prev_after = 1, height, True, 0
+    queue = deque(story)
+    while queue:
+        if limit and pages > limit: break
+        f = queue.popleft()
+        before = 0 if at_top else max(f.getSpaceBefore() - prev_after, 0)
+        avail = y - before
+        if avail > 0:
+            _, h = f.wrap(width, avail)
+            if avail - h >= -_FUZZ:
+                after = f.getSpaceAfter()
+                if h + before + after: at_top = False
+                y = avail - h - after
+                prev_after = after
+                continue
+            parts = f.split(width, avail)
+            if parts:
+                queue.extendleft(reversed(parts))
+                # The first part fits where it stands; the doc places it without a new page
+                first = queue.popleft()
+                _, h = first.wrap(width, avail)
+                after = first.getSpaceAfter()
+                at_top = False
+                y = avail - h - after
+                prev_after = after
+                continue
+        # Does not fit: it starts the next page
+        pages += 1
+        y, at_top, prev_after = height, True, 0
+        queue.appendleft(f)
+    return pages
+
+def fit_pdf(data, template_type, pages=1, min_scale=FIT_MIN_SCALE, max_passes=FIT_MAX_PASSES):
+    """Renders at the largest scale (in 1% steps) whose layout fits on `pages` pages.
+
+    Each candidate scale costs one layout pass (wrap/split only, no drawing),
+    at most `max_passes` of them, and the chosen story is built once. Returns
+    (pdf_bytes, {"scale", "pages", "fits", "passes"}); when even min_scale
+    does not fit, it renders at min_scale with fits=False.
+    """
+    if max_passes < 2: raise ValueError("fit_pdf needs at least 2 layout passes")
+    if hasattr(data, 'to_dict'): data = data.to_dict()
+    stories = {}
+    counted = {}
+
+    def measure(step, limit=pages):
+        spec = get_template(template_type, step / 100)
+        story = stories[step] = _build_story(data, spec, step / 100)
+        counted[step] = count_pages(story, limit=limit)
+        return counted[step] <= pages
+
+    with METRICS.span("fit_layout", template=template_type):
+        lo, hi = round(min_scale * 100), round(FIT_MAX_SCALE * 100)
+        best = None
+        if measure(hi):
+            best = hi
+        elif measure(lo, limit=None):   # full count: this is also the fallback render
+            best = lo
+            lo += 1
+            hi -= 1
+            # Largest fitting step in [lo, hi]; every measured step above best overflowed
+            while lo <= hi and len(counted) < max_passes:
+                mid = (lo + hi + 1) // 2
+                if measure(mid):
+                    best, lo = mid, mid + 1
+                else:
+                    hi = mid - 1
+    fits = best is not None
+    step = best if fits else round(min_scale * 100)
+    METRICS.inc("fit_layout_passes_total", len(counted))
+    spec = get_template(template_type, step / 100)
+    pdf_bytes = _render(stories[step], spec)
+    return pdf_bytes, {"scale": step / 100, "pages": counted[step], "fits": fits, "passes": len(counted)}
+
+
+# ==========================================
+# 3. MULTI-TEMPLATE RENDERING & PREVIEWS
+# ==========================================
+
+def render_preview(pdf_bytes, width=240):
+    """PNG thumbnail of the first page, or None when pypdfium2 is not installed."""
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return None
+    pdf = pdfium.PdfDocument(pdf_bytes)
+    try:
+        page = pdf[0]
+        scale = width / page.get_width()
+        image = page.render(scale=scale).to_pil()
+        out = io.BytesIO()
+        image.save(out, format="PNG", optimize=True)
+        return out.getvalue()
+    finally:
+        pdf.close()
+
+def _render_template(data, template_type, preview_width, fit_pages=None):
+    pdf_bytes = create_pdf(data, template_type, fit_pages)
+    preview = render_preview(pdf_bytes, preview_width) if preview_width else None
+    return template_type, pdf_bytes, preview
+
+def render_all_templates(data, templates=None, executor=None, preview_width=240, cache=None, fit_pages=None):
+    """Renders `data` with every template at once.
+
+    Returns {template: {"pdf": bytes, "preview": png bytes or None}} in
+    registry order. Pass a long-lived ProcessPoolExecutor as `executor` to
+    spread templates across processes; without one they render in-process.
+    With a RenderCache only templates missing from the cache are rendered.
+    fit_pages is passed on to create_pdf.
+    """
+    templates = list(templates or template_names())
+    pdf_variant = f"fit{fit_pages}" if fit_pages else ""
+    preview_variant = f"preview{preview_width}{pdf_variant}"
+    results = {}
+    if cache is not None:
+        for t in templates:
+            pdf = cache.get(cache.make_key(data, t, pdf_variant))
+            preview = cache.get(cache.make_key(data, t, preview_variant)) if preview_width else None
+            if pdf is not None and (preview is not None or not preview_width):
+                results[t] = {"pdf": pdf[0], "preview": (preview[0] or None) if preview else None}
+
+    missing = [t for t in templates if t not in results]
+    if executor is None:
+        rendered = [_render_template(data, t, preview_width, fit_pages) for t in missing]
+    else:
+        futures = [executor.submit(_render_template, data, t, preview_width, fit_pages) for t in missing]
+        rendered = [f.result() for f in futures]
+
+    for t, pdf_bytes, preview in rendered:
+        results[t] = {"pdf": pdf_bytes, "preview": preview}
+        if cache is not None:
+            cache.put(cache.make_key(data, t, pdf_variant), pdf_bytes)
+            # b"" records "no thumbnail possible" (pypdfium2 missing), so it is not retried every call
+            if preview_width: cache.put(cache.make_key(data, t, preview_variant), preview or b"")
+    return {t: results[t] for t in templates}
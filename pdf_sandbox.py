@@ -0,0 +1,217 @@
+"""Runs pdfminer on untrusted uploads in a separate, killable worker process.
+
+    sandbox = ExtractionSandbox(max_bytes=10 * 2**20, max_pages=100, timeout=30, max_rss_mb=512)
+    path, doc_hash = sandbox.spool(uploaded_file)
+    try:
+        for page_text in sandbox.iter_pages(path, max_pages=30):
+            ...
+    finally:
+        os.unlink(path)
+
+Uploads are copied to a temp file in blocks (hashed on the way) and workers
+read them by path, so the PDF is never pickled across processes. A worker
+that runs past the wall-clock timeout or the RSS limit is killed and replaced;
+the server process only ever waits on a pipe. Every refusal raises
+PDFRejected and counts in `pdf_rejected_total{reason}`.
+"""
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+from metrics import METRICS
+
+SPOOL_BLOCK = 1024 * 1024
+POLL_SECONDS = 0.05
+
+
+# ==========================================
+# 1. ERRORS
+# ==========================================
+
+class PDFRejected(Exception):
+    """The upload was refused; str(e) is safe to show to the user."""
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason   # too_large, not_pdf, too_many_pages, malformed, timeout, memory, crashed
+
+def _reject(reason, message):
+    METRICS.inc("pdf_rejected_total", reason=reason)
+    return PDFRejected(reason, message)
+
+
+# ==========================================
+# 2. WORKER PROCESS
+# ==========================================
+
+def _worker_main(conn, max_rss_mb):
+    """Serves extraction jobs until the pipe closes. Runs in a spawned process."""
+    if max_rss_mb and not os.path.exists("/proc/self/statm"):
+        # No /proc to poll from the parent: cap the address space instead
+        try:
+            import resource
+            limit = max_rss_mb * 2 ** 20
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass
+    from extraction import count_pdf_pages, iter_pdf_pages
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None: return
+        path, page_limit, max_pages, max_chars, laparams = job
+        try:
+            total = count_pdf_pages(path)
+            if page_limit and total > page_limit:
+                conn.send(("reject", "too_many_pages", f"The PDF has {total} pages; the limit is {page_limit}."))
+                continue
+            conn.send(("total", total))
+            for text in iter_pdf_pages(path, max_pages=max_pages, max_chars=max_chars, laparams=laparams):
+                conn.send(("page", text))
+            conn.send(("done", None))
+        except MemoryError:
+            conn.send(("reject", "memory", "The PDF needs too much memory to read."))
+        except Exception as e:
+            conn.send(("reject", "malformed", f"The PDF could not be read ({type(e).__name__})."))
+
+def _rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+class _Worker:
+    def __init__(self, ctx, max_rss_mb):
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, max_rss_mb), daemon=True)
+        self.process.start()
+        child.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+# ==========================================
+# 3. SANDBOX
+# ==========================================
+
+class ExtractionSandbox:
+    """Pool of up to `workers` pdfminer processes with per-document limits.
+
+    Thread-safe: Streamlit sessions share one sandbox, and a session waits for
+    a free worker rather than starting pdfminer in the server process.
+    Workers are spawned on first use and reused until one breaks a limit.
+    """
+
+    def __init__(self, max_bytes=10 * 2 ** 20, max_pages=100, timeout=30.0, max_rss_mb=512,
+                 workers=2, spool_dir=None):
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.max_rss_mb = max_rss_mb
+        self.spool_dir = spool_dir
+        self._ctx = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(workers)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def spool(self, upload):
+        """Copies a file object (e.g. a Streamlit upload) to a temp file.
+
+        Returns (path, sha256 hex digest); the caller deletes the file. Raises
+        PDFRejected for oversized or non-PDF input before anything is parsed.
+        """
+        size = getattr(upload, "size", None)
+        if self.max_bytes and size is not None and size > self.max_bytes:
+            raise _reject("too_large", f"The file is {size / 2**20:.1f} MB; the limit is {self.max_bytes / 2**20:.0f} MB.")
+        if hasattr(upload, "seek"): upload.seek(0)
+        digest = hashlib.sha256()
+        written = 0
+        fd, path = tempfile.mkstemp(suffix=".pdf", dir=self.spool_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    block = upload.read(SPOOL_BLOCK)
+                    if not block: break
+                    if not written and b"%PDF-" not in block[:1024]:
+                        raise _reject("not_pdf", "The file is not a PDF.")
+                    written += len(block)
+                    if self.max_bytes and written > self.max_bytes:
+                        raise _reject("too_large", f"The file is larger than {self.max_bytes / 2**20:.0f} MB.")
+                    digest.update(block)
+                    out.write(block)
+            if not written: raise _reject("not_pdf", "The file is empty.")
+        except BaseException:
+            os.unlink(path)
+            raise
+        return path, digest.hexdigest()
+
+    def iter_pages(self, path, max_pages=None, max_chars=None, laparams=None, on_total=None):
+        """Yields page texts like extraction.iter_pdf_pages, read in a worker.
+
+        `on_total(n)` is called before the first page with the number of pages
+        that will be read (the document's page count, capped at max_pages).
+        Raises PDFRejected when the document has more than `self.max_pages`
+        pages, cannot be parsed, or the worker exceeds the time/RSS limits.
+        """
+        if laparams is not None and not isinstance(laparams, dict): laparams = vars(laparams)
+        with self._slots:
+            worker = self._checkout()
+            finished = False
+            try:
+                worker.conn.send((path, self.max_pages, max_pages, max_chars, laparams))
+                deadline = time.monotonic() + self.timeout if self.timeout else None
+                while True:
+                    if worker.conn.poll(POLL_SECONDS):
+                        try:
+                            kind, *payload = worker.conn.recv()
+                        except (EOFError, OSError):
+                            raise _reject("crashed", "The PDF reader stopped unexpectedly.") from None
+                        if kind == "page":
+                            yield payload[0]
+                        elif kind == "total":
+                            if on_total: on_total(min(payload[0], max_pages) if max_pages else payload[0])
+                        elif kind == "done":
+                            finished = True
+                            return
+                        else:
+                            finished = True   # the worker reported it cleanly and is reusable
+                            raise _reject(*payload)
+                    elif not worker.process.is_alive():
+                        raise _reject("crashed", "The PDF reader stopped unexpectedly.")
+                    if deadline and time.monotonic() > deadline:
+                        raise _reject("timeout", f"Reading the PDF took longer than {self.timeout:g} seconds.")
+                    if self.max_rss_mb and _rss_mb(worker.process.pid) > self.max_rss_mb:
+                        raise _reject("memory", "The PDF needs too much memory to read.")
+            finally:
+                # Over a limit, crashed or abandoned mid-document: never reuse it
+                if finished:
+                    with self._lock: self._idle.append(worker)
+                else:
+                    worker.kill()
+
+    def extract_text(self, path, max_pages=None, max_chars=None, laparams=None):
+        return "".join(self.iter_pages(path, max_pages=max_pages, max_chars=max_chars, laparams=laparams))
+
+    def _checkout(self):
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive(): return worker
+                worker.conn.close()
+        return _Worker(self._ctx, self.max_rss_mb)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
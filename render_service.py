@@ -0,0 +1,277 @@
+"""HTTP service that renders resume JSON with the ATS templates.
+
+    python render_service.py --port 8080 --workers 4 --queue 16
+
+    POST /render      {"template": "Ivy League", "data": {...resume_data...}}  -> application/pdf
+                      (optional "fit_pages": N scales the layout down to fit N pages)
+    GET  /templates   template names, as JSON
+    GET  /healthz     pool status, as JSON (503 until the workers are warm)
+    GET  /metrics     Prometheus text
+
+Renders run in a pool of worker processes that are started and warmed up
+(ReportLab imported, every template rendered once) before the port opens.
+At most workers + queue renders are admitted at a time; past that the service
+answers 429 with Retry-After instead of letting latency grow without bound.
+A request that waits longer than --timeout gets 504, and 503 means the pool is
+starting, draining or being replaced after a worker crash. Repeated requests
+are served from a RenderCache, with ETags (If-None-Match -> 304).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cache import RenderCache
+from metrics import METRICS
+from resume_model import Resume
+from templates import template_names
+
+
+# ==========================================
+# 1. WORKERS
+# ==========================================
+
+class ServiceBusy(Exception):
+    """Every worker and queue slot is taken (HTTP 429)."""
+
+class ServiceUnavailable(Exception):
+    """The pool is not accepting work right now (HTTP 503)."""
+
+class RenderTimeout(Exception):
+    """The render did not finish within the request timeout (HTTP 504)."""
+
+_WARMUP = {"name": "Warm Up", "contact": "warm@example.com", "objective": "Warm up.",
+           "experience": [{"company": "Acme", "role": "Engineer", "dates": "2020 - 2021", "bullets": ["Did work."]}],
+           "education": [{"university": "MIT", "degree": "BSc", "year": "2019", "grade": "3.9/4.0"}]}
+
+def _warm_worker():
+    # Pool initializer: pay ReportLab's imports, font metrics and template style
+    # compilation here rather than on the first real request
+    from pdf_generator import create_pdf
+    for name in template_names():
+        create_pdf(_WARMUP, name)
+
+def _render(resume, template, fit_pages=None):
+    from pdf_generator import create_pdf
+    return create_pdf(resume, template, fit_pages)
+
+def _worker_pid():
+    return os.getpid()
+
+
+class RenderService:
+    """Process pool with bounded admission, shared by every request thread."""
+
+    def __init__(self, workers=None, queue_size=None, timeout=30.0, cache_bytes=64 * 1024 * 1024):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = self.workers * 4 if queue_size is None else queue_size
+        self.timeout = timeout
+        self.cache = RenderCache(max_bytes=cache_bytes) if cache_bytes else None
+        self.ready = False
+        self.pending = 0          # admitted renders not finished yet (running + queued)
+        self.restarts = 0
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def start(self):
+        """Starts every worker and waits until each has warmed up."""
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker,
+                                   mp_context=multiprocessing.get_context("spawn"))
+        # Workers are spawned on demand, one per submit that finds no idle worker
+        for future in [pool.submit(_worker_pid) for _ in range(self.workers)]:
+            future.result()
+        with self._lock:
+            old, self._pool = self._pool, pool
+            self.ready = True
+        if old is not None: old.shutdown(wait=False, cancel_futures=True)
+
+    def stop(self):
+        with self._lock:
+            self.ready = False
+            pool, self._pool = self._pool, None
+        if pool is not None: pool.shutdown(wait=True, cancel_futures=True)
+
+    def render(self, data, template, fit_pages=None):
+        """Returns (pdf bytes, etag); raises ServiceBusy/ServiceUnavailable/RenderTimeout."""
+        resume, _ = Resume.from_dict(data)
+        key = self.cache.make_key(resume, template, f"fit{fit_pages}" if fit_pages else "") if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None: return cached
+
+        with self._lock:
+            pool = self._pool if self.ready else None
+        if pool is None: raise ServiceUnavailable("render workers are not ready")
+        if not self._slots.acquire(blocking=False):
+            METRICS.inc("render_rejected_total", reason="queue_full")
+            raise ServiceBusy(f"{self.workers} workers and {self.queue_size} queue slots are busy")
+        try:
+            future = pool.submit(_render, resume, template, fit_pages)
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._slots.release()
+            self._replace_pool(pool)
+            raise ServiceUnavailable("render pool is restarting") from e
+        with self._lock: self.pending += 1
+        # The slot is freed when the render really ends, not when the client gives up,
+        # so a timed-out render still counts against capacity while it runs
+        future.add_done_callback(self._finished)
+
+        try:
+            payload = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            METRICS.inc("render_rejected_total", reason="timeout")
+            raise RenderTimeout(f"render took longer than {self.timeout:g}s") from None
+        except BrokenProcessPool as e:
+            self._replace_pool(pool)
+            raise ServiceUnavailable("a render worker crashed; the pool is restarting") from e
+        if key: return payload, self.cache.put(key, payload)
+        return payload, None
+
+    def _finished(self, future):
+        with self._lock: self.pending -= 1
+        self._slots.release()
+
+    def _replace_pool(self, broken):
+        with self._lock:
+            if self._pool is not broken or not self.ready: return
+            self.ready = False
+            self.restarts += 1
+        METRICS.inc("render_pool_restarts_total")
+        threading.Thread(target=self.start, daemon=True).start()
+
+    def health(self):
+        with self._lock:
+            status = {"ready": self.ready, "workers": self.workers, "queue_size": self.queue_size,
+                      "pending": self.pending, "restarts": self.restarts}
+        if self.cache: status["cache"] = self.cache.stats()
+        return status
+
+
+# ==========================================
+# 2. HTTP
+# ==========================================
+
+def make_handler(service, max_body=1024 * 1024):
+    templates = set(template_names())
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive for load balancers and the load test
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/healthz":
+                health = service.health()
+                self._send_json(200 if health["ready"] else 503, health)
+            elif path == "/templates":
+                self._send_json(200, list(template_names()))
+            elif path == "/metrics":
+                self._send(200, METRICS.render_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            t0 = time.perf_counter()
+            code = self._handle_render()
+            METRICS.inc("render_requests_total", code=code)
+            METRICS.observe("render_request", time.perf_counter() - t0, code=code)
+
+        def _handle_render(self):
+            if self.path.split("?")[0] != "/render":
+                return self._send_json(404, {"error": "not found"})
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > max_body:
+                self.close_connection = True
+                return self._send_json(413, {"error": f"body larger than {max_body} bytes"})
+            try:
+                body = json.loads(self.rfile.read(length) or b"null")
+            except ValueError:
+                return self._send_json(400, {"error": "body is not valid JSON"})
+            if not isinstance(body, dict) or not isinstance(body.get("data"), dict):
+                return self._send_json(400, {"error": 'expected {"template": ..., "data": {...}}'})
+            template = body.get("template") or next(iter(template_names()))
+            if template not in templates:
+                return self._send_json(400, {"error": f"unknown template {template!r}",
+                                             "templates": list(template_names())})
+            fit_pages = body.get("fit_pages")
+            if fit_pages is not None and (not isinstance(fit_pages, int) or not 1 <= fit_pages <= 50):
+                return self._send_json(400, {"error": "fit_pages must be an integer from 1 to 50"})
+            try:
+                payload, etag = service.render(body["data"], template, fit_pages)
+            except ServiceBusy as e:
+                return self._send_json(429, {"error": str(e)}, {"Retry-After": "1"})
+            except ServiceUnavailable as e:
+                return self._send_json(503, {"error": str(e)}, {"Retry-After": "5"})
+            except RenderTimeout as e:
+                return self._send_json(504, {"error": str(e)})
+            except Exception as e:
+                return self._send_json(500, {"error": f"render failed: {e}"})
+            if etag and etag in (self.headers.get("If-None-Match") or ""):
+                return self._send(304, b"", None, {"ETag": etag})
+            return self._send(200, payload, "application/pdf", {"ETag": etag} if etag else None)
+
+        def _send_json(self, code, value, headers=None):
+            return self._send(code, json.dumps(value).encode("utf-8"), "application/json", headers)
+
+        def _send(self, code, body, content_type, headers=None):
+            self.send_response(code)
+            if content_type: self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+            return code
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+def serve(service, host="127.0.0.1", port=8080, max_body=1024 * 1024):
+    """Warms the pool, then serves until interrupted."""
+    service.start()
+    server = ThreadingHTTPServer((host, port), make_handler(service, max_body))
+    server.daemon_threads = True
+    print(f"Rendering on http://{host}:{server.server_port} with {service.workers} workers, "
+          f"queue {service.queue_size}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+# ==========================================
+# 3. CLI
+# ==========================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve resume JSON -> PDF rendering over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: CPU count)")
+    parser.add_argument("--queue", type=int, default=None,
+                        help="Renders allowed to wait for a worker before answering 429 (default: 4 per worker)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds a request may wait for its PDF")
+    parser.add_argument("--cache-mb", type=int, default=64, help="Rendered-PDF cache size, 0 to disable")
+    parser.add_argument("--max-body-kb", type=int, default=1024, help="Largest accepted request body")
+    args = parser.parse_args(argv)
+
+    service = RenderService(workers=args.workers, queue_size=args.queue, timeout=args.timeout,
+                            cache_bytes=args.cache_mb * 1024 * 1024)
+    serve(service, args.host, args.port, args.max_body_kb * 1024)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
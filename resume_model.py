@@ -0,0 +1,166 @@
+"""Typed, immutable resume data for the editor session.
+
+A Resume is a frozen, slotted dataclass whose list sections are tuples of
+small frozen entry objects. Because nothing mutates in place:
+
+- validation happens once, in Resume.from_dict (via extraction.validate_resume);
+- canonical_hash() and the pretty JSON shown in the editor textareas are
+  computed lazily and cached on the instance;
+- updated() only re-parses textareas whose text actually changed and reuses
+  the existing tuples otherwise, so diff() is mostly identity checks.
+"""
+import json
+from dataclasses import dataclass, field, fields, replace
+
+from cache import canonical_hash
+from extraction import ENTRY_FIELDS, LIST_KEYS, RESUME_KEYS, validate_resume
+
+
+# ==========================================
+# 1. SECTION ENTRIES
+# ==========================================
+
+@dataclass(frozen=True, slots=True)
+class Education:
+    university: str = ""
+    degree: str = ""
+    year: str = ""
+    grade: str = ""
+
+@dataclass(frozen=True, slots=True)
+class Job:
+    company: str = ""
+    role: str = ""
+    dates: str = ""
+    bullets: tuple = ()
+
+@dataclass(frozen=True, slots=True)
+class Project:
+    name: str = ""
+    tech: str = ""
+    role: str = ""
+    bullets: tuple = ()
+
+@dataclass(frozen=True, slots=True)
+class Publication:
+    title: str = ""
+    journal: str = ""
+    year: str = ""
+
+@dataclass(frozen=True, slots=True)
+class Award:
+    name: str = ""
+    year: str = ""
+
+@dataclass(frozen=True, slots=True)
+class Reference:
+    name: str = ""
+    title: str = ""
+    contact: str = ""
+
+ENTRY_TYPES = {"education": Education, "experience": Job, "projects": Project,
+               "publications": Publication, "awards": Award, "references": Reference}
+
+def _entry_from_dict(section, entry):
+    values = [tuple(entry[f]) if f == "bullets" else entry[f] for f in ENTRY_FIELDS[section]]
+    return ENTRY_TYPES[section](*values)
+
+def _entry_to_dict(entry):
+    return {f: (list(getattr(entry, f)) if f == "bullets" else getattr(entry, f))
+            for f in ENTRY_FIELDS[_SECTION_OF[type(entry)]]}
+
+_SECTION_OF = {cls: section for section, cls in ENTRY_TYPES.items()}
+
+
+# ==========================================
+# 2. RESUME
+# ==========================================
+
+@dataclass(frozen=True, slots=True)
+class Resume:
+    name: str = ""
+    address: str = ""
+    contact: str = ""
+    objective: str = ""
+    core_skills: str = ""
+    education: tuple = ()
+    experience: tuple = ()
+    projects: tuple = ()
+    publications: tuple = ()
+    awards: tuple = ()
+    scholarship: str = ""
+    languages: str = ""
+    references: tuple = ()
+    MoU: str = ""
+    # Lazily computed hash / textarea JSON; safe to keep because the instance never changes
+    _memo: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Returns (resume, problems); see extraction.validate_resume."""
+        clean, problems = validate_resume(data)
+        return cls(**{k: (tuple(_entry_from_dict(k, e) for e in clean[k]) if k in LIST_KEYS else clean[k])
+                      for k in RESUME_KEYS}), problems
+
+    def to_dict(self):
+        """Plain resume_data dict, as create_pdf and the JSON files expect."""
+        return {k: ([_entry_to_dict(e) for e in getattr(self, k)] if k in LIST_KEYS else getattr(self, k))
+                for k in RESUME_KEYS}
+
+    def canonical_hash(self):
+        """Same digest as cache.canonical_hash(self.to_dict()), computed once."""
+        digest = self._memo.get("hash")
+        if digest is None:
+            digest = self._memo["hash"] = canonical_hash(self.to_dict())
+        return digest
+
+    def section_json(self, section):
+        """Pretty JSON for a list section's textarea, serialized on first use only."""
+        key = "json:" + section
+        text = self._memo.get(key)
+        if text is None:
+            text = self._memo[key] = json.dumps([_entry_to_dict(e) for e in getattr(self, section)], indent=2)
+        return text
+
+    def updated(self, **values):
+        """Returns a new Resume from editor values; list sections are given as JSON text.
+
+        Textareas whose text is unchanged keep the existing tuple (and its cached
+        JSON) without being parsed. Raises ValueError naming a section whose JSON
+        is broken or does not fit the schema.
+        """
+        changes = {}
+        for key, value in values.items():
+            if key not in LIST_KEYS:
+                if value != getattr(self, key): changes[key] = value
+                continue
+            if value == self.section_json(key): continue
+            try:
+                parsed = json.loads(value)
+            except ValueError as e:
+                raise ValueError(f"{key}: {e}") from e
+            clean, problems = validate_resume({key: parsed}, (key,))
+            if problems:
+                raise ValueError(f"{key}: expected a list of objects with {', '.join(ENTRY_FIELDS[key])}")
+            section = tuple(_entry_from_dict(key, e) for e in clean[key])
+            if section != getattr(self, key): changes[key] = section
+        if not changes: return self
+
+        new = replace(self, **changes)
+        # Carry over textarea JSON for the sections that did not change
+        for key, text in self._memo.items():
+            if key.startswith("json:") and key[5:] not in changes:
+                new._memo[key] = text
+        return new
+
+    def diff(self, other):
+        """Names of the top-level fields that differ from `other`."""
+        changed = []
+        for key in RESUME_KEYS:
+            mine, theirs = getattr(self, key), getattr(other, key)
+            if mine is not theirs and mine != theirs: changed.append(key)
+        return changed
+
+    def __reduce__(self):
+        # Pickle (e.g. to the render pool) without the memo
+        return (Resume, tuple(getattr(self, f.name) for f in fields(self) if f.init))
@@ -0,0 +1,62 @@
+"""Section detection for extracted resume text.
+
+Splits pdfminer output into the resume sections the app knows about by
+recognising heading lines ("Work Experience", "PUBLICATIONS", "Honors &
+Awards"...). Text before the first heading is the "header" block (name,
+contact, address).
+"""
+import re
+from collections import OrderedDict
+
+# Canonical section -> heading variants (lower case, punctuation stripped)
+SECTION_HEADINGS = {
+    "objective": ("objective", "career objective", "summary", "professional summary", "profile",
+                  "professional profile", "about me", "personal statement"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history", "research experience",
+                   "teaching experience", "relevant experience"),
+    "education": ("education", "academic background", "academic qualifications", "qualifications",
+                  "educational background", "education and training"),
+    "projects": ("projects", "research projects", "selected projects", "academic projects",
+                 "personal projects", "funded projects", "grants", "grants and projects"),
+    "publications": ("publications", "selected publications", "journal publications", "conference papers",
+                     "research publications", "papers", "peer reviewed publications"),
+    "core_skills": ("skills", "core skills", "technical skills", "key skills", "core competencies",
+                    "competencies", "skills and tools"),
+    "awards": ("awards", "honors", "honours", "awards and honors", "awards and honours",
+               "honors and awards", "achievements", "awards and achievements"),
+    "scholarship": ("scholarship", "scholarships", "fellowship", "fellowships",
+                    "scholarship fellowship", "scholarships and fellowships"),
+    "languages": ("languages", "language skills", "language proficiency"),
+    "references": ("references", "referees", "references available"),
+    "MoU": ("mou", "affiliations", "memberships", "professional memberships", "professional affiliations"),
+}
+
+HEADING_LOOKUP = {variant: key for key, variants in SECTION_HEADINGS.items() for variant in variants}
+_NON_WORD = re.compile(r"[^a-z ]+")
+_SPACES = re.compile(r"\s+")
+
+def heading_key(line):
+    """Returns the canonical section for a heading line, or None."""
+    stripped = line.strip()
+    if not stripped or len(stripped) > 48: return None
+    norm = _SPACES.sub(" ", _NON_WORD.sub(" ", stripped.lower().replace("&", " and "))).strip()
+    if len(norm.split()) > 5: return None
+    return HEADING_LOOKUP.get(norm)
+
+def split_sections(raw):
+    """Returns an OrderedDict {"header": text, section: text, ...} in document order.
+
+    Repeated headings (e.g. "Publications" continued on a later page) are
+    merged into one section.
+    """
+    sections = OrderedDict(header=[])
+    current = "header"
+    for line in raw.replace("\x0c", "\n").splitlines():
+        key = heading_key(line)
+        if key:
+            current = key
+            sections.setdefault(key, [])
+            continue
+        sections[current].append(line)
+    return OrderedDict((k, "\n".join(v).strip()) for k, v in sections.items())
@@ -0,0 +1,323 @@
+"""Per-session storage with one memory budget for the whole server process.
+
+    store = SessionStore(memory_budget=256 * 2**20, idle_ttl=1800)
+    session = store.session(session_id)
+    session["pdf_bytes"] = pdf                   # counted against the budget, may spill to disk
+    pdf = session.get("pdf_bytes")               # read back from the spill file if it was spilled
+    store.stats()                                # sessions, bytes per tier, process RSS
+
+Small values (a Resume, a list of section names) stay in memory until their
+session expires. bytes and str values of at least `blob_min_bytes` are blobs:
+they share `memory_budget` across every session, and when it is exceeded the
+least recently used blobs are written to files in a temp directory and their
+memory released. A spilled blob keeps its file after it is read back, so
+spilling it again costs nothing. Sessions untouched for `idle_ttl` seconds are
+dropped with their files; past `disk_budget` the oldest spilled blobs are
+deleted, and reading one then returns the default like a missing key.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from metrics import METRICS
+
+_MISSING = object()
+
+def process_memory():
+    """{"rss_bytes": current resident set size, "peak_rss_bytes": high-water mark} of this process."""
+    rss = 0
+    try:
+        with open("/proc/self/statm") as fh:
+            rss = int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak *= 1 if sys.platform == "darwin" else 1024   # bytes on macOS, KiB on Linux
+    except ImportError:
+        peak = 0
+    return {"rss_bytes": rss or peak, "peak_rss_bytes": peak}
+
+
+class Session:
+    """Dict-style view of one session's values in a SessionStore."""
+
+    def __init__(self, store, session_id):
+        self.store = store
+        self.id = session_id
+
+    def get(self, key, default=None):
+        return self.store.get(self.id, key, default)
+
+    def __getitem__(self, key):
+        value = self.store.get(self.id, key, _MISSING)
+        if value is _MISSING: raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.store.set(self.id, key, value)
+
+    def __delitem__(self, key):
+        self.store.delete(self.id, key)
+
+    def clear(self):
+        self.store.drop(self.id)
+
+
+class SessionStore:
+    """Session values with a shared memory budget, spill-to-disk LRU and idle expiry."""
+
+    def __init__(self, memory_budget=256 * 2**20, disk_budget=2 * 2**30, idle_ttl=1800,
+                 blob_min_bytes=1024, spill_dir=None, sweep_interval=30):
+        self.memory_budget = memory_budget
+        self.disk_budget = disk_budget
+        self.idle_ttl = idle_ttl
+        self.blob_min_bytes = blob_min_bytes
+        self.sweep_interval = sweep_interval
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix="resume-sessions-")
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self._sessions = {}             # session id -> {"touched": t, "values": {key: value or blob}}
+        self._resident = OrderedDict()  # (session id, key) -> blob held in memory, least recent first
+        self._spilled = OrderedDict()   # (session id, key) -> blob with a file, least recent first
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.spills = 0
+        self.reloads = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def session(self, session_id=None):
+        """A Session view; a new random id when none is given."""
+        return Session(self, session_id or uuid.uuid4().hex)
+
+    # --- PUBLIC API ---
+    def get(self, session_id, key, default=None):
+        self._maybe_sweep()
+        with self._lock:
+            values = self._touch(session_id)
+            value = values.get(key, default)
+            if not isinstance(value, _Blob): return value
+            data = value.data
+            if data is not None:
+                if (session_id, key) in self._resident: self._resident.move_to_end((session_id, key))
+                return value.decode(data)
+            path = value.path
+        # Spilled: read the file without holding the lock
+        data = _read_file(path) if path else None
+        with self._lock:
+            if data is None:
+                if values.get(key) is value: del values[key]
+                return default
+            if value.live and value.data is None:
+                value.data = data
+                self._resident[(session_id, key)] = value
+                self.memory_bytes += value.size
+                self.reloads += 1
+                if (session_id, key) in self._spilled: self._spilled.move_to_end((session_id, key))
+            spill, remove = self._over_budget()
+        self._do_io(spill, remove)
+        return value.decode(data)
+
+    def set(self, session_id, key, value):
+        """Stores `value`; None removes the key, like a fresh session would read it."""
+        self._maybe_sweep()
+        with self._lock:
+            values = self._touch(session_id)
+            remove = self._discard(session_id, key, values.pop(key, None))
+            spill = []
+            if value is None:
+                pass
+            elif isinstance(value, (bytes, bytearray, str)) and len(value) >= self.blob_min_bytes:
+                blob = _Blob(value)
+                values[key] = blob
+                self._resident[(session_id, key)] = blob
+                self.memory_bytes += blob.size
+                spill, more = self._over_budget()
+                remove += more
+            else:
+                values[key] = value
+        self._do_io(spill, remove)
+        self._publish()
+
+    def delete(self, session_id, key):
+        self.set(session_id, key, None)
+
+    def drop(self, session_id):
+        """Forgets a whole session and deletes its spill files."""
+        with self._lock:
+            remove = self._drop(session_id)
+        self._do_io([], remove)
+        self._publish()
+
+    def expire_idle(self, now=None):
+        """Drops sessions idle for longer than idle_ttl; returns how many."""
+        now = time.monotonic() if now is None else now
+        remove = []
+        with self._lock:
+            self._last_sweep = now
+            idle = [sid for sid, entry in self._sessions.items() if now - entry["touched"] > self.idle_ttl]
+            for sid in idle:
+                remove += self._drop(sid)
+            self.expired += len(idle)
+        self._do_io([], remove)
+        if idle:
+            METRICS.inc("session_store_evictions_total", len(idle), reason="idle")
+            self._publish()
+        return len(idle)
+
+    def stats(self):
+        self._publish()
+        with self._lock:
+            stats = {"sessions": len(self._sessions), "memory_bytes": self.memory_bytes,
+                     "memory_budget": self.memory_budget, "disk_bytes": self.disk_bytes,
+                     "resident_blobs": len(self._resident), "spilled_blobs": len(self._spilled),
+                     "spills": self.spills, "reloads": self.reloads, "evictions": self.evictions,
+                     "expired": self.expired}
+        stats.update(process_memory())
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._sessions.clear()
+            self._resident.clear()
+            self._spilled.clear()
+            self.memory_bytes = self.disk_bytes = 0
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    # --- INTERNALS (called with the lock held, except _do_io) ---
+    # Files are written, read and deleted outside the lock, so one slow disk
+    # operation does not stall every other session. The locked helpers only
+    # decide what to spill or delete and hand back that work.
+    def _touch(self, session_id):
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = self._sessions[session_id] = {"touched": 0.0, "values": {}}
+        entry["touched"] = time.monotonic()
+        return entry["values"]
+
+    def _drop(self, session_id):
+        entry = self._sessions.pop(session_id, None)
+        if entry is None: return []
+        return [path for key, value in entry["values"].items() for path in self._discard(session_id, key, value)]
+
+    def _discard(self, session_id, key, value):
+        """Unaccounts a blob that is being replaced; returns its file to delete."""
+        if not isinstance(value, _Blob): return []
+        value.live = False
+        if self._resident.pop((session_id, key), None) is not None: self.memory_bytes -= value.size
+        if self._spilled.pop((session_id, key), None) is not None: self.disk_bytes -= value.size
+        path, value.path = value.path, None
+        return [path] if path else []
+
+    def _over_budget(self):
+        """Takes least recently used blobs out of memory until within budget.
+
+        Returns (blobs to write, files to delete). Blobs that already have a
+        file are released here; the others keep their data until written.
+        """
+        spill = []
+        while self.memory_bytes > self.memory_budget and self._resident:
+            ident, blob = self._resident.popitem(last=False)
+            self.memory_bytes -= blob.size
+            if blob.path is None:
+                spill.append((ident, blob))
+            else:
+                blob.data = None
+                self._spilled.move_to_end(ident)
+        return spill, self._over_disk_budget()
+
+    def _over_disk_budget(self):
+        remove = []
+        while self.disk_bytes > self.disk_budget and self._spilled:
+            _, blob = self._spilled.popitem(last=False)
+            self.disk_bytes -= blob.size
+            remove.append(blob.path)
+            blob.path = None
+            # A blob that was read back only loses its file; one that wasn't is gone
+            if blob.data is None:
+                self.evictions += 1
+                METRICS.inc("session_store_evictions_total", reason="disk")
+        return remove
+
+    def _do_io(self, spill, remove):
+        """Writes spilled blobs and deletes files; called without the lock."""
+        while spill or remove:
+            for path in remove:
+                try: os.remove(path)
+                except OSError: pass
+            remove = []
+            for ident, blob in spill:
+                path = _write_file(self.spill_dir, blob.data)
+                with self._lock:
+                    remove += self._spilled_to(ident, blob, path)
+            spill = []
+
+    def _spilled_to(self, ident, blob, path):
+        if path is None:
+            # Disk full or unwritable: keep it in memory rather than lose it
+            if blob.live:
+                self._resident[ident] = blob
+                self._resident.move_to_end(ident, last=False)
+                self.memory_bytes += blob.size
+            return []
+        if not blob.live: return [path]
+        blob.path = path
+        blob.data = None
+        self._spilled[ident] = blob
+        self.disk_bytes += blob.size
+        self.spills += 1
+        METRICS.inc("session_store_spills_total")
+        return self._over_disk_budget()
+
+    def _maybe_sweep(self):
+        if time.monotonic() - self._last_sweep >= self.sweep_interval:
+            self.expire_idle()
+
+    def _publish(self):
+        with self._lock:
+            memory, disk, sessions = self.memory_bytes, self.disk_bytes, len(self._sessions)
+        METRICS.set_gauge("session_store_bytes", memory, tier="memory")
+        METRICS.set_gauge("session_store_bytes", disk, tier="disk")
+        METRICS.set_gauge("session_store_sessions", sessions)
+        METRICS.set_gauge("process_resident_bytes", process_memory()["rss_bytes"])
+
+
+class _Blob:
+    """A bytes/str value that may live in memory, in a spill file, or both."""
+
+    __slots__ = ("data", "size", "text", "path", "live")
+
+    def __init__(self, value):
+        self.text = isinstance(value, str)
+        self.data = value.encode("utf-8") if self.text else bytes(value)
+        self.size = len(self.data)
+        self.path = None
+        self.live = True    # False once replaced or dropped; a late spill then deletes its file
+
+    def decode(self, data):
+        return data.decode("utf-8") if self.text else data
+
+
+def _write_file(spill_dir, data):
+    path = os.path.join(spill_dir, uuid.uuid4().hex)
+    try:
+        with open(path, "wb") as fh: fh.write(data)
+    except OSError:
+        try: os.remove(path)
+        except OSError: pass
+        return None
+    return path
+
+def _read_file(path):
+    try:
+        with open(path, "rb") as fh: return fh.read()
+    except OSError:
+        return None
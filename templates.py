@@ -0,0 +1,211 @@
+"""Template registry for the ATS resume layouts.
+
+Each template is an immutable TemplateSpec. The per-section formatting (job,
+education and project headers) is chosen up front and its ParagraphStyles
+are compiled once, the first time get_template() hands the spec to
+create_pdf, so listing templates for the sidebar never imports the ReportLab
+platypus stack. get_template(name, scale) gives the same layout with fonts,
+leading and spacing scaled (used by create_pdf's fit-to-pages mode). New
+layouts are added with register_template() without touching create_pdf.
+"""
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from types import MappingProxyType
+
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+
+FULL_WIDTH = 530
+
+@lru_cache(maxsize=None)
+def _base_style():
+    from reportlab.lib.styles import getSampleStyleSheet
+    return getSampleStyleSheet()['Normal']
+
+@lru_cache(maxsize=None)
+def job_table_style():
+    from reportlab.platypus import TableStyle
+    return TableStyle([
+        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+        ('ALIGN', (1,0), (1,0), 'RIGHT'),
+        ('VALIGN', (0,0), (-1,-1), 'TOP'),
+        ('LEFTPADDING', (0,0), (-1,-1), 0),
+        ('RIGHTPADDING', (0,0), (-1,-1), 0),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 0),
+        ('TOPPADDING', (0,0), (-1,-1), 0),
+    ])
+
+
+# ==========================================
+# 1. TEMPLATE SPEC
+# ==========================================
+
+@dataclass(frozen=True)
+class TemplateSpec:
+    name: str
+    font_header: str
+    font_body: str
+    header_align: int
+    name_size: int
+    section_header_case: str   # "upper" or "title"
+    has_lines: bool
+    separator: str
+    format_job: object         # (spec, role, company, dates) -> [flowables]
+    format_education: object   # (spec, degree, uni, year) -> [flowables]
+    format_project_head: object  # (p_name, p_tech) -> str
+    styles: MappingProxyType = None  # filled in by get_template()
+
+def build_styles(font_header, font_body, header_align, name_size, scale=1.0):
+    from reportlab.lib.styles import ParagraphStyle
+    _BASE = _base_style()
+    k = scale
+    # The header's leading is inherited from the base style (12), like the original layout
+    styles = {
+        'name': ParagraphStyle('Name', parent=_BASE,
+                               fontSize=name_size*k, alignment=header_align,
+                               spaceAfter=6*k, fontName=font_header, leading=(name_size+4)*k),
+        'contact': ParagraphStyle('Contact', parent=_BASE,
+                                  fontSize=10*k, alignment=header_align,
+                                  spaceAfter=10*k, fontName=font_body, leading=12*k),
+        'header': ParagraphStyle('Header', parent=_BASE,
+                                 fontSize=12*k, leading=_BASE.leading*k, spaceBefore=12*k, spaceAfter=4*k,
+                                 fontName=font_header, alignment=TA_LEFT),
+        'normal': ParagraphStyle('Normal_Body', parent=_BASE,
+                                 fontSize=10.5*k, leading=14*k, alignment=TA_LEFT, fontName=font_body),
+        'bullet': ParagraphStyle('Bullet_Body', parent=_BASE,
+                                 fontSize=10.5*k, leading=14*k, leftIndent=15, bulletIndent=0, fontName=font_body),
+        # Styles specifically for the "Table" headers (Right aligned dates)
+        'left_col': ParagraphStyle('LeftCol', parent=_BASE, fontSize=10.5*k, leading=14*k, fontName=font_body),
+        'right_col': ParagraphStyle('RightCol', parent=_BASE, fontSize=10.5*k, leading=14*k, fontName=font_body, alignment=TA_RIGHT),
+    }
+    return MappingProxyType(styles)
+
+def scale_styles(styles, scale):
+    """Copies of already built styles with font size, leading and spacing scaled."""
+    from reportlab.lib.styles import ParagraphStyle
+    return MappingProxyType({
+        key: ParagraphStyle(style.name, parent=style, fontSize=style.fontSize*scale, leading=style.leading*scale,
+                            spaceBefore=style.spaceBefore*scale, spaceAfter=style.spaceAfter*scale)
+        for key, style in styles.items()})
+
+
+# ==========================================
+# 2. SECTION FORMATTERS
+# ==========================================
+
+def job_header_table(spec, left_text, right_text):
+    from reportlab.platypus import Paragraph, Table
+    # 2-column table: Left text (Company) | Right text (Date), so the date is always right-aligned
+    data_row = [[Paragraph(left_text, spec.styles['left_col']), Paragraph(right_text, spec.styles['right_col'])]]
+    t = Table(data_row, colWidths=[FULL_WIDTH * 0.75, FULL_WIDTH * 0.25])
+    t.setStyle(job_table_style())
+    return t
+
+def job_table_italic_role(spec, role, company, dates):
+    from reportlab.platypus import Paragraph
+    return [job_header_table(spec, f"<b>{company}</b>", dates),
+            Paragraph(f"<i>{role}</i>", spec.styles['normal'])]
+
+def job_table_bold_dates(spec, role, company, dates):
+    from reportlab.platypus import Paragraph
+    return [job_header_table(spec, f"<b>{company}</b>", f"<b>{dates}</b>"),
+            Paragraph(role, spec.styles['normal'])]
+
+def job_inline_classic(spec, role, company, dates):
+    from reportlab.platypus import Paragraph
+    return [Paragraph(f"<b>{role}</b>, {company} -- <i>{dates}</i>", spec.styles['normal'])]
+
+def job_inline_modern(spec, role, company, dates):
+    from reportlab.platypus import Paragraph
+    style = spec.styles['normal']
+    # Dates a notch smaller than the body text (9pt next to 10.5pt at full scale)
+    size = style.fontSize * 6 / 7
+    return [Paragraph(f"<b>{role}</b> | {company} <font color='grey' size={size:g}>({dates})</font>", style)]
+
+def education_table(spec, degree, uni, year):
+    from reportlab.platypus import Paragraph
+    return [job_header_table(spec, f"<b>{uni}</b>", year),
+            Paragraph(degree, spec.styles['normal'])]
+
+def education_inline(spec, degree, uni, year):
+    from reportlab.platypus import Paragraph
+    line = f"<b>{degree}</b>, {uni}"
+    if year: line += f", {year}"
+    return [Paragraph(line, spec.styles['normal'])]
+
+def project_head_brackets(p_name, p_tech):
+    return f"<b>{p_name}</b> [{p_tech}]"
+
+def project_head_pipe(p_name, p_tech):
+    return f"<b>{p_name}</b> | {p_tech}"
+
+
+# ==========================================
+# 3. REGISTRY
+# ==========================================
+
+TEMPLATES = {}
+
+def make_template(name, font_header, font_body, header_align, name_size, section_header_case,
+                  has_lines, separator, format_job=job_inline_modern, format_education=education_inline,
+                  format_project_head=project_head_pipe):
+    return TemplateSpec(
+        name=name, font_header=font_header, font_body=font_body, header_align=header_align,
+        name_size=name_size, section_header_case=section_header_case, has_lines=has_lines,
+        separator=separator, format_job=format_job, format_education=format_education,
+        format_project_head=format_project_head,
+    )
+
+# (name, scale) -> spec with compiled styles
+_COMPILED = {}
+
+def register_template(spec):
+    TEMPLATES[spec.name] = spec
+    for key in [k for k in _COMPILED if k[0] == spec.name]:
+        del _COMPILED[key]
+    return spec
+
+def get_template(name, scale=1.0):
+    """Returns the spec (or the default) with its ParagraphStyles compiled at `scale`.
+
+    A spec registered with its own `styles` uses them as the full-scale
+    styles; other scales get scaled copies of them.
+    """
+    spec = TEMPLATES.get(name, DEFAULT_TEMPLATE)
+    scale = round(scale, 2)   # bounds the cache to one entry per percent
+    if spec.styles is not None and scale == 1.0: return spec
+    compiled = _COMPILED.get((spec.name, scale))
+    if compiled is None:
+        if spec.styles is not None:
+            styles = scale_styles(spec.styles, scale)
+        else:
+            styles = build_styles(spec.font_header, spec.font_body, spec.header_align, spec.name_size, scale)
+        compiled = _COMPILED[(spec.name, scale)] = replace(spec, styles=styles)
+    return compiled
+
+def template_names():
+    return tuple(TEMPLATES)
+
+# Order here is the order shown in the sidebar
+register_template(make_template(
+    "Ivy League", "Times-Bold", "Times-Roman", TA_CENTER, 26, "title", True, " • ",
+    format_job=job_table_italic_role, format_education=education_table,
+    format_project_head=project_head_brackets))
+
+register_template(make_template(
+    "Executive", "Times-Bold", "Times-Roman", TA_LEFT, 28, "upper", True, " | ",
+    format_job=job_table_bold_dates, format_education=education_table,
+    format_project_head=project_head_brackets))
+
+register_template(make_template(
+    "Classic Serif", "Times-Bold", "Times-Roman", TA_CENTER, 24, "title", True, " | ",
+    format_job=job_inline_classic, format_project_head=project_head_brackets))
+
+register_template(make_template(
+    "Modern Sans", "Helvetica-Bold", "Helvetica", TA_LEFT, 26, "upper", False, "  •  "))
+
+register_template(make_template(
+    "Minimalist", "Helvetica-Bold", "Helvetica", TA_LEFT, 20, "upper", True, " | "))
+
+# Fallback for unknown template names (not listed in the sidebar)
+DEFAULT_TEMPLATE = make_template(
+    "Default", "Helvetica-Bold", "Helvetica", TA_LEFT, 22, "title", True, " | ")
@@ -0,0 +1,68 @@
+import json
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from ats_score import B, K1, main, resume_tokens, score_matrix, tokenize
+
+RESUMES = [{"core_skills": "Python, SQL, Spark", "experience": [{"bullets": ["Built machine learning pipelines"]}]},
+           {"core_skills": "Java, Spring"},
+           {"projects": [{"tech": "React, node.js"}]}]
+JOBS = ["Python and machine learning engineer with Spark", "Java developer (Spring)", "Rust"]
+
+
+def test_tokenize():
+    assert tokenize("Strong C++ and node.js, machine learning; 5 years") == [
+        "c++", "node.js", "machine", "learning", "machine learning"]
+    assert tokenize("machine learning", bigrams=False) == ["machine", "learning"]
+
+def test_resume_fields_do_not_form_phrases():
+    tokens = resume_tokens({"core_skills": "Python", "experience": [{"bullets": ["Go services"]}]})
+    assert "python go" not in tokens and "go services" in tokens
+
+def test_bm25_matches_the_formula():
+    result = score_matrix(RESUMES, JOBS)
+    docs = [Counter(resume_tokens(r)) for r in RESUMES]
+    avgdl = sum(sum(d.values()) for d in docs) / len(docs)
+    for i, doc in enumerate(docs):
+        dl = sum(doc.values())
+        for j, job in enumerate(JOBS):
+            expected = 0.0
+            for term in set(tokenize(job)):
+                df = sum(term in d for d in docs)
+                idf = math.log1p((len(docs) - df + 0.5) / (df + 0.5))
+                tf = doc[term]
+                expected += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * dl / avgdl))
+            assert result.scores[i, j] == pytest.approx(expected)
+
+@pytest.mark.parametrize("method", ["bm25", "tfidf"])
+def test_ranking_and_coverage(method):
+    result = score_matrix(RESUMES, JOBS, method)
+    assert result.scores.shape == (3, 3)
+    assert result.top(0, 1) == [0] and result.top(1, 1) == [1]
+    assert np.all(result.scores[:, 2] == 0) and np.all(result.coverage[:, 2] == 0)
+    assert 0 < result.coverage[0, 0] < 1
+    if method == "tfidf": assert result.scores.max() <= 1.0 + 1e-9
+
+def test_report():
+    report = score_matrix(RESUMES, JOBS).report(0, 0)
+    assert {m["keyword"] for m in report["matched"]} == {"python", "machine", "learning", "machine learning", "spark"}
+    assert {m["keyword"] for m in report["missing"]} == {"engineer", "learning engineer"}
+    assert len(score_matrix(RESUMES, JOBS).report(0, 0, limit=2)["matched"]) == 2
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        score_matrix(RESUMES, JOBS, "word2vec")
+
+def test_cli(tmp_path, capsys):
+    for i, data in enumerate(RESUMES):
+        (tmp_path / f"cv{i}.json").write_text(json.dumps(data))
+    jobs = tmp_path / "jobs"
+    jobs.mkdir()
+    (jobs / "java.txt").write_text(JOBS[1])
+    assert main([str(tmp_path), "--jobs", str(jobs), "--top", "1", "--out", str(tmp_path / "report.out")]) == 0
+    assert "cv1.json" in capsys.readouterr().out
+    report = json.loads((tmp_path / "report.out").read_text())
+    assert report[str(jobs / "java.txt")][0]["resume"].endswith("cv1.json")
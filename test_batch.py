@@ -0,0 +1,65 @@
+import json
+import os
+import random
+
+import pytest
+
+from batch import assign_stems, discover_inputs, format_stats, run_batch, template_filename
+from benchmark import make_resume
+from cache import ExtractionCache
+from llm_client import AsyncLLMClient, FakeBackend
+from pdf_generator import create_pdf
+
+TEMPLATES = ["Modern Sans", "Ivy League"]
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    src = tmp_path / "in"
+    (src / "sub").mkdir(parents=True)
+    for i, name in enumerate(["a.pdf", "b.pdf", "sub/a.pdf"]):
+        (src / name).write_bytes(create_pdf(make_resume(random.Random(i), "1-page"), "Classic Serif"))
+    (src / "notes.txt").write_text("not a pdf")
+    return src
+
+def fake_client(response_fn=None):
+    return AsyncLLMClient(FakeBackend(latency=0, jitter=0, response_fn=response_fn))
+
+def test_discover_inputs_and_stems(inputs, tmp_path):
+    paths = discover_inputs(str(inputs))
+    assert [os.path.relpath(p, inputs) for p in paths] == ["a.pdf", "b.pdf", os.path.join("sub", "a.pdf")]
+    assert assign_stems(paths) == ["a", "b", "a_2"]
+    manifest = tmp_path / "list.txt"
+    manifest.write_text("# comment\nin/b.pdf\n\n" + str(inputs / "a.pdf") + "\n")
+    assert discover_inputs(str(manifest)) == [str(tmp_path / "in" / "b.pdf"), str(inputs / "a.pdf")]
+    assert template_filename("cv", "Ivy League") == "cv__Ivy_League.pdf"
+
+def test_run_and_resume(inputs, tmp_path):
+    out = tmp_path / "out"
+    paths = discover_inputs(str(inputs))
+    stats = run_batch(paths, str(out), TEMPLATES, fake_client(), workers=2, log=lambda msg: None)
+    assert (stats["parsed"], stats["rendered"], stats["failed"]) == (3, 6, 0)
+    for stem in ("a", "b", "a_2"):
+        assert json.loads((out / f"{stem}.json").read_text())["name"].startswith("Candidate")
+        for t in TEMPLATES:
+            assert (out / template_filename(stem, t)).read_bytes().startswith(b"%PDF")
+    assert "3 parsed (0 partly)" in format_stats(stats)
+
+    # A re-run skips finished documents and only renders what is missing
+    os.remove(out / template_filename("b", "Ivy League"))
+    stats = run_batch(paths, str(out), TEMPLATES, fake_client(), workers=2, log=lambda msg: None)
+    assert (stats["skipped"], stats["parsed"], stats["rendered"]) == (2, 0, 1)
+
+def test_partial_parse_is_not_cached(inputs, tmp_path):
+    cache = ExtractionCache()
+    paths = discover_inputs(str(inputs))[:1]
+    logged = []
+    stats = run_batch(paths, str(tmp_path / "out"), TEMPLATES[:1], fake_client(lambda prompt: '{"name": "Jane"}'),
+                      workers=1, cache=cache, log=logged.append)
+    assert stats["partial"] == 1
+    assert any("could not parse" in msg for msg in logged)
+    assert cache.stats()["memory_entries"] == 0
+
+    stats = run_batch(paths, str(tmp_path / "out2"), TEMPLATES[:1], fake_client(), workers=1, cache=cache,
+                      log=lambda msg: None)
+    assert (stats["partial"], cache.stats()["memory_entries"]) == (0, 1)
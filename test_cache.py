@@ -0,0 +1,63 @@
+import os
+import time
+
+from cache import ExtractionCache, RenderCache, canonical_hash, make_etag
+
+PDF = b"%PDF-1.4 resume"
+
+
+def test_key_covers_document_prompt_model_and_limits():
+    key = ExtractionCache.make_key(PDF, "prompt", "model")
+    assert key == ExtractionCache.make_key(None, "prompt", "model", doc_hash=key.split("-")[0])
+    others = [ExtractionCache.make_key(PDF + b" ", "prompt", "model"),
+              ExtractionCache.make_key(PDF, "prompt v2", "model"),
+              ExtractionCache.make_key(PDF, "prompt", "model-2"),
+              ExtractionCache.make_key(PDF, "prompt", "model", max_pages=30),
+              ExtractionCache.make_key(PDF, "prompt", "model", max_pages=30, max_chars=120000),
+              ExtractionCache.make_key(PDF, "prompt", "model", max_pages=5, max_chars=120000)]
+    assert len({key, *others}) == 7
+
+def test_memory_lru():
+    cache = ExtractionCache(max_entries=2)
+    for i in range(3):
+        cache.put(f"k{i}", f"raw {i}", {"name": str(i)})
+    assert cache.get("k0") is None
+    assert cache.get("k2") == {"raw": "raw 2", "data": {"name": "2"}}
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    ExtractionCache(disk_dir=str(tmp_path)).put("k", "raw", {"name": "Jane"})
+    cache = ExtractionCache(disk_dir=str(tmp_path))
+    assert cache.get("k") == {"raw": "raw", "data": {"name": "Jane"}}
+    assert cache.disk_hits == 1
+    cache.clear()
+    assert ExtractionCache(disk_dir=str(tmp_path)).get("k") is None
+
+def test_disk_budget_and_ttl(tmp_path):
+    cache = ExtractionCache(max_entries=1, disk_dir=str(tmp_path), disk_max_bytes=400)   # two ~160-byte entries
+    for i in range(4):
+        cache.put(f"k{i}", "x" * 100, {})
+        os.utime(tmp_path / f"k{i}.json", (time.time() - 10 + i,) * 2)
+    assert sorted(os.listdir(tmp_path)) == ["k2.json", "k3.json"]
+    expired = ExtractionCache(disk_dir=str(tmp_path), ttl_seconds=0)
+    time.sleep(0.01)
+    assert expired.get("k3") is None and not (tmp_path / "k3.json").exists()
+
+def test_render_cache():
+    cache = RenderCache(max_bytes=10)
+    data = {"name": "Jane", "skills": ["a", "b"]}
+    key = cache.make_key(data, "Minimalist", "fit1")
+    assert key == cache.make_key({"skills": ["a", "b"], "name": "Jane"}, "Minimalist", "fit1")
+    assert key.startswith(canonical_hash(data))
+    assert cache.put(key, b"123456") == make_etag(b"123456")
+    cache.put("other", b"7890")
+    cache.put("third", b"xyz")          # over 10 bytes: the oldest entry goes
+    assert cache.get(key) is None and cache.get("third") == (b"xyz", make_etag(b"xyz"))
+    cache.put("huge", b"x" * 11)        # larger than the whole cache: not stored
+    assert cache.get("huge") is None
+    renders = []
+    def render(d, t):
+        renders.append(t)
+        return b"pdf"
+    assert cache.get_or_render(data, "Executive", render) == cache.get_or_render(data, "Executive", render)
+    assert renders == ["Executive"]
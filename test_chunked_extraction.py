@@ -0,0 +1,47 @@
+import asyncio
+import importlib
+import json
+
+import chunked_extraction
+import extraction
+from chunked_extraction import extract_section, merge_section_results
+from extraction import empty_resume
+from llm_client import AsyncLLMClient, FakeBackend, LLMError
+
+
+def client(*replies):
+    """A client whose successive prompts get the given replies (the last one repeats)."""
+    replies = list(replies)
+    return AsyncLLMClient(FakeBackend(latency=0, jitter=0,
+                                      response_fn=lambda prompt: json.dumps(replies.pop(0) if len(replies) > 1 else replies[0])))
+
+def test_partial_section_keeps_validated_keys():
+    # Regression: a section with one missing key used to lose the keys that did validate
+    result = asyncio.run(extract_section(client({"name": "Jane Roe", "contact": "jane@x.org"}), "header", "Jane Roe"))
+    assert result == ({"name": "Jane Roe", "contact": "jane@x.org"}, {"address": "missing"})
+    data = empty_resume()
+    assert merge_section_results(data, ["header"], [result]) == ["address"]
+    assert (data["name"], data["contact"], data["address"]) == ("Jane Roe", "jane@x.org", "")
+
+def test_retry_fills_in_the_missing_keys():
+    c = client({"name": "Jane Roe"}, {"address": "Boston", "contact": "jane@x.org", "name": ""})
+    good, problems = asyncio.run(extract_section(c, "header", "Jane Roe"))
+    assert good == {"name": "Jane Roe", "address": "Boston", "contact": "jane@x.org"}
+    assert problems == {}
+
+def test_failed_call_marks_every_key_of_the_section():
+    data = empty_resume()
+    failed = merge_section_results(data, ["header", "objective"],
+                                   [LLMError("quota"), ({"objective": "Build things"}, {})])
+    assert failed == ["name", "address", "contact"]
+    assert data["objective"] == "Build things"
+
+def test_fingerprint_covers_the_fallback_prompt(monkeypatch):
+    before = chunked_extraction.PROMPT_FINGERPRINT
+    monkeypatch.setattr(extraction, "EXTRACTION_PROMPT", extraction.EXTRACTION_PROMPT + " ")
+    try:
+        assert importlib.reload(chunked_extraction).PROMPT_FINGERPRINT != before
+    finally:
+        monkeypatch.undo()
+        importlib.reload(chunked_extraction)
+    assert chunked_extraction.PROMPT_FINGERPRINT == before
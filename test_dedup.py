@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from dedup import NUM_PERM, MinHashLSH, minhash, shingles, similarity
+
+_rng = random.Random(7)
+WORDS = [f"word{i}" for i in range(400)]
+BASE = " ".join(_rng.choice(WORDS) for _ in range(600))
+
+
+def edited(text, every):
+    """Replaces every `every`-th word, like a light revision of the same CV."""
+    words = text.split()
+    return " ".join("changed" if i % every == 0 else w for i, w in enumerate(words))
+
+def test_signature_is_deterministic():
+    sig = minhash(BASE)
+    assert len(sig) == NUM_PERM
+    assert (sig == minhash(BASE)).all()
+    assert similarity(sig, minhash(BASE.upper())) == 1.0
+
+def test_short_text_still_has_a_shingle():
+    assert len(shingles("two words")) == 1
+
+def test_similarity_tracks_jaccard():
+    a, b = shingles(BASE), shingles(edited(BASE, 25))
+    jaccard = len(a & b) / len(a | b)
+    assert abs(similarity(minhash(BASE), minhash(edited(BASE, 25))) - jaccard) < 0.15
+
+def test_index_finds_near_duplicate_only():
+    index = MinHashLSH(threshold=0.8)
+    index.insert("v1", minhash(BASE))
+    index.insert("other", minhash(" ".join(_rng.choice(WORDS) for _ in range(600))))
+    assert len(index) == 2
+    key, score = index.query(minhash(edited(BASE, 150)))
+    assert key == "v1" and score >= 0.8
+    assert index.query(minhash("an unrelated cover letter about something else entirely")) is None
+
+def test_bands_must_divide_signature():
+    with pytest.raises(ValueError):
+        MinHashLSH(bands=7)
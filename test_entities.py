@@ -0,0 +1,49 @@
+import pytest
+
+from entities import scan, scan_entities
+
+
+def kinds(text):
+    return [(e.kind, e.value) for e in scan(text)]
+
+def test_contact_line():
+    text = "Jane Roe | jane.roe@uni.edu | +91 98765 43210 | linkedin.com/in/jane-roe | https://github.com/jroe"
+    assert kinds(text) == [("email", "jane.roe@uni.edu"), ("phone", "+91 98765 43210"),
+                           ("linkedin", "linkedin.com/in/jane-roe"), ("github", "https://github.com/jroe")]
+
+def test_offsets_point_at_the_value():
+    text = "Mail: a.b@x.org, call (555) 123-4567"
+    for e in scan(text):
+        assert text[e.start:e.end].strip() == e.value
+
+@pytest.mark.parametrize("text", ["ORCID: 0000-0002-1825-0097", "ORCID iD 0000-0002-1825-0097",
+                                  "https://orcid.org/0000-0002-1825-0097"])
+def test_orcid_is_the_bare_id(text):
+    [e] = scan(text)
+    assert (e.kind, e.value) == ("orcid", "0000-0002-1825-0097")
+    assert text[e.start:e.end] == e.value
+
+@pytest.mark.parametrize("text", ["555-123-4567", "(555) 123-4567", "555.123.4567", "+44 20 7946 0958",
+                                  "jane@x.com | 9876543210", "Phone: 123456789", "Tel no: 9876543210"])
+def test_phones(text):
+    assert "phone" in dict(kinds(text))
+
+@pytest.mark.parametrize("text", ["ISBN 978-3-16-148410-0", "978-3-16-148410-0", "ISBN: 0-306-40615-2",
+                                  "ID 123456789", "Roll no. 1234567890", "Student ID: 2019-331-0042",
+                                  "v1.2.3", "2019 - 2023", "1234567"])
+def test_not_phones(text):
+    assert "phone" not in dict(kinds(text))
+
+def test_dates_and_grades():
+    text = "BSc Physics, Jan 2015 - May 2019, CGPA: 3.72/4.00\nMSc, 2019 – present, 8.5 / 10"
+    found = scan_entities(text)
+    assert found["date_range"] == ["Jan 2015 - May 2019", "2019 – present"]
+    assert found["grade"] == ["CGPA: 3.72/4.00", "8.5 / 10"]
+
+def test_email_is_not_a_profile_url():
+    assert kinds("jroe@github.com") == [("email", "jroe@github.com")]
+
+def test_scan_entities_dedups_case_insensitively():
+    found = scan_entities("A@x.org, a@X.org, b@x.org")
+    assert found["email"] == ["A@x.org", "b@x.org"]
+    assert found["phone"] == []
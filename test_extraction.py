@@ -0,0 +1,39 @@
+import io
+import random
+
+import pytest
+
+from benchmark import make_resume
+from extraction import count_pdf_pages, extract_text_from_pdf, iter_pdf_pages
+from pdf_generator import create_pdf
+
+
+@pytest.fixture(scope="module")
+def pdf():
+    return create_pdf(make_resume(random.Random(5), "5-page"), "Classic Serif")
+
+def test_pages_in_order(pdf, tmp_path):
+    pages = list(iter_pdf_pages(pdf))
+    assert len(pages) == count_pdf_pages(pdf) >= 4
+    assert all(p.endswith("\x0c") for p in pages)
+    path = tmp_path / "cv.pdf"
+    path.write_bytes(pdf)
+    assert list(iter_pdf_pages(str(path))) == pages == list(iter_pdf_pages(io.BytesIO(pdf)))
+    assert extract_text_from_pdf(pdf) == "".join(pages)
+
+def test_page_limit(pdf):
+    assert list(iter_pdf_pages(pdf, max_pages=2)) == list(iter_pdf_pages(pdf))[:2]
+
+def test_char_limit(pdf):
+    full = extract_text_from_pdf(pdf)
+    limit = len(full) // 3
+    pages = list(iter_pdf_pages(pdf, max_chars=limit))
+    assert "".join(pages) == full[:limit]
+    assert len(pages) < count_pdf_pages(pdf)
+
+def test_page_parallel_matches_sequential(pdf):
+    assert list(iter_pdf_pages(pdf, workers=2, pages_per_task=1)) == list(iter_pdf_pages(pdf))
+    assert list(iter_pdf_pages(pdf, max_pages=3, workers=2)) == list(iter_pdf_pages(pdf, max_pages=3))
+
+def test_laparams_dict(pdf):
+    assert extract_text_from_pdf(pdf, laparams={"line_margin": 0.5}) == extract_text_from_pdf(pdf)
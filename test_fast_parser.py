@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+from extraction import empty_resume
+from fast_parser import fast_path_fingerprint, hybrid_extract, parse_awards, parse_experience, parse_resume
+from llm_client import AsyncLLMClient, FakeBackend
+
+CV = """Jane Roe
+Boston, USA | jane.roe@uni.edu | (555) 123-4567
+SUMMARY
+Data engineer building reliable pipelines.
+EXPERIENCE
+Senior Engineer, Acme Corp  Jan 2020 - Present
+• Built the ingestion platform
+• Cut batch latency
+by 40%
+Engineer | Beta Labs  2017 - 2019
+• Shipped dashboards
+EDUCATION
+MSc Computer Science, Boston University, 2017
+GPA: 3.8/4.0
+
+BSc Physics, University of Dhaka, 2015
+PUBLICATIONS
+Streaming joins at scale
+VLDB Workshop, 2019
+SKILLS
+Python, SQL, Spark
+"""
+
+
+def recording_client(reply):
+    """A client answering every prompt with `reply` on top of an otherwise empty, valid resume."""
+    prompts = []
+    def respond(prompt):
+        prompts.append(prompt)
+        return json.dumps({**empty_resume(), **reply})
+    return AsyncLLMClient(FakeBackend(latency=0, jitter=0, response_fn=respond)), prompts
+
+def test_parse_resume():
+    data, confidences, sections = parse_resume(CV)
+    assert (data["name"], data["address"], data["contact"]) == ("Jane Roe", "Boston, USA", "jane.roe@uni.edu | (555) 123-4567")
+    assert data["experience"] == [
+        {"company": "Acme Corp", "role": "Senior Engineer", "dates": "Jan 2020 - Present",
+         "bullets": ["Built the ingestion platform", "Cut batch latency by 40%"]},
+        {"company": "Beta Labs", "role": "Engineer", "dates": "2017 - 2019", "bullets": ["Shipped dashboards"]}]
+    assert data["education"][0] == {"university": "Boston University", "degree": "MSc Computer Science",
+                                    "year": "2017", "grade": "3.8/4.0"}
+    assert data["publications"] == [{"title": "Streaming joins at scale", "journal": "VLDB Workshop", "year": "2019"}]
+    assert data["core_skills"] == "Python, SQL, Spark"
+    assert min(confidences.values()) >= 0.9
+    assert set(sections) == set(confidences)
+
+def test_confidence_drops_for_unstructured_text():
+    entries, confidence = parse_experience("• a bullet before any job\nSome prose without dates")
+    assert entries == [] and confidence == 0.0
+
+def test_award_year_column():
+    entries, confidence = parse_awards("Best Paper Award\n\nDean's List\n\n2019\n\n2014")
+    assert entries == [{"name": "Best Paper Award", "year": "2019"}, {"name": "Dean's List", "year": "2014"}]
+    assert confidence == 1.0
+
+def test_confident_cv_needs_no_llm():
+    client, prompts = recording_client({})
+    data, report = asyncio.run(hybrid_extract(client, CV))
+    assert prompts == [] and report["llm"] == [] and report["failed"] == []
+    assert data["name"] == "Jane Roe"
+
+def test_low_confidence_section_goes_to_the_llm():
+    client, prompts = recording_client({"experience": [{"company": "Acme", "role": "Dev", "dates": "2020", "bullets": []}]})
+    data, report = asyncio.run(hybrid_extract(client, CV, threshold=1.01))
+    assert "experience" in report["llm"] and len(prompts) == len(report["llm"])
+    assert data["experience"][0]["company"] == "Acme"
+
+def test_few_sections_use_the_full_text_prompt():
+    # Header plus one section: one full-text prompt, not one per section
+    client, prompts = recording_client({"name": "Jane Roe", "core_skills": "Python"})
+    data, report = asyncio.run(hybrid_extract(client, "Jane Roe\njane@x.org\nSKILLS\nPython\n"))
+    assert report["llm"] == ["all"]
+    assert len(prompts) == 1 and "Section Text" not in prompts[0]
+    assert data["core_skills"] == "Python"
+
+def test_fingerprint_depends_on_threshold():
+    assert fast_path_fingerprint(0.7) != fast_path_fingerprint(0.8)
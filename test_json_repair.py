@@ -0,0 +1,61 @@
+import pytest
+
+from extraction import clean_json
+from json_repair import repair_json
+
+
+def test_valid_object_inside_chatter():
+    assert repair_json('Here you go:\n```json\n{"name": "Jane", "year": 2020}\n```') == ({"name": "Jane", "year": 2020}, "ok")
+
+def test_syntax_fixes():
+    value, status = repair_json("{'name': 'Jane', 'ok': True, 'gpa': None, 'skills': ['a', 'b',],}")
+    assert status == "repaired"
+    assert value == {"name": "Jane", "ok": True, "gpa": None, "skills": ["a", "b"]}
+
+def test_raw_newline_and_escaped_quote_in_string():
+    value, _ = repair_json("{'objective': 'Line one\nit\\'s \"two\"'")
+    assert value == {"objective": "Line one\nit's \"two\""}
+
+def test_mismatched_bracket_closes_inner_list():
+    assert repair_json('{"a": [1, 2}')[0] == {"a": [1, 2]}
+
+def test_truncated_value_keeps_complete_keys():
+    value, status = repair_json('{"name": "Jane", "experience": [{"company": "Acme", "role": "De')
+    assert status == "truncated"
+    assert value["name"] == "Jane"
+    assert value["experience"] == [{"company": "Acme", "role": "De"}]
+
+def test_key_without_value_is_dropped():
+    value, status = repair_json('{"name": "Jane", "address": ')
+    assert value == {"name": "Jane"}
+    assert status == "repaired"
+
+def test_no_object():
+    with pytest.raises(ValueError):
+        repair_json("Sorry, I cannot help with that.")
+
+def test_non_ascii_bareword():
+    assert repair_json("{name: Ñoño, city: São_Paulo}") == ({"name": "Ñoño", "city": "São_Paulo"}, "repaired")
+
+@pytest.mark.parametrize("text, value", [
+    ('{"a": 1e5, "b": -2.5E-3,}', {"a": 1e5, "b": -2.5e-3}),
+    ('{"a": +5, "b": .5, "c": 5., "d": 007}', {"a": 5, "b": 0.5, "c": 5.0, "d": 7}),
+])
+def test_numbers(text, value):
+    assert repair_json(text) == (value, "repaired")
+
+@pytest.mark.parametrize("text, value", [
+    ('{"a": "it\'s"', {"a": "it's"}),
+    ('{"name": "José", "b": ["x",]', {"name": "José", "b": ["x"]}),
+    ('{"ok": true', {"ok": True}),
+])
+def test_missing_closing_brace_only(text, value):
+    assert repair_json(text) == (value, "repaired")
+
+@pytest.mark.parametrize("text", ['{"a": 1, "gpa": 3.', '{"a": 1, "b": 2', '{"a": 1, "b": tr'])
+def test_cut_scalar_is_truncated(text):
+    assert repair_json(text)[1] == "truncated"
+
+def test_clean_json_keeps_finished_last_value():
+    assert clean_json('{"a": 1e5, "b": "x"') == {"a": 1e5, "b": "x"}
+    assert clean_json('{"a": 1e5, "b": "x') == {"a": 1e5}
@@ -0,0 +1,51 @@
+import json
+
+from json_stream import IncrementalJSONParser
+
+DOC = {"name": "Jane \"JD\" Roe", "path": "C:\\cv\\", "gpa": 3.8, "ok": True,
+       "experience": [{"company": "Acme {Labs}", "bullets": ["a, b", "c]"]}], "MoU": None}
+TEXT = "```json\n" + json.dumps(DOC) + "\n```"
+
+
+def feed_all(chunks):
+    parser = IncrementalJSONParser()
+    emitted = [pair for chunk in chunks for pair in parser.feed(chunk)]
+    return parser, emitted
+
+def test_whole_response():
+    parser, emitted = feed_all([TEXT])
+    assert parser.done
+    assert parser.result == DOC
+    assert [k for k, _ in emitted] == list(DOC)
+
+def test_every_split_point():
+    # Includes cuts between a backslash and the character it escapes
+    for i in range(len(TEXT)):
+        parser, _ = feed_all([TEXT[:i], TEXT[i:]])
+        assert parser.result == DOC, i
+
+def test_one_character_chunks():
+    parser, emitted = feed_all(list(TEXT))
+    assert parser.result == DOC
+    assert len(emitted) == len(DOC)
+
+def test_keys_arrive_before_the_object_ends():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"name": "Jane", "experience": [') == [("name", "Jane")]
+    assert not parser.done
+
+def test_truncated_response_keeps_finished_keys():
+    text = json.dumps(DOC)
+    parser, _ = feed_all([text[:text.index('"experience"') + 40]])
+    assert not parser.done
+    assert parser.result == {k: DOC[k] for k in ("name", "path", "gpa", "ok")}
+
+def test_bad_value_is_reported():
+    parser, _ = feed_all(['{"a": 1, "b": nope, "c": "x"}'])
+    assert parser.result == {"a": 1, "c": "x"}
+    assert parser.bad_keys == ["b"]
+
+def test_text_after_the_object_is_ignored():
+    parser, _ = feed_all(['{"a": 1}', ' and {"b": 2}'])
+    assert parser.done
+    assert parser.result == {"a": 1}
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from llm_client import (AsyncLLMClient, FakeBackend, LLMBackend, LLMDeadlineExceeded, LLMError, TokenBucket,
+                        TransientLLMError, is_retryable)
+
+
+class ScriptedBackend(LLMBackend):
+    """Fails with the given exceptions first, then answers; tracks peak concurrency."""
+    name = "scripted"
+
+    def __init__(self, errors=(), delay=0.0, chunks=("a", "b", "c"), fail_after_chunk=None):
+        self.errors = list(errors)
+        self.delay = delay
+        self.chunks = chunks
+        self.fail_after_chunk = fail_after_chunk
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    async def generate(self, prompt, timeout=None):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.errors: raise self.errors.pop(0)
+            return f"reply to {prompt}"
+        finally:
+            with self._lock: self.active -= 1
+
+    async def stream(self, prompt, timeout=None):
+        self.calls += 1
+        if self.errors: raise self.errors.pop(0)
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after_chunk: raise TransientLLMError("connection reset")
+            yield chunk
+
+def client(backend, **kwargs):
+    return AsyncLLMClient(backend, base_delay=0, seed=0, **kwargs)
+
+class ResourceExhausted(Exception):
+    pass
+
+class HTTPError(Exception):
+    code = 503
+
+def test_is_retryable():
+    assert is_retryable(TransientLLMError()) and is_retryable(asyncio.TimeoutError())
+    assert is_retryable(ResourceExhausted()) and is_retryable(HTTPError())
+    assert not is_retryable(ValueError("bad request"))
+
+def test_retries_transient_errors():
+    backend = ScriptedBackend(errors=[TransientLLMError("429"), ResourceExhausted()])
+    c = client(backend)
+    assert asyncio.run(c.generate("p")) == "reply to p"
+    assert (backend.calls, c.retries, c.failures) == (3, 2, 0)
+
+def test_permanent_error_is_not_retried():
+    c = client(ScriptedBackend(errors=[ValueError("bad request")]))
+    with pytest.raises(LLMError, match="bad request"):
+        asyncio.run(c.generate("p"))
+    assert (c.retries, c.failures) == (0, 1)
+
+def test_gives_up_after_max_retries():
+    c = client(ScriptedBackend(errors=[TransientLLMError("429")] * 5), max_retries=2)
+    with pytest.raises(LLMError, match="after 3 attempts"):
+        asyncio.run(c.generate("p"))
+
+def test_deadline_covers_retries():
+    c = client(ScriptedBackend(delay=1.0), timeout=None, deadline=0.05)
+    started = time.monotonic()
+    with pytest.raises(LLMDeadlineExceeded):
+        asyncio.run(c.generate("p"))
+    assert time.monotonic() - started < 0.5
+
+def test_concurrency_is_capped_across_threads():
+    backend = ScriptedBackend(delay=0.02)
+    c = client(backend, max_concurrency=2)
+    threads = [threading.Thread(target=c.generate_sync, args=(f"p{i}",)) for i in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert backend.calls == 8 and backend.peak == 2
+
+def test_stream_retries_only_before_the_first_chunk():
+    c = client(ScriptedBackend(errors=[TransientLLMError("429")]))
+    assert list(c.stream_sync("p")) == ["a", "b", "c"]
+    assert c.retries == 1
+
+    received = []
+    c = client(ScriptedBackend(fail_after_chunk=2))
+    with pytest.raises(LLMError, match="connection reset"):
+        for chunk in c.stream_sync("p"): received.append(chunk)
+    assert received == ["a", "b"] and c.retries == 0
+
+def test_latency_history_is_bounded():
+    c = client(FakeBackend(latency=0, jitter=0), latency_window=5)
+    for i in range(20): c.generate_sync(f"p{i}")
+    assert len(c.latencies) == 5 and c.stats()["calls"] == 20
+
+def test_token_bucket_paces_after_the_burst():
+    bucket = TokenBucket(rate=50, capacity=2)
+    async def take(n):
+        for _ in range(n): await bucket.acquire()
+    started = time.monotonic()
+    asyncio.run(take(2))
+    assert time.monotonic() - started < 0.04   # the burst: no waiting
+    asyncio.run(take(3))
+    assert time.monotonic() - started >= 0.05  # then 1/50 s per token
+
+def test_fake_backend_failures_are_reproducible():
+    def retries(seed):
+        c = client(FakeBackend(latency=0, jitter=0, failure_rate=0.5, seed=seed), max_retries=10)
+        for i in range(20): c.generate_sync(f"p{i}")
+        return c.retries
+    assert retries(1) == retries(1) > 0
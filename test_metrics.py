@@ -0,0 +1,78 @@
+import json
+import logging
+import urllib.error
+import urllib.request
+
+import pytest
+
+from metrics import LogSink, Metrics, Sink, start_metrics_server
+
+
+class Recorder(Sink):
+    def __init__(self):
+        self.events = []
+
+    def on_span(self, name, seconds, labels): self.events.append(("span", name, labels))
+    def on_counter(self, name, value, labels): self.events.append(("counter", name, value, labels))
+
+def test_counters_and_gauges_by_label():
+    m = Metrics()
+    m.inc("cache_hits_total", cache="render")
+    m.inc("cache_hits_total", 2, cache="render")
+    m.inc("cache_hits_total", cache="extraction")
+    m.set_gauge("session_store_bytes", 10, tier="memory")
+    m.set_gauge("session_store_bytes", 7, tier="memory")
+    assert m.counter_value("cache_hits_total", cache="render") == 3
+    assert m.counter_value("cache_hits_total", cache="extraction") == 1
+    assert m.counter_value("cache_hits_total") == 0
+    assert m.gauge_value("session_store_bytes", tier="memory") == 7
+
+def test_span_records_status_and_forwards_to_sinks():
+    m = Metrics()
+    sink = m.add_sink(Recorder())
+    with m.span("render", template="Minimalist"): pass
+    with pytest.raises(ValueError):
+        with m.span("render", template="Minimalist"): raise ValueError("boom")
+    m.inc("llm_retries_total", backend="fake")
+    spans = {s["labels"]["status"]: s["count"] for s in m.snapshot()["spans"]}
+    assert spans == {"ok": 1, "error": 1}
+    assert [e[0] for e in sink.events] == ["span", "span", "counter"]
+    assert m.recent_spans[-1]["template"] == "Minimalist"
+
+def test_prometheus_text():
+    m = Metrics()
+    m.inc("renders_total", template="Ivy League")
+    m.set_gauge("sessions", 3)
+    m.observe("llm_generate", 0.3)
+    text = m.render_prometheus()
+    assert '# TYPE resume_renders_total counter\nresume_renders_total{template="Ivy League"} 1' in text
+    assert "resume_sessions 3" in text
+    assert 'resume_llm_generate_seconds_bucket{le="0.25"} 0' in text
+    assert 'resume_llm_generate_seconds_bucket{le="0.5"} 1' in text
+    assert 'resume_llm_generate_seconds_bucket{le="+Inf"} 1' in text
+    assert "resume_llm_generate_seconds_count 1" in text
+    m.reset()
+    assert m.render_prometheus() == "\n"
+
+def test_log_sink_writes_json(caplog):
+    m = Metrics()
+    m.add_sink(LogSink())
+    with caplog.at_level(logging.INFO, logger="resume.metrics"):
+        m.inc("json_repairs_total", kind="truncated")
+    assert json.loads(caplog.records[-1].getMessage()) == {"event": "counter", "name": "json_repairs_total",
+                                                           "inc": 1, "kind": "truncated"}
+
+def test_metrics_endpoint():
+    m = Metrics()
+    m.inc("requests_total")
+    server = start_metrics_server(0, metrics=m)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(base + "/metrics") as res:
+            assert res.status == 200 and b"resume_requests_total 1" in res.read()
+        with pytest.raises(urllib.error.HTTPError) as info:
+            urllib.request.urlopen(base + "/other")
+        assert info.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
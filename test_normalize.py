@@ -0,0 +1,30 @@
+from normalize import estimate_tokens, normalize_text
+
+PAGES = ["Jane Roe | jane@x.org\nExperience\nBuilt a pipe-\nline for data\n1\n",
+         "Jane Roe | jane@x.org\nMore   work\there\n2\n",
+         "Jane Roe | jane@x.org\nEducation\nPage 3 of 3\n"]
+
+
+def test_strips_page_furniture_and_joins_hyphens():
+    text, report = normalize_text(PAGES)
+    # The repeated header is kept once: on a CV it is the name/contact line
+    assert text == "Jane Roe | jane@x.org\nExperience\nBuilt a pipeline for data\nMore work here\nEducation"
+    assert (report["header_footer_lines"], report["hyphenations_joined"]) == (5, 1)
+    assert report["tokens_after"] < report["tokens_before"] and report["token_savings_pct"] > 0
+
+def test_form_feed_string_matches_page_list():
+    assert normalize_text("\x0c".join(PAGES))[0] == normalize_text(PAGES)[0]
+
+def test_only_long_or_contact_lines_are_deduplicated():
+    text, report = normalize_text("IEEE Access, 2019\nx\nIEEE Access, 2019\n"
+                                  "+1 (555) 123-4567\n+1 (555) 123-4567\n2000 - 2001\n2000 - 2001")
+    assert text == "IEEE Access, 2019\nx\nIEEE Access, 2019\n+1 (555) 123-4567\n2000 - 2001\n2000 - 2001"
+    assert report["duplicate_lines"] == 1
+
+def test_empty_text():
+    text, report = normalize_text("")
+    assert text == "" and report["token_savings_pct"] == 0.0 == report["char_savings_pct"]
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("four words, one comma") == int(4 * 1.3 + 1)
@@ -0,0 +1,68 @@
+import random
+import sys
+from dataclasses import replace
+
+import pytest
+
+from benchmark import make_resume
+from cache import RenderCache
+from extraction import count_pdf_pages
+from pdf_generator import FIT_MIN_SCALE, _build_story, count_pages, create_pdf, fit_pdf, render_all_templates
+from templates import TEMPLATES, build_styles, get_template, register_template, template_names
+
+
+def resume(size, seed=1):
+    return make_resume(random.Random(seed), size)
+
+@pytest.mark.parametrize("template", template_names())
+@pytest.mark.parametrize("size", ["1-page", "2-page", "5-page"])
+def test_count_pages_matches_the_render(template, size):
+    data = resume(size)
+    assert count_pages(_build_story(data, get_template(template))) == count_pdf_pages(create_pdf(data, template))
+
+def test_count_pages_stops_past_limit():
+    story = _build_story(resume("5-page"), get_template("Classic Serif"))
+    assert count_pages(story, limit=1) == 2
+
+@pytest.mark.parametrize("template", template_names())
+def test_fit_pdf_fits_a_long_cv(template):
+    pdf, info = fit_pdf(resume("2-page"), template, pages=2)
+    assert info["fits"] and FIT_MIN_SCALE <= info["scale"] <= 1.0
+    assert count_pdf_pages(pdf) == info["pages"] <= 2
+
+def test_fit_pdf_keeps_full_scale_when_it_fits():
+    data = resume("1-page")
+    pdf, info = fit_pdf(data, "Modern Sans", pages=3)
+    assert (info["scale"], info["fits"], info["passes"]) == (1.0, True, 1)
+    assert pdf == create_pdf(data, "Modern Sans", fit_pages=3)
+
+def test_fit_pdf_falls_back_to_min_scale():
+    pdf, info = fit_pdf(resume("5-page"), "Executive", pages=1)
+    assert (info["scale"], info["fits"]) == (FIT_MIN_SCALE, False)
+    assert count_pdf_pages(pdf) == info["pages"] > 1
+
+def test_fit_pdf_needs_two_passes():
+    with pytest.raises(ValueError):
+        fit_pdf(resume("1-page"), "Minimalist", max_passes=1)
+
+def test_prebuilt_styles_are_scaled():
+    base = TEMPLATES["Modern Sans"]
+    spec = register_template(replace(base, name="Prebuilt", styles=build_styles(
+        base.font_header, base.font_body, base.header_align, base.name_size)))
+    try:
+        assert get_template("Prebuilt") is spec
+        assert get_template("Prebuilt", 0.9).styles["normal"].fontSize == pytest.approx(10.5 * 0.9)
+        data = resume("2-page")
+        assert fit_pdf(data, "Prebuilt", pages=1)[1] == fit_pdf(data, "Modern Sans", pages=1)[1]
+    finally:
+        del TEMPLATES["Prebuilt"]
+
+def test_render_cache_without_preview_support(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pypdfium2", None)   # import fails like an uninstalled package
+    cache = RenderCache()
+    data = resume("1-page")
+    first = render_all_templates(data, cache=cache)
+    assert all(r["preview"] is None for r in first.values())
+    hits = cache.hits
+    assert render_all_templates(data, cache=cache) == first
+    assert cache.hits - hits == 2 * len(template_names())
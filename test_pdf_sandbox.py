@@ -0,0 +1,83 @@
+import hashlib
+import io
+import os
+import random
+
+import pytest
+
+from benchmark import make_resume
+from extraction import iter_pdf_pages
+from pdf_generator import create_pdf
+from pdf_sandbox import ExtractionSandbox, PDFRejected
+
+
+@pytest.fixture(scope="module")
+def pdf():
+    return create_pdf(make_resume(random.Random(5), "5-page"), "Executive")
+
+@pytest.fixture(scope="module")
+def sandbox(tmp_path_factory):
+    sandbox = ExtractionSandbox(max_bytes=1 << 20, max_pages=20, timeout=30, workers=1,
+                                spool_dir=str(tmp_path_factory.mktemp("spool")))
+    yield sandbox
+    sandbox.close()
+
+def spooled(sandbox, data):
+    path, digest = sandbox.spool(io.BytesIO(data))
+    return path, digest
+
+def rejection(fn):
+    with pytest.raises(PDFRejected) as info:
+        fn()
+    return info.value.reason
+
+def test_spool_hashes_and_checks_the_upload(sandbox, pdf):
+    path, digest = spooled(sandbox, pdf)
+    try:
+        assert digest == hashlib.sha256(pdf).hexdigest()
+        with open(path, "rb") as fh: assert fh.read() == pdf
+    finally:
+        os.unlink(path)
+    assert rejection(lambda: spooled(sandbox, b"GIF89a not a pdf")) == "not_pdf"
+    assert rejection(lambda: spooled(sandbox, b"")) == "not_pdf"
+    assert rejection(lambda: spooled(sandbox, b"%PDF-1.4" + b"0" * (1 << 20))) == "too_large"
+    big = io.BytesIO(pdf)
+    big.size = 2 << 20   # like a Streamlit upload, which knows its size up front
+    assert rejection(lambda: sandbox.spool(big)) == "too_large"
+    assert os.listdir(sandbox.spool_dir) == []
+
+def test_pages_match_in_process_extraction(sandbox, pdf):
+    path, _ = spooled(sandbox, pdf)
+    try:
+        totals = []
+        assert list(sandbox.iter_pages(path, max_pages=3, on_total=totals.append)) == list(iter_pdf_pages(pdf, max_pages=3))
+        assert totals == [3]
+        assert sandbox.extract_text(path) == "".join(iter_pdf_pages(pdf))
+    finally:
+        os.unlink(path)
+
+def test_rejections_keep_the_sandbox_usable(sandbox, pdf, tmp_path):
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"%PDF-1.4\n" + os.urandom(2000))
+    assert rejection(lambda: list(sandbox.iter_pages(str(broken)))) == "malformed"
+
+    path, _ = spooled(sandbox, pdf)
+    try:
+        strict = ExtractionSandbox(max_pages=2, workers=1)
+        try:
+            assert rejection(lambda: list(strict.iter_pages(path))) == "too_many_pages"
+        finally:
+            strict.close()
+        assert len(list(sandbox.iter_pages(path))) > 2
+    finally:
+        os.unlink(path)
+
+def test_timeout_kills_the_worker(pdf, tmp_path):
+    path = tmp_path / "cv.pdf"
+    path.write_bytes(pdf)
+    sandbox = ExtractionSandbox(timeout=0.01, workers=1)
+    try:
+        assert rejection(lambda: list(sandbox.iter_pages(str(path)))) == "timeout"
+        assert sandbox._idle == []
+    finally:
+        sandbox.close()
@@ -0,0 +1,68 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from render_service import RenderService, make_handler
+
+DATA = {"name": "Jane Roe", "contact": "jane@x.org",
+        "experience": [{"company": "Acme", "role": "Engineer", "dates": "2020", "bullets": ["Built things."]}]}
+
+
+@pytest.fixture(scope="module")
+def service():
+    service = RenderService(workers=1, queue_size=0, timeout=60)
+    yield service
+    service.stop()
+
+@pytest.fixture(scope="module")
+def base(service):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def request(url, body=None, headers=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req) as res:
+            return res.status, dict(res.headers), res.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+def test_unavailable_until_warm(service, base):
+    assert request(base + "/healthz")[0] == 503
+    assert request(base + "/render", {"template": "Ivy League", "data": DATA})[0] == 503
+    service.start()
+    status, _, body = request(base + "/healthz")
+    assert status == 200 and json.loads(body)["ready"]
+
+def test_etag_and_not_modified(service, base):
+    status, headers, pdf = request(base + "/render", {"template": "Ivy League", "data": DATA})
+    assert status == 200 and pdf.startswith(b"%PDF") and headers["ETag"]
+    status, again, body = request(base + "/render", {"template": "Ivy League", "data": DATA},
+                                  {"If-None-Match": headers["ETag"]})
+    assert (status, again["ETag"], body) == (304, headers["ETag"], b"")
+
+def test_full_queue_answers_429(service, base):
+    # Hold the only admission slot, as a long render would
+    assert service._slots.acquire(blocking=False)
+    try:
+        status, headers, _ = request(base + "/render", {"template": "Ivy League", "data": {**DATA, "name": "Other"}})
+    finally:
+        service._slots.release()
+    assert status == 429 and headers["Retry-After"] == "1"
+    # Cached renders need no slot
+    assert request(base + "/render", {"template": "Ivy League", "data": DATA})[0] == 200
+
+def test_bad_requests(base):
+    assert request(base + "/render", {"template": "Nope", "data": DATA})[0] == 400
+    assert request(base + "/render", {"data": DATA, "fit_pages": 0})[0] == 400
+    assert request(base + "/render", [1, 2])[0] == 400
+    assert request(base + "/nowhere")[0] == 404
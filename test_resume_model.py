@@ -0,0 +1,57 @@
+import json
+import pickle
+
+import pytest
+
+from cache import canonical_hash
+from resume_model import Job, Resume
+
+DATA = {"name": "Jane Roe", "contact": "jane@x.org", "core_skills": ["Python", "SQL"],
+        "experience": {"company": "Acme", "role": "Dev", "dates": "2020 - 2023", "bullets": ["Built things"]},
+        "education": [{"university": "MIT", "degree": "BSc", "year": 2019, "grade": "3.8/4"}]}
+
+
+def make():
+    resume, problems = Resume.from_dict(DATA)
+    return resume, problems
+
+def test_from_dict_normalizes_and_reports():
+    resume, problems = make()
+    assert resume.core_skills == "Python, SQL"
+    assert resume.experience == (Job("Acme", "Dev", "2020 - 2023", ("Built things",)),)
+    assert resume.education[0].year == "2019"
+    assert problems["objective"] == "missing"
+
+def test_round_trip_and_hash():
+    resume, _ = make()
+    data = resume.to_dict()
+    assert Resume.from_dict(data)[0] == resume
+    assert resume.canonical_hash() == canonical_hash(data)
+
+def test_updated_reuses_unchanged_sections():
+    resume, _ = make()
+    new = resume.updated(name="J. Roe", experience=resume.section_json("experience"),
+                         education=resume.section_json("education"))
+    assert new.name == "J. Roe"
+    assert new.experience is resume.experience
+    assert new.diff(resume) == ["name"]
+
+def test_updated_parses_changed_section():
+    resume, _ = make()
+    jobs = json.loads(resume.section_json("experience")) + [{"company": "Beta", "role": "Lead", "dates": "2023", "bullets": []}]
+    new = resume.updated(experience=json.dumps(jobs))
+    assert [j.company for j in new.experience] == ["Acme", "Beta"]
+    assert new.diff(resume) == ["experience"]
+    assert resume.updated(name=resume.name) is resume
+
+@pytest.mark.parametrize("text", ["[{", '[{"unexpected": 1}]'])
+def test_updated_rejects_bad_section(text):
+    resume, _ = make()
+    with pytest.raises(ValueError, match="^experience: "):
+        resume.updated(experience=text)
+
+def test_pickle_drops_memo():
+    resume, _ = make()
+    resume.canonical_hash()
+    copy = pickle.loads(pickle.dumps(resume))
+    assert copy == resume and copy._memo == {}
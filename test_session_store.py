@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+
+import pytest
+
+from session_store import SessionStore
+
+KB = 1000
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(memory_budget=30 * KB, disk_budget=50 * KB, idle_ttl=60, blob_min_bytes=KB,
+                         spill_dir=str(tmp_path / "spill"), sweep_interval=1e9)
+    yield store
+    store.close()
+
+def spill_files(store):
+    return len(os.listdir(store.spill_dir))
+
+def test_small_values_stay_in_memory(store):
+    session = store.session("a")
+    session["resume"] = {"name": "Jane"}
+    session["short"] = "x" * 10
+    assert session["resume"] == {"name": "Jane"} and session["short"] == "x" * 10
+    assert store.memory_bytes == 0
+
+def test_spill_and_reload(store):
+    blobs = {f"s{i}": os.urandom(10 * KB) for i in range(5)}
+    for sid, blob in blobs.items():
+        store.set(sid, "pdf", blob)
+    assert store.memory_bytes <= store.memory_budget
+    assert store.spills == 2 and spill_files(store) == 2
+    # Read back least recent first: each reload pushes another blob out
+    assert store.get("s0", "pdf") == blobs["s0"]
+    assert store.reloads == 1
+    assert all(store.get(sid, "pdf") == blob for sid, blob in blobs.items())
+    assert store.memory_bytes <= store.memory_budget
+
+def test_text_blobs_round_trip(store):
+    text = "résumé " * 2000
+    store.set("a", "raw", text)
+    store.set("b", "pdf", os.urandom(20 * KB))   # over the memory budget: "raw" is spilled
+    assert store.spills == 1
+    assert store.get("a", "raw") == text
+
+def test_disk_budget_evicts_oldest(store):
+    for i in range(10):
+        store.set(f"s{i}", "pdf", os.urandom(10 * KB))
+    assert store.disk_bytes <= store.disk_budget
+    assert store.evictions > 0
+    assert store.get("s0", "pdf") is None
+    with pytest.raises(KeyError):
+        store.session("s0")["pdf"]
+    assert store.get("s9", "pdf") is not None
+    assert spill_files(store) == store.stats()["spilled_blobs"]
+
+def test_replace_and_delete_remove_files(store):
+    for i in range(4):
+        store.set(f"s{i}", "pdf", os.urandom(10 * KB))
+    assert spill_files(store) == 1
+    store.set("s0", "pdf", b"small")
+    del store.session("s1")["pdf"]
+    assert store.get("s0", "pdf") == b"small" and store.get("s1", "pdf") is None
+    assert spill_files(store) == 0
+    assert store.memory_bytes == 20 * KB and store.disk_bytes == 0
+
+def test_idle_expiry(store):
+    store.set("old", "pdf", os.urandom(40 * KB))
+    store.set("new", "name", "Jane")
+    assert spill_files(store) == 1
+    assert store.expire_idle(time.monotonic() + 30) == 0
+    store._sessions["old"]["touched"] -= 120
+    assert store.expire_idle() == 1
+    assert store.get("old", "pdf") is None and store.get("new", "name") == "Jane"
+    assert spill_files(store) == 0 and store.disk_bytes == 0
+
+def test_accounting_under_threads(store):
+    errors = []
+    def worker(k):
+        try:
+            for j in range(100):
+                sid = f"t{k}-{j % 4}"
+                store.set(sid, "pdf", os.urandom(5 * KB))
+                got = store.get(sid, "pdf")
+                assert got is None or len(got) == 5 * KB, len(got)
+        except BaseException as e:   # a failed assert in a thread would otherwise only be printed
+            errors.append(e)
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(6)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    if errors: raise errors[0]
+    stats = store.stats()
+    assert stats["memory_bytes"] <= store.memory_budget and stats["disk_bytes"] <= store.disk_budget
+    assert stats["memory_bytes"] == 5 * KB * stats["resident_blobs"]
+    assert stats["disk_bytes"] == 5 * KB * stats["spilled_blobs"] == 5 * KB * spill_files(store)
+
+def test_close_removes_spill_dir(store):
+    store.set("a", "pdf", os.urandom(40 * KB))
+    store.close()
+    assert not os.path.exists(store.spill_dir)